@@ -53,10 +53,55 @@ class Settings(BaseSettings):
     # WebSocket 配置
     ws_heartbeat_interval: int = Field(default=30, env="WS_HEARTBEAT_INTERVAL")
     ws_timeout: int = Field(default=300, env="WS_TIMEOUT")
+    ws_max_message_size: int = Field(default=4096, env="WS_MAX_MESSAGE_SIZE")  # 客戶端訊息大小上限（bytes）
+    ws_batch_window_ms: int = Field(default=0, env="WS_BATCH_WINDOW_MS")  # 房間訊息批次窗口（0 = 停用）
+
+    # 准入控制配置（超過門檻時拒絕新連線與昂貴請求）
+    admission_max_loop_lag_ms: float = Field(default=200.0, env="ADMISSION_MAX_LOOP_LAG_MS")
+    admission_max_connections: int = Field(default=2000, env="ADMISSION_MAX_CONNECTIONS")
+    admission_max_pending_ai_jobs: int = Field(default=20, env="ADMISSION_MAX_PENDING_AI_JOBS")
+    admission_retry_after: int = Field(default=5, env="ADMISSION_RETRY_AFTER")  # 秒
+    admission_lag_sample_interval: float = Field(default=0.5, env="ADMISSION_LAG_SAMPLE_INTERVAL")  # 秒
+
+    # 降級（Brownout）配置：壓力 = max(延遲/門檻, AI 延遲/門檻, 佇列深度/門檻)
+    brownout_loop_lag_ms: float = Field(default=100.0, env="BROWNOUT_LOOP_LAG_MS")
+    brownout_ai_latency_ms: float = Field(default=8000.0, env="BROWNOUT_AI_LATENCY_MS")
+    brownout_queue_depth: int = Field(default=10, env="BROWNOUT_QUEUE_DEPTH")
+    brownout_recovery_seconds: int = Field(default=30, env="BROWNOUT_RECOVERY_SECONDS")
+
+    # 回合結算配置
+    prompt_eval_concurrency: int = Field(default=8, env="PROMPT_EVAL_CONCURRENCY")  # Prompt 評分並行上限
+    prompt_eval_batch_size: int = Field(default=25, env="PROMPT_EVAL_BATCH_SIZE")  # 每個批次評分請求的 Prompt 數
+    prompt_eval_batch_window_ms: int = Field(default=300, env="PROMPT_EVAL_BATCH_WINDOW_MS")  # 提交行動的評分合併窗口（毫秒）
+    turn_resolution_deadline: float = Field(default=5.0, env="TURN_RESOLUTION_DEADLINE")  # 評分期限（秒）
+    turn_fallback_budget: float = Field(default=1.5, env="TURN_FALLBACK_BUDGET")  # 期限中保留給補評分批次的秒數
+
+    # 連續結算模式（大型房間不等待回合，行動以小批次持續結算）
+    global_resolution_mode: str = Field(default="turn", env="GLOBAL_RESOLUTION_MODE")  # GLOBAL 房間: turn / rolling
+    rolling_batch_interval_ms: int = Field(default=300, env="ROLLING_BATCH_INTERVAL_MS")  # 小批次結算間隔（毫秒）
+    rolling_action_cooldown_ms: int = Field(default=3000, env="ROLLING_ACTION_COOLDOWN_MS")  # 每位玩家兩次行動的最短間隔（毫秒）
+    rolling_boss_interval: float = Field(default=5.0, env="ROLLING_BOSS_INTERVAL")  # Boss 反擊間隔（秒）
+
+    # 全域房間分片配置（GLOBAL 由多個分片房間組成，各自有 Boss 與結算）
+    global_shard_capacity: int = Field(default=99, env="GLOBAL_SHARD_CAPACITY")  # 每個分片的玩家上限（最多 99）
+    global_max_shards: int = Field(default=10, env="GLOBAL_MAX_SHARDS")  # 分片數上限
+    global_aggregate_interval: float = Field(default=2.0, env="GLOBAL_AGGREGATE_INTERVAL")  # 跨分片總覽廣播間隔（秒）
+
+    # 觀戰串流配置
+    spectator_tick_interval: float = Field(default=1.0, env="SPECTATOR_TICK_INTERVAL")  # 快照更新間隔（秒）
+    spectator_max_viewers: int = Field(default=1000, env="SPECTATOR_MAX_VIEWERS")  # 全伺服器觀眾上限
+
+    # 靜態參考資料（屬性列表、屬性相剋表）的瀏覽器快取秒數
+    reference_cache_max_age: int = Field(default=86400, env="REFERENCE_CACHE_MAX_AGE")
+
+    # 房間生命週期配置
+    room_idle_ttl: int = Field(default=600, env="ROOM_IDLE_TTL")  # 空房間保留秒數
+    room_finished_ttl: int = Field(default=300, env="ROOM_FINISHED_TTL")  # 戰鬥結束後房間保留秒數
+    room_reap_interval: int = Field(default=30, env="ROOM_REAP_INTERVAL")  # 回收檢查間隔（秒）
 
     # Boss 戰配置
     boss_base_hp: int = Field(default=1000, env="BOSS_BASE_HP")
-    boss_hp_per_player: int = Field(default=500, env="BOSS_HP_PER_PLAYER")
+    boss_hp_per_player: int = Field(default=1200, env="BOSS_HP_PER_PLAYER")  # Boss 每回合只擊倒一名玩家，人數越多需要越厚的血量
     max_players_per_room: int = Field(default=4, env="MAX_PLAYERS_PER_ROOM")
 
     # 安全配置
@@ -3,7 +3,7 @@ FastAPI 主應用程式
 GenPoke Backend - AI Game Jam 2025
 """
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import uvicorn
@@ -11,6 +11,7 @@ import logging
 import sys
 
 from app.config import settings
+from app.services.reference_cache import get_reference_cache
 
 logger = logging.getLogger(__name__)
 
@@ -81,17 +82,26 @@ async def validate_environment():
     logger.info(f"📍 環境: {settings.environment}")
     logger.info(f"🌐 允許的來源: {', '.join(settings.allowed_origins_list)}")
 
-    # 創建全域房間（單一房間模式）
-    from app.websocket.room import room_manager
+    # 啟動准入控制（事件迴圈延遲監測）
+    from app.services.admission_service import get_admission_controller
+    get_admission_controller().start()
+
+    # 啟動降級控制器
+    from app.services.brownout_service import get_brownout_controller
+    get_brownout_controller().start()
+
+    # 啟動房間回收
+    from app.websocket.supervisor import room_supervisor
+    room_supervisor.start()
+
+    # 創建全域房間（第一個分片；人數超過分片上限時自動新增分片）
+    from app.websocket.raid import global_raid
     logger.info("🎮 創建全域房間...")
-    global_room = await room_manager.create_room(
-        max_players=99,  # 允許很多玩家
-        boss_base_hp=1000
-    )
-    # 強制設定房間代碼為 "GLOBAL"
-    room_manager.rooms["GLOBAL"] = room_manager.rooms.pop(global_room.room_code)
-    room_manager.rooms["GLOBAL"].room_code = "GLOBAL"
-    logger.info("✅ 全域房間已創建: GLOBAL (支援多人隨時加入)")
+    await global_raid.create_shard()
+    global_raid.start()
+
+    # 預先編碼靜態參考資料回應（屬性列表、屬性相剋表、技能屬性統計）
+    get_reference_cache().warm()
 
 
 # ===== 根路由和健康檢查 =====
@@ -119,9 +129,8 @@ async def health_check():
 
 # ===== 基礎資訊端點 =====
 
-@app.get("/api/v1/types")
-async def get_pokemon_types():
-    """獲取所有寶可夢屬性列表"""
+def build_pokemon_types():
+    """寶可夢屬性列表的回應內容"""
     return {
         "success": True,
         "data": {
@@ -138,6 +147,15 @@ async def get_pokemon_types():
     }
 
 
+get_reference_cache().register("pokemon_types", build_pokemon_types)
+
+
+@app.get("/api/v1/types")
+async def get_pokemon_types(request: Request):
+    """獲取所有寶可夢屬性列表（預先編碼，帶 ETag）"""
+    return get_reference_cache().respond(request, "pokemon_types")
+
+
 # ===== 全局錯誤處理 =====
 
 @app.exception_handler(Exception)
@@ -157,13 +175,14 @@ async def global_exception_handler(request, exc):
 
 # ===== 路由註冊 =====
 from app.routers import pokemon_router, battle_router, rooms_router
-from app.routers import skills, ai_usage
+from app.routers import skills, ai_usage, system
 
 app.include_router(pokemon_router, prefix="/api/v1/pokemon", tags=["Pokemon"])
 app.include_router(skills.router, prefix="/api/v1/skills", tags=["Skills"])
 app.include_router(battle_router, prefix="/api/v1/battle", tags=["Battle"])
 app.include_router(rooms_router, prefix="/api/v1/rooms", tags=["Rooms"])
 app.include_router(ai_usage.router, tags=["AI Usage"])
+app.include_router(system.router, tags=["System"])
 
 
 # ===== 應用程式啟動 =====
@@ -3,12 +3,13 @@
 提供傷害計算、屬性相剋查詢等端點
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel, Field
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 import logging
 
 from app.services.battle_service import BattleService
+from app.services.reference_cache import get_reference_cache
 from app.config import settings
 
 logger = logging.getLogger(__name__)
@@ -37,6 +38,21 @@ class DamageCalculationResponse(BaseModel):
     message: str = Field(description="效果訊息")
 
 
+class BatchDamageCalculationRequest(BaseModel):
+    """批次傷害計算請求"""
+    attacks: List[DamageCalculationRequest] = Field(
+        min_length=1,
+        max_length=1000,
+        description="攻擊列表（最多 1000 筆）"
+    )
+
+
+class BatchDamageCalculationResponse(BaseModel):
+    """批次傷害計算響應"""
+    results: List[DamageCalculationResponse] = Field(description="各攻擊的計算結果（與請求順序相同）")
+    total_damage: int = Field(description="總傷害")
+
+
 class TypeEffectivenessResponse(BaseModel):
     """屬性相剋查詢響應"""
     attack_type: str
@@ -91,6 +107,56 @@ async def calculate_damage(request: DamageCalculationRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/calculate-damage/batch", response_model=BatchDamageCalculationResponse)
+async def calculate_damage_batch(request: BatchDamageCalculationRequest):
+    """
+    批次計算戰鬥傷害
+
+    公式與 /calculate-damage 相同，一次向量化計算所有攻擊（例如一個回合所有玩家的傷害）
+    """
+    try:
+        # 驗證屬性是否合法
+        for i, attack in enumerate(request.attacks):
+            if attack.skill_type not in settings.POKEMON_TYPES:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"第 {i} 筆攻擊的技能屬性無效: {attack.skill_type}"
+                )
+            if attack.defender_type not in settings.POKEMON_TYPES:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"第 {i} 筆攻擊的防禦方屬性無效: {attack.defender_type}"
+                )
+
+        # 計算傷害
+        damages, effectiveness_values = BattleService.calculate_damage_batch(
+            powers=[attack.skill_power for attack in request.attacks],
+            attacker_types=[attack.skill_type for attack in request.attacks],
+            defender_types=[attack.defender_type for attack in request.attacks],
+            multipliers=[attack.prompt_multiplier for attack in request.attacks]
+        )
+        damages = damages.tolist()
+        effectiveness_values = effectiveness_values.tolist()
+
+        return BatchDamageCalculationResponse(
+            results=[
+                DamageCalculationResponse(
+                    damage=damage,
+                    type_effectiveness=effectiveness,
+                    message=BattleService.get_effectiveness_message(effectiveness)
+                )
+                for damage, effectiveness in zip(damages, effectiveness_values)
+            ],
+            total_damage=sum(damages)
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ 批次傷害計算失敗: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/type-effectiveness", response_model=TypeEffectivenessResponse)
 async def get_type_effectiveness(attack_type: str, defense_type: str):
     """
@@ -134,23 +200,46 @@ async def get_type_effectiveness(attack_type: str, defense_type: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def build_type_chart() -> Dict:
+    """完整屬性相剋表的回應內容"""
+    return {
+        "success": True,
+        "data": BattleService.get_all_type_chart(),
+        "types": settings.POKEMON_TYPES,
+        "types_chinese": settings.POKEMON_TYPES_CHINESE
+    }
+
+
+def build_battle_types() -> Dict:
+    """屬性列表的回應內容"""
+    return {
+        "success": True,
+        "data": [
+            {
+                "type": type_en,
+                "name_zh": settings.POKEMON_TYPES_CHINESE[type_en]
+            }
+            for type_en in settings.POKEMON_TYPES
+        ]
+    }
+
+
+get_reference_cache().register("battle_type_chart", build_type_chart)
+get_reference_cache().register("battle_types", build_battle_types)
+
+
 @router.get("/type-chart")
-async def get_type_chart():
+async def get_type_chart(request: Request):
     """
     獲取完整的 18x18 屬性相剋表
 
+    回應預先編碼並帶 ETag（If-None-Match 符合時返回 304）
+
     Returns:
         完整的屬性相剋矩陣
     """
     try:
-        chart = BattleService.get_all_type_chart()
-
-        return {
-            "success": True,
-            "data": chart,
-            "types": settings.POKEMON_TYPES,
-            "types_chinese": settings.POKEMON_TYPES_CHINESE
-        }
+        return get_reference_cache().respond(request, "battle_type_chart")
 
     except Exception as e:
         logger.error(f"❌ 獲取屬性相剋表失敗: {e}")
@@ -158,20 +247,13 @@ async def get_type_chart():
 
 
 @router.get("/types")
-async def get_all_types():
+async def get_all_types(request: Request):
     """
     獲取所有寶可夢屬性列表
 
+    回應預先編碼並帶 ETag（If-None-Match 符合時返回 304）
+
     Returns:
         18 種屬性的英文和中文名稱
     """
-    return {
-        "success": True,
-        "data": [
-            {
-                "type": type_en,
-                "name_zh": settings.POKEMON_TYPES_CHINESE[type_en]
-            }
-            for type_en in settings.POKEMON_TYPES
-        ]
-    }
+    return get_reference_cache().respond(request, "battle_types")
@@ -3,15 +3,19 @@ Pokemon 相關 API 路由
 處理圖片上傳、像素化、AI 屬性判斷等
 """
 
-from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks
-from typing import Dict, Any
+from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks, Request, Depends, Query
+from fastapi.responses import Response, RedirectResponse
+from typing import Dict, Any, Tuple, Literal, List, Optional
+from collections import OrderedDict
 import logging
 import os
 import asyncio
 
 from app.services.image_processor import ImageProcessor
 from app.services.gemini_service import get_gemini_service
-from app.services.skills_service import SkillsService
+from app.services.skills_service import get_skills_service
+from app.services.admission_service import get_admission_controller, require_capacity
+from app.services.brownout_service import get_brownout_controller, require_uploads_enabled
 from app.database import get_service_db
 from app.config import settings
 
@@ -19,8 +23,14 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Sprite 快取 {(pokemon_id, side): (media_type, 圖片 bytes)}
+# 寶可夢圖片建立後不會變動，可長期快取
+SPRITE_CACHE_SIZE = 512
+SPRITE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+_sprite_cache: "OrderedDict[Tuple[str, str], Tuple[str, bytes]]" = OrderedDict()
 
-@router.post("/upload")
+
+@router.post("/upload", dependencies=[Depends(require_uploads_enabled), Depends(require_capacity)])
 async def upload_pokemon_image(
     background_tasks: BackgroundTasks,
     file: UploadFile = File(...)
@@ -76,60 +86,66 @@ async def process_pokemon_image(upload_id: str, file_path: str):
     2. AI 判斷屬性
     3. 生成/鏡像背面圖
     """
-    db = get_service_db()
-
-    try:
-        logger.info(f"🔄 開始處理圖片: {upload_id}")
-
-        # 1. 像素化正面圖
-        front_image_bytes = await ImageProcessor.pixelate(file_path)
-        front_image_b64 = ImageProcessor.to_base64(front_image_bytes)
-
-        # 2. AI 判斷屬性
-        gemini = get_gemini_service()
-        pokemon_type = await gemini.detect_pokemon_type(front_image_bytes)
-        type_chinese = settings.POKEMON_TYPES_CHINESE.get(pokemon_type, "未知")
-
-        # 3. 嘗試生成背面圖
-        back_image_bytes = await gemini.generate_back_view(front_image_bytes, pokemon_type)
-
-        if back_image_bytes is None:
-            # Fallback: 使用鏡像
-            logger.info(f"📸 使用鏡像作為背面圖: {upload_id}")
-            back_image_bytes = ImageProcessor.mirror_image(front_image_bytes)
-
-        back_image_b64 = ImageProcessor.to_base64(back_image_bytes)
-
-        # 4. 根據屬性選擇 12 個技能
-        skills_service = SkillsService()
-        skills = skills_service.get_skills_by_type(pokemon_type, count=12)
-
-        logger.info(f"🎯 為 {pokemon_type} 屬性選擇了 {len(skills)} 個技能")
+    # 計入待處理 AI 任務（准入控制使用）
+    with get_admission_controller().track_ai_job():
+        db = get_service_db()
 
-        # 更新資料庫狀態為完成
-        db.table("upload_queue").update({
-            "status": "completed",
-            "processed_data": {
-                "front_image": front_image_b64,
-                "back_image": back_image_b64,
-                "type": pokemon_type,
-                "type_chinese": type_chinese,
-                "skills": skills
-            }
-        }).eq("upload_id", upload_id).execute()
+        try:
+            logger.info(f"🔄 開始處理圖片: {upload_id}")
+
+            # 1. 像素化正面圖
+            front_image_bytes = await ImageProcessor.pixelate(file_path)
+            front_image_b64 = ImageProcessor.to_base64(front_image_bytes)
+
+            # 2. AI 判斷屬性
+            gemini = get_gemini_service()
+            pokemon_type = await gemini.detect_pokemon_type(front_image_bytes)
+            type_chinese = settings.POKEMON_TYPES_CHINESE.get(pokemon_type, "未知")
+
+            # 3. 嘗試生成背面圖（降級時直接使用鏡像）
+            if get_brownout_controller().skip_back_view_generation:
+                logger.info(f"🟠 降級中，略過 AI 背面圖生成: {upload_id}")
+                back_image_bytes = None
+            else:
+                back_image_bytes = await gemini.generate_back_view(front_image_bytes, pokemon_type)
+
+            if back_image_bytes is None:
+                # Fallback: 使用鏡像
+                logger.info(f"📸 使用鏡像作為背面圖: {upload_id}")
+                back_image_bytes = ImageProcessor.mirror_image(front_image_bytes)
+
+            back_image_b64 = ImageProcessor.to_base64(back_image_bytes)
+
+            # 4. 根據屬性選擇 12 個技能
+            skills = get_skills_service().get_skills_by_type(pokemon_type, count=12)
+
+            logger.info(f"🎯 為 {pokemon_type} 屬性選擇了 {len(skills)} 個技能")
+
+            # 更新資料庫狀態為完成
+            db.table("upload_queue").update({
+                "status": "completed",
+                "processed_data": {
+                    "front_image": front_image_b64,
+                    "back_image": back_image_b64,
+                    "type": pokemon_type,
+                    "type_chinese": type_chinese,
+                    "skills": skills,
+                    "skill_ids": [skill["id"] for skill in skills]
+                }
+            }).eq("upload_id", upload_id).execute()
 
-        logger.info(f"✅ 圖片處理完成: {upload_id} (屬性: {pokemon_type})")
+            logger.info(f"✅ 圖片處理完成: {upload_id} (屬性: {pokemon_type})")
 
-        # 清理原始上傳檔案
-        await ImageProcessor.cleanup_upload(file_path)
+            # 清理原始上傳檔案
+            await ImageProcessor.cleanup_upload(file_path)
 
-    except Exception as e:
-        logger.error(f"❌ 圖片處理失敗: {upload_id} - {e}")
-        # 更新資料庫狀態為失敗
-        db.table("upload_queue").update({
-            "status": "failed",
-            "error_message": str(e)
-        }).eq("upload_id", upload_id).execute()
+        except Exception as e:
+            logger.error(f"❌ 圖片處理失敗: {upload_id} - {e}")
+            # 更新資料庫狀態為失敗
+            db.table("upload_queue").update({
+                "status": "failed",
+                "error_message": str(e)
+            }).eq("upload_id", upload_id).execute()
 
 
 @router.get("/process/{upload_id}")
@@ -161,7 +177,8 @@ async def get_processing_status(upload_id: str):
                         "description": "..."
                     },
                     // ... 11 more skills
-                ]
+                ],
+                "skill_ids": ["skill_52", ...]  // 技能配置，創建寶可夢時連同 upload_id 傳入
             }
         }
     """
@@ -196,6 +213,7 @@ async def get_processing_status(upload_id: str):
 
         # completed
         processed_data = record.get("processed_data", {})
+        skills = processed_data.get("skills", [])
         return {
             "success": True,
             "status": "completed",
@@ -204,7 +222,8 @@ async def get_processing_status(upload_id: str):
                 "back_image": processed_data.get("back_image"),
                 "type": processed_data.get("type"),
                 "type_chinese": processed_data.get("type_chinese"),
-                "skills": processed_data.get("skills", [])
+                "skills": skills,
+                "skill_ids": processed_data.get("skill_ids") or [skill["id"] for skill in skills]
             }
         }
 
@@ -215,23 +234,85 @@ async def get_processing_status(upload_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def resolve_skill_loadout(
+    db,
+    pokemon_type: str,
+    upload_id: Optional[str],
+    skill_ids: Optional[List[str]]
+) -> List[Dict[str, Any]]:
+    """
+    決定新寶可夢的技能配置
+
+    Args:
+        db: 資料庫客戶端
+        pokemon_type: 寶可夢屬性
+        upload_id: 上傳 ID（可選）
+        skill_ids: 客戶端指定的技能 ID（可選）
+
+    Returns:
+        技能字典列表
+
+    Raises:
+        HTTPException: 400（技能或屬性與上傳處理結果不符）/ 404（找不到上傳記錄）
+    """
+    skills_service = get_skills_service()
+
+    if not upload_id:
+        if skill_ids:
+            raise HTTPException(status_code=400, detail="指定技能配置時須提供 upload_id")
+        # 舊版客戶端：依屬性分配預設技能配置
+        return skills_service.get_skills_by_type(pokemon_type, count=12)
+
+    result = db.table("upload_queue").select("status, processed_data").eq("upload_id", upload_id).execute()
+    if not result.data:
+        raise HTTPException(status_code=404, detail="找不到此上傳記錄")
+
+    record = result.data[0]
+    processed_data = record.get("processed_data") or {}
+    if record.get("status") != "completed":
+        raise HTTPException(status_code=400, detail="上傳尚未處理完成")
+    if processed_data.get("type") != pokemon_type:
+        raise HTTPException(status_code=400, detail="屬性與上傳處理結果不符")
+
+    assigned = processed_data.get("skill_ids") or [skill["id"] for skill in processed_data.get("skills", [])]
+    if skill_ids:
+        unassigned = [skill_id for skill_id in skill_ids if skill_id not in assigned]
+        if unassigned:
+            raise HTTPException(status_code=400, detail=f"技能不在上傳時分配的技能配置中: {unassigned}")
+        assigned = skill_ids
+
+    skills = skills_service.get_skills(assigned)
+    if len(skills) != len(assigned):
+        raise HTTPException(status_code=400, detail="技能配置包含不存在的技能")
+    return skills
+
+
 @router.post("/create")
 async def create_pokemon(
     type: str,
     front_image: str,
     back_image: str,
     name: str = None,
-    user_id: str = None
+    user_id: str = None,
+    upload_id: Optional[str] = None,
+    skill_ids: Optional[List[str]] = Query(None)
 ):
     """
     創建寶可夢記錄到資料庫
 
+    技能配置由伺服器決定：
+    - 提供 upload_id：使用該上傳處理時分配的技能（屬性須與處理結果相同）
+    - 另外提供 skill_ids：須全部屬於該上傳分配的技能，否則拒絕
+    - 都未提供（舊版客戶端）：依屬性分配預設技能配置
+
     Args:
         type: 屬性（必填）
         front_image: 正面圖 (base64)（必填）
         back_image: 背面圖 (base64)（必填）
         name: 寶可夢名稱（可選，若不提供則自動生成，如"火寶"）
         user_id: 用戶 ID (可選)
+        upload_id: 上傳 ID（可選，用來取得上傳時分配的技能配置）
+        skill_ids: 技能配置（可選，須與 upload_id 一起提供）
 
     Returns:
         {
@@ -252,13 +333,16 @@ async def create_pokemon(
             name = f"{type_chinese}寶"
             logger.info(f"✨ 自動生成寶可夢名稱: {name} ({type}系)")
 
+        skills = resolve_skill_loadout(db, type, upload_id, skill_ids)
+
         # 插入資料
-        result = db.table("pokemon").insert({
+        pokemon = {
             "user_id": user_id,
             "name": name,
             "type": type,
             "front_image_url": front_image,
             "back_image_url": back_image,
+            "skill_ids": [skill["id"] for skill in skills],
             "stats": {
                 "hp": 100,
                 "attack": 50,
@@ -266,7 +350,16 @@ async def create_pokemon(
                 "speed": 50,
                 "level": 5
             }
-        }).execute()
+        }
+        try:
+            result = db.table("pokemon").insert(pokemon).execute()
+        except Exception as e:
+            # 尚未執行 005_pokemon_skill_loadout 遷移：不儲存技能配置（加入房間時依屬性分配）
+            if "skill_ids" not in str(e):
+                raise
+            logger.warning("⚠️  pokemon 資料表沒有 skill_ids 欄位（尚未執行 005 遷移），不儲存技能配置")
+            del pokemon["skill_ids"]
+            result = db.table("pokemon").insert(pokemon).execute()
 
         if result.data:
             pokemon = result.data[0]
@@ -278,6 +371,8 @@ async def create_pokemon(
         else:
             raise HTTPException(status_code=500, detail="創建失敗")
 
+    except HTTPException as he:
+        raise he
     except Exception as e:
         logger.error(f"❌ 創建寶可夢失敗: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -315,3 +410,62 @@ async def get_pokemon(pokemon_id: str):
     except Exception as e:
         logger.error(f"❌ 獲取寶可夢失敗: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{pokemon_id}/sprite/{side}")
+async def get_pokemon_sprite(
+    pokemon_id: str,
+    side: Literal["front", "back"],
+    request: Request
+):
+    """
+    獲取寶可夢圖片（正面或背面）
+
+    房間訊息中的成員只帶 sprite URL，客戶端依 URL 取得一次後即可快取。
+
+    Args:
+        pokemon_id: 寶可夢 ID
+        side: front 或 back
+
+    Returns:
+        圖片（image/png），附帶 ETag 與長期快取標頭
+    """
+    etag = f'"{pokemon_id}-{side}"'
+    headers = {"ETag": etag, "Cache-Control": SPRITE_CACHE_CONTROL}
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    cache_key = (pokemon_id, side)
+    cached = _sprite_cache.get(cache_key)
+    if cached:
+        _sprite_cache.move_to_end(cache_key)
+        media_type, image_bytes = cached
+        return Response(content=image_bytes, media_type=media_type, headers=headers)
+
+    column = "front_image_url" if side == "front" else "back_image_url"
+
+    try:
+        db = get_service_db()
+        result = db.table("pokemon").select(column).eq("id", pokemon_id).execute()
+    except Exception as e:
+        logger.error(f"❌ 獲取寶可夢圖片失敗: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if not result.data or not result.data[0].get(column):
+        raise HTTPException(status_code=404, detail="找不到此寶可夢圖片")
+
+    image_url = result.data[0][column]
+
+    # 舊資料可能儲存外部 URL
+    if not image_url.startswith("data:"):
+        return RedirectResponse(image_url, headers={"Cache-Control": SPRITE_CACHE_CONTROL})
+
+    media_type = image_url[5:].split(";", 1)[0] or "image/png"
+    image_bytes = ImageProcessor.from_base64(image_url)
+
+    _sprite_cache[cache_key] = (media_type, image_bytes)
+    if len(_sprite_cache) > SPRITE_CACHE_SIZE:
+        _sprite_cache.popitem(last=False)
+
+    return Response(content=image_bytes, media_type=media_type, headers=headers)
@@ -3,17 +3,30 @@
 提供房間創建、加入、WebSocket 連線等端點
 """
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException, Query
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException, Query, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 import logging
-import json
 import asyncio
+import random
 
 from app.websocket.manager import manager as ws_manager
-from app.websocket.room import room_manager, Room
+from app.websocket.room import room_manager, Room, GLOBAL_ROOM_CODE, is_global_room
+from app.websocket.raid import global_raid
+from app.websocket.spectator import spectator_hub
+from app.websocket.scheduler import turn_scheduler
+from app.websocket.supervisor import room_supervisor
+from app.websocket.messages import (
+    message_router, MessageContext, MessageDecodeError,
+    HeartbeatMessage, ReadyMessage, UseSkillMessage, ChatMessage
+)
 from app.services.boss_service import BossService, Boss
-from app.services.battle_service import BattleService
+from app.services import turn_engine
+from app.services.damage_table import BossDamageTable
+from app.services.boss_strategy import BossStrategy
+from app.services.prompt_evaluator_service import PromptBatcher
+from app.services.admission_service import require_capacity
 from app.database import get_service_db
 from app.config import settings
 
@@ -28,6 +41,10 @@ class CreateRoomRequest(BaseModel):
     """創建房間請求"""
     max_players: int = Field(default=4, ge=2, le=4, description="最大玩家數（2-4）")
     boss_base_hp: Optional[int] = Field(default=None, description="Boss 基礎血量")
+    batch_window_ms: Optional[int] = Field(
+        default=None, ge=0, le=200,
+        description="訊息批次窗口（毫秒），不指定則使用伺服器預設，0 = 停用"
+    )
 
 
 class CreateRoomResponse(BaseModel):
@@ -52,7 +69,7 @@ class RoomInfoResponse(BaseModel):
 
 # ===== REST API 端點 =====
 
-@router.post("/create", response_model=CreateRoomResponse)
+@router.post("/create", response_model=CreateRoomResponse, dependencies=[Depends(require_capacity)])
 async def create_room(request: CreateRoomRequest):
     """
     創建房間
@@ -66,6 +83,9 @@ async def create_room(request: CreateRoomRequest):
             boss_base_hp=request.boss_base_hp
         )
 
+        if request.batch_window_ms is not None:
+            ws_manager.set_batch_window(room.room_code, request.batch_window_ms)
+
         return CreateRoomResponse(
             success=True,
             room_code=room.room_code,
@@ -82,6 +102,9 @@ async def get_room_info(room_code: str):
     """
     獲取房間資訊
 
+    GLOBAL 分片另外附帶 raid：所有分片的總覽與各分片摘要
+    （GLOBAL 本身只是第一個分片，個別分片以分片代碼查詢，例如 GLOBAL-2）
+
     Args:
         room_code: 房間代碼
 
@@ -93,9 +116,13 @@ async def get_room_info(room_code: str):
     if not room:
         raise HTTPException(status_code=404, detail="房間不存在")
 
+    data = room.to_dict()
+    if is_global_room(room_code):
+        data["raid"] = global_raid.get_overview()
+
     return RoomInfoResponse(
         success=True,
-        data=room.to_dict()
+        data=data
     )
 
 
@@ -116,6 +143,34 @@ async def list_rooms():
     }
 
 
+@router.get("/{room_code}/spectate")
+async def spectate_room(room_code: str):
+    """
+    觀戰串流（Server-Sent Events，唯讀）
+
+    每個 tick 推送一次房間快照（event: snapshot），房間關閉時推送 event: end。
+    觀眾不需要寶可夢，也不佔用房間玩家名額。
+    GLOBAL 分片的快照附帶 raid（所有分片的總覽與各分片摘要），以分片代碼觀戰其他分片。
+
+    Args:
+        room_code: 房間代碼
+    """
+    if not room_manager.get_room(room_code):
+        raise HTTPException(status_code=404, detail="房間不存在")
+
+    if spectator_hub.get_viewer_count() >= settings.spectator_max_viewers:
+        raise HTTPException(status_code=503, detail="觀戰人數已達上限")
+
+    return StreamingResponse(
+        spectator_hub.subscribe(room_code),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # 避免反向代理緩衝
+        }
+    )
+
+
 # ===== WebSocket 端點 =====
 
 @router.websocket("/ws/{room_code}")
@@ -135,28 +190,42 @@ async def websocket_room(
     """
     connection_id = pokemon_id
 
-    # 檢查房間是否存在，不存在則創建
-    room = room_manager.get_room(room_code)
-    if not room:
-        logger.info(f"🎮 房間 {room_code} 不存在，嘗試創建...")
-        # 這裡可以選擇拒絕或自動創建
-        await websocket.close(code=4004, reason="房間不存在")
-        return
+    # GLOBAL 為邏輯房間：分配到人數最少的分片（保留名額直到加入完成）
+    reserved_shard = None
+    if room_code == GLOBAL_ROOM_CODE:
+        shard = await global_raid.assign()
+        if shard:
+            room_code = reserved_shard = shard.room_code
 
-    # 建立 WebSocket 連線
     try:
-        connection = await ws_manager.connect(
-            websocket, connection_id, room_code,
-            user_data={"player_name": player_name}
+        # 檢查房間是否存在，不存在則創建
+        room = room_manager.get_room(room_code)
+        if not room:
+            logger.info(f"🎮 房間 {room_code} 不存在，嘗試創建...")
+            # 這裡可以選擇拒絕或自動創建
+            await websocket.close(code=4004, reason="房間不存在")
+            return
+
+        # 建立 WebSocket 連線
+        try:
+            connection = await ws_manager.connect(
+                websocket, connection_id, room_code,
+                user_data={"player_name": player_name}
+            )
+        except Exception as e:
+            logger.error(f"❌ WebSocket 連線失敗: {e}")
+            return
+
+        if connection is None:
+            return
+
+        # 加入房間
+        joined_room = await room_manager.join_room(
+            room_code, connection_id, pokemon_id, player_name
         )
-    except Exception as e:
-        logger.error(f"❌ WebSocket 連線失敗: {e}")
-        return
-
-    # 加入房間
-    joined_room = await room_manager.join_room(
-        room_code, connection_id, pokemon_id, player_name
-    )
+    finally:
+        if reserved_shard:
+            global_raid.release(reserved_shard)
 
     if not joined_room:
         await ws_manager.disconnect(connection_id)
@@ -173,14 +242,10 @@ async def websocket_room(
     await broadcast_room_update(room_code)
 
     # GLOBAL 房間自動開始戰鬥（單人也可玩）
-    boss: Optional[Boss] = None
-    if room_code == "GLOBAL" and room.status == "waiting" and len(room.members) >= 1:
-        logger.info(f"🎮 GLOBAL 房間自動開始戰鬥（玩家數: {len(room.members)}）")
-        boss = await BossService.generate_boss(
-            player_count=len(room.members),
-            base_hp=room.boss_base_hp
-        )
-        await start_battle(room_code, room, boss)
+    if is_global_room(room_code):
+        await start_battle_if_ready(room_code, room)
+
+    context = MessageContext(websocket, connection_id, room_code, room)
 
     try:
         while True:
@@ -188,98 +253,22 @@ async def websocket_room(
             data = await websocket.receive_text()
 
             try:
-                message = json.loads(data)
-                message_type = message.get("type")
-
-                logger.debug(f"📩 收到訊息: {message_type} from {connection_id}")
-
-                # 更新心跳
-                ws_manager.update_heartbeat(connection_id)
-
-                # 處理不同類型的訊息
-                if message_type == "heartbeat":
-                    # 心跳回應
-                    await ws_manager.send_personal_message(connection_id, {
-                        "type": "heartbeat_ack"
-                    })
-
-                elif message_type == "ready":
-                    # 玩家準備
-                    is_ready = message.get("is_ready", True)
-                    room.set_member_ready(connection_id, is_ready)
-
-                    await broadcast_room_update(room_code)
-
-                    # 檢查是否可以開始戰鬥
-                    # GLOBAL 房間：有至少1人即可開始
-                    # 其他房間：需要所有人準備好
-                    can_start = False
-                    if room_code == "GLOBAL":
-                        can_start = len(room.members) >= 1 and any(m.is_ready for m in room.members.values())
-                    else:
-                        can_start = room.is_all_ready()
-
-                    if can_start and room.status == "waiting":
-                        logger.info(f"🎮 開始戰鬥: 房間 {room_code}，玩家數 {len(room.members)}")
-
-                        # 生成 Boss
-                        boss = await BossService.generate_boss(
-                            player_count=len(room.members),
-                            base_hp=room.boss_base_hp
-                        )
-
-                        # 開始戰鬥（啟動計時器）
-                        await start_battle(room_code, room, boss)
-
-                elif message_type == "use_skill":
-                    # 提交技能行動 (Phase 3&4 - 收集而非立即執行)
-                    if room.status != "battle":
-                        await ws_manager.send_personal_message(connection_id, {
-                            "type": "error",
-                            "message": "戰鬥尚未開始"
-                        })
-                        continue
-
-                    skill_id = message.get("skill_id")
-                    prompt = message.get("prompt", "")  # 玩家的戰術描述
-
-                    # 提交行動（儲存到 room.pending_actions）
-                    success = room.submit_action(connection_id, skill_id, prompt)
-
-                    if success:
-                        await ws_manager.send_personal_message(connection_id, {
-                            "type": "action_submitted",
-                            "message": "行動已提交！"
-                        })
-
-                        # 廣播更新
-                        await broadcast_room_update(room_code)
-                    else:
-                        await ws_manager.send_personal_message(connection_id, {
-                            "type": "error",
-                            "message": "提交行動失敗"
-                        })
-
-                elif message_type == "chat":
-                    # 聊天訊息
-                    chat_message = message.get("message", "")
-                    member = room.members.get(connection_id)
-
-                    await ws_manager.broadcast_to_room(room_code, {
-                        "type": "chat",
-                        "player": member.player_name if member else "Unknown",
-                        "message": chat_message
-                    })
-
-                else:
-                    logger.warning(f"⚠️  未知訊息類型: {message_type}")
-
-            except json.JSONDecodeError:
-                logger.error(f"❌ 無效的 JSON: {data}")
+                message = message_router.decode(data)
+            except MessageDecodeError as e:
+                logger.warning(f"⚠️  拒絕訊息 from {connection_id}: {e} ({e.message_type or '-'})")
                 await ws_manager.send_personal_message(connection_id, {
                     "type": "error",
-                    "message": "無效的訊息格式"
+                    "message": str(e)
                 })
+                continue
+
+            logger.debug(f"📩 收到訊息: {message.type} from {connection_id}")
+
+            # 更新心跳
+            ws_manager.update_heartbeat(connection_id)
+
+            # 交由對應的處理器處理
+            await message_router.dispatch(context, message)
 
     except WebSocketDisconnect:
         logger.info(f"🔌 WebSocket 斷線: {connection_id}")
@@ -290,18 +279,101 @@ async def websocket_room(
         await ws_manager.disconnect(connection_id)
         await room_manager.leave_room(room_code, connection_id)
 
-        # 清理計時器任務 (Phase 3)
-        if room and room.turn_timer_task:
-            room.turn_timer_task.cancel()
-            try:
-                await room.turn_timer_task
-            except asyncio.CancelledError:
-                pass
-            logger.info(f"⏹️ 計時器已清理")
+        # 房間清空時才停止回合（其他玩家斷線不影響進行中的戰鬥）
+        await room.actor.call(lambda: room_supervisor.on_member_left(room))
 
         await broadcast_room_update(room_code)
 
 
+# ===== WebSocket 訊息處理器 =====
+
+@message_router.handler(HeartbeatMessage)
+async def handle_heartbeat(ctx: MessageContext, message: HeartbeatMessage):
+    """心跳回應"""
+    await ws_manager.send_personal_message(ctx.connection_id, {
+        "type": "heartbeat_ack"
+    })
+
+
+@message_router.handler(ReadyMessage)
+async def handle_ready(ctx: MessageContext, message: ReadyMessage):
+    """玩家準備"""
+    room = ctx.room
+    await room.actor.call(lambda: room.set_member_ready(ctx.connection_id, message.is_ready))
+
+    await broadcast_room_update(ctx.room_code)
+
+    # 檢查與標記準備開始在同一個 Actor 命令中執行，不會重複開始
+    await start_battle_if_ready(ctx.room_code, room)
+
+
+@message_router.handler(UseSkillMessage)
+async def handle_use_skill(ctx: MessageContext, message: UseSkillMessage):
+    """提交技能行動 (Phase 3&4 - 收集而非立即執行)"""
+    room = ctx.room
+
+    def submit() -> Optional[Tuple[bool, bool, float]]:
+        """（Actor 命令）提交行動，返回 (是否成功, 是否所有人都已提交, 剩餘冷卻秒數)；不在戰鬥中返回 None"""
+        if room.status != "battle":
+            return None
+        cooldown = room.get_action_cooldown(ctx.connection_id)
+        if cooldown > 0:
+            return False, False, cooldown
+        success = room.submit_action(ctx.connection_id, message.skill_id, message.prompt)
+        if success and room.resolution_mode == "rolling":
+            # 連續結算：不等待其他玩家，排程下一個小批次
+            schedule_batch(ctx.room_code, room)
+            return success, False, 0.0
+        return success, success and room.is_all_actions_submitted(), 0.0
+
+    # 提交行動（儲存到 room.pending_actions）
+    submitted = await room.actor.call(submit)
+
+    if submitted is None:
+        await ws_manager.send_personal_message(ctx.connection_id, {
+            "type": "error",
+            "message": "戰鬥尚未開始"
+        })
+        return
+
+    success, all_submitted, cooldown = submitted
+    if cooldown > 0:
+        await ws_manager.send_personal_message(ctx.connection_id, {
+            "type": "error",
+            "message": "行動冷卻中，請稍後再提交",
+            "retry_after": round(cooldown, 2)
+        })
+    elif success:
+        await ws_manager.send_personal_message(ctx.connection_id, {
+            "type": "action_submitted",
+            "message": "行動已提交！"
+        })
+
+        # 廣播更新
+        await broadcast_room_update(ctx.room_code)
+
+        # 所有人都已提交：不必等到期限，立即結算
+        if all_submitted:
+            turn_scheduler.fire_now(ctx.room_code)
+    else:
+        await ws_manager.send_personal_message(ctx.connection_id, {
+            "type": "error",
+            "message": "提交行動失敗（技能不在你的技能配置中）"
+        })
+
+
+@message_router.handler(ChatMessage)
+async def handle_chat(ctx: MessageContext, message: ChatMessage):
+    """聊天訊息"""
+    member = ctx.room.members.get(ctx.connection_id)
+
+    await ws_manager.broadcast_to_room(ctx.room_code, {
+        "type": "chat",
+        "player": member.player_name if member else "Unknown",
+        "message": message.message
+    })
+
+
 # ===== 輔助函數 =====
 
 async def broadcast_room_update(room_code: str):
@@ -316,17 +388,137 @@ async def broadcast_room_update(room_code: str):
     })
 
 
-async def start_battle(room_code: str, room: Room, boss: Boss):
-    """開始戰鬥"""
-    if not room.start_battle():
-        return None
+def prepare_battle_start(room_code: str, room: Room) -> bool:
+    """
+    房間仍在等待且可以開始時標記為準備開始（Actor 命令）
 
-    # 開始第一回合
-    room.start_turn()
+    GLOBAL 房間：有至少 1 人準備即可開始；其他房間：需要所有人準備好
+
+    Returns:
+        是否由本次呼叫負責開始戰鬥（準備開始期間的其他呼叫返回 False）
+    """
+    if room.status != "waiting" or not room.members:
+        return False
 
+    if is_global_room(room_code):
+        can_start = any(m.is_ready for m in room.members.values())
+    else:
+        can_start = room.is_all_ready()
+
+    if not can_start:
+        return False
+
+    room.status = "ready"
+    return True
+
+
+def abort_battle_start(room: Room):
+    """Boss 生成失敗或被取消時回到等待狀態（Actor 命令）"""
+    if room.status == "ready":
+        room.status = "waiting"
+
+
+async def start_battle_if_ready(room_code: str, room: Room):
+    """
+    房間可以開始時生成 Boss 並開始戰鬥
+
+    Actor 命令只做檢查與狀態轉換；Boss 在 Actor 外生成（生成期間房間狀態為 ready，不會重複開始），
+    battle_start 在命令完成後廣播
+    """
+    if not await room.actor.call(lambda: prepare_battle_start(room_code, room)):
+        return
+
+    logger.info(f"🎮 開始戰鬥: 房間 {room_code}，玩家數 {len(room.members)}")
+
+    # 生成 Boss（GLOBAL 分片優先使用預先生成的 Boss）
+    boss = None
+    try:
+        if is_global_room(room_code):
+            boss = await global_raid.next_boss(room)
+        else:
+            boss = await BossService.generate_boss(
+                player_count=len(room.members),
+                base_hp=room.boss_base_hp
+            )
+    finally:
+        if boss is None:
+            room.actor.tell(lambda: abort_battle_start(room))
+
+    # 開始戰鬥（排程第一回合）
+    if await room.actor.call(lambda: start_battle(room_code, room, boss)):
+        await broadcast_battle_start(room_code, room, boss)
+
+
+def start_battle(room_code: str, room: Room, boss: Boss) -> bool:
+    """
+    開始戰鬥並排程第一回合（Actor 命令）
+
+    Args:
+        room_code: 房間代碼
+        room: 房間
+        boss: Boss 實體
+
+    Returns:
+        是否已開始（生成 Boss 期間房間已清空或已開始其他戰鬥時返回 False）
+    """
+    if room.status not in ("waiting", "ready") or not room.start_battle():
+        abort_battle_start(room)
+        return False
+
+    # Room 的 Boss 血量與 Boss 實體同步（room_update / 觀戰快照使用）
+    room.boss_max_hp = boss.max_hp
+    room.boss_hp = boss.current_hp
+
+    # Boss 由房間持有，停止戰鬥或回收房間時釋放
+    room_supervisor.attach_boss(room, boss)
+
+    # Boss 與成員的屬性值在戰鬥中固定，先算好 Boss 技能對每名成員的傷害與目標優先度
+    room_state, boss_state = build_turn_state(room, boss)
+    get_boss_strategy(room, room_state, boss_state)
+
+    # 提交行動時即在背景評分與計算傷害（同一窗口內的 Prompt 合併評分），完成後立即公開該玩家的分數
+    room.close_prompt_batcher()
+    room.prompt_batcher = PromptBatcher(clock=room.clock)
+    room.action_evaluator = lambda connection_id, skill, prompt: precompute_and_reveal(
+        room_code, room, connection_id, skill, prompt
+    )
+
+    # GLOBAL 分片：戰鬥期間在背景預先生成下一隻 Boss
+    if is_global_room(room_code):
+        global_raid.prefetch_boss(room)
+
+    if room.resolution_mode == "rolling":
+        # 行動提交後以小批次結算，Boss 依自己的節奏反擊（連續結算模式沒有回合計時）
+        schedule_boss_attack(room_code, room)
+        logger.info(f"⏱️ 房間 {room_code} 連續結算已啟動")
+    else:
+        # 開始並排程第一回合結算 (Phase 3)
+        room.start_turn()
+        schedule_turn(room_code, room)
+        logger.info(f"⏱️ 房間 {room_code} 回合已排程")
+
+    return True
+
+
+async def broadcast_battle_start(
+    room_code: str,
+    room: Room,
+    boss: Boss,
+    announcement: Optional[Dict[str, Any]] = None
+):
+    """
+    廣播 battle_start（在 start_battle 命令完成後呼叫）
+
+    Args:
+        room_code: 房間代碼
+        room: 房間
+        boss: Boss 實體
+        announcement: 取代 battle_start 的開場訊息欄位（Boss 輪替時使用 boss_rotate）
+    """
     await ws_manager.broadcast_to_room(room_code, {
         "type": "battle_start",
         "message": "戰鬥開始！",
+        **(announcement or {}),
         "boss": {
             "name": boss.name,
             "type": boss.type,
@@ -336,254 +528,655 @@ async def start_battle(room_code: str, room: Room, boss: Boss):
         "room": room.to_dict()
     })
 
-    # 啟動回合計時器 (Phase 3)
-    timer_task = asyncio.create_task(turn_timer_loop(room_code, room, boss))
-    room.turn_timer_task = timer_task
 
-    logger.info(f"⏱️ 房間 {room_code} 計時器已啟動")
+# handle_player_attack 已被 process_turn_actions 取代 (批次處理)
 
-    return timer_task
 
+def calculate_action_damage(boss: Boss, skill: Dict[str, Any], prompt_multiplier: float) -> Dict[str, Any]:
+    """計算單一行動對 Boss 的傷害"""
+    damage, effectiveness, message = turn_engine.player_attack_damage(skill, boss.type, prompt_multiplier)
+    return {
+        "prompt_multiplier": prompt_multiplier,
+        "damage": damage,
+        "effectiveness": effectiveness,
+        "message": message
+    }
 
-# handle_player_attack 已被 process_turn_actions 取代 (批次處理)
 
+async def precompute_action(
+    batcher: PromptBatcher,
+    connection_id: str,
+    boss: Boss,
+    skill: Dict[str, Any],
+    prompt: str
+) -> Dict[str, Any]:
+    """
+    預先評分 Prompt 並計算傷害（玩家提交行動時於背景執行）
 
-async def handle_boss_turn(room_code: str, room: Room, boss: Boss):
-    """處理 Boss 回合"""
-    # 獲取所有玩家作為目標
-    targets = [
-        {
-            "id": member.connection_id,
-            "name": member.player_name,
-            "type": member.pokemon_data.get("type", "normal"),
-            "stats": member.pokemon_data.get("stats", {}),
-            "hp": member.current_hp,
-            "max_hp": member.max_hp
-        }
-        for member in room.members.values()
-    ]
+    Prompt 排入房間的評分微批次，與同一窗口內提交的 Prompt 合併為一個評分請求。
 
-    # Boss 行動
-    result = await BossService.boss_turn(boss, targets)
+    Args:
+        batcher: 房間的 Prompt 微批次
+        connection_id: 玩家 ID
+        boss: Boss 實體
+        skill: 技能
+        prompt: 玩家的戰術描述
 
-    if not result.get("success"):
-        return
+    Returns:
+        {prompt_multiplier, damage, effectiveness, message}
+    """
+    prompt_multiplier = await batcher.score(
+        connection_id,
+        player_prompt=prompt,
+        skill_name=skill["name"],
+        skill_type=skill["type"],
+        boss_name=boss.name,
+        boss_type=boss.type
+    )
 
-    # 扣除玩家 HP (Phase 5)
-    target_id = result["target"]["id"]
-    if target_id in room.members:
-        member = room.members[target_id]
-        member.current_hp = max(0, member.current_hp - result["damage"])
+    return calculate_action_damage(boss, skill, prompt_multiplier)
 
-        # 檢查玩家是否被擊敗
-        if member.current_hp == 0:
-            logger.warning(f"⚠️ 玩家 {member.player_name} 被擊敗！")
 
-    # 廣播 Boss 動作
-    await ws_manager.broadcast_to_room(room_code, {
-        "type": "battle_action",
-        "data": {
-            "actor": boss.name,
-            "action": "attack",
-            "skill": result["skill"]["name"],
-            "target": result["target"]["name"],
-            "damage": result["damage"],
-            "target_hp": room.members[target_id].current_hp if target_id in room.members else 0,
-            "effectiveness": result["effectiveness"],
-            "message": f"{boss.name} 使用了 {result['skill']['name']}！{result['message']}"
-        }
-    })
+async def precompute_and_reveal(
+    room_code: str,
+    room: Room,
+    connection_id: str,
+    skill: Dict[str, Any],
+    prompt: str
+) -> Dict[str, Any]:
+    """
+    預先評分並在完成時立即廣播該玩家的分數與預估傷害（score_revealed）
 
-    # 檢查是否所有玩家都被擊敗 (Phase 5)
-    all_defeated = all(member.current_hp == 0 for member in room.members.values())
-    if all_defeated:
-        room.status = "finished"
+    每位玩家的結果依評分完成的順序送出，不必等待最慢的評分；
+    Boss 血量仍在回合結算時一次套用。
+
+    Returns:
+        precompute_action 的結果
+    """
+    result = await precompute_action(room.prompt_batcher, connection_id, room.boss, skill, prompt)
+
+    member = room.members.get(connection_id)
+    try:
         await ws_manager.broadcast_to_room(room_code, {
-            "type": "battle_end",
-            "result": "lose",
-            "message": "💀 全軍覆沒！挑戰失敗..."
+            "type": "score_revealed",
+            "data": {
+                "turn": room.current_turn,
+                "player_id": connection_id,
+                "player": member.player_name if member else None,
+                "skill": skill["name"],
+                "prompt_score": int(result["prompt_multiplier"] * 100),
+                "damage_preview": result["damage"],
+                "effectiveness": result["effectiveness"],
+                "message": result["message"]
+            }
         })
-        return True  # 返回 True 表示戰鬥結束
-
-    return False  # 返回 False 表示戰鬥繼續
+    except Exception as e:
+        # 公開失敗不影響結算
+        logger.error(f"❌ 廣播評分結果失敗: {e}")
+
+    return result
+
+
+def build_turn_state(room: Room, boss: Boss) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """將 Room / Boss 轉換為回合引擎的輸入狀態"""
+    room_state = {
+        "turn": room.current_turn,
+        "members": {
+            member_id: {
+                "name": member.player_name,
+                "type": member.pokemon_data.get("type", "normal"),
+                "stats": member.pokemon_data.get("stats", {}),
+                "hp": member.current_hp,
+                "max_hp": member.max_hp
+            }
+            for member_id, member in room.members.items()
+        }
+    }
+    boss_state = {
+        "name": boss.name,
+        "type": boss.type,
+        "level": boss.level,
+        "attack": boss.attack,
+        "defense": boss.defense,
+        "hp": boss.current_hp,
+        "max_hp": boss.max_hp,
+        "skills": boss.skills
+    }
+    return room_state, boss_state
+
+
+def get_boss_strategy(
+    room: Room,
+    room_state: Dict[str, Any],
+    boss_state: Dict[str, Any]
+) -> BossStrategy:
+    """這場戰鬥的 Boss 策略與傷害表（成員變動後重建；成員 HP 由 apply_turn_outcome 逐一更新）"""
+    members = room_state["members"]
+    strategy = room.boss_strategy
+    if strategy is None or not strategy.covers(members):
+        strategy = BossStrategy(BossDamageTable(boss_state, members), members)
+        room.boss_strategy = strategy
+    return strategy
+
+
+def apply_turn_outcome(room: Room, boss: Boss, outcome: turn_engine.TurnOutcome):
+    """將回合引擎的結果寫回 Room / Boss"""
+    boss.current_hp = outcome.boss_state["hp"]
+    room.boss_hp = boss.current_hp
+    room.current_turn = outcome.room_state["turn"]
+
+    for member_id, state in outcome.room_state["members"].items():
+        member = room.members.get(member_id)
+        if member is None:
+            continue
+        if member.current_hp > 0 and state["hp"] == 0:
+            logger.warning(f"⚠️ 玩家 {member.player_name} 被擊敗！")
+        member.current_hp = state["hp"]
+        if room.boss_strategy is not None:
+            room.boss_strategy.update_hp(member_id, state["hp"])
 
+    if outcome.result:
+        room.status = "finished"
 
-async def process_turn_actions(room_code: str, room: Room, boss: Boss):
-    """
-    批次處理所有玩家的回合行動 (Phase 3&4)
 
-    流程:
-    1. 為所有行動評分 Prompt
-    2. 計算所有傷害
-    3. 廣播所有玩家攻擊結果
-    4. Boss 反擊
+def close_turn(room: Room) -> Tuple[int, Dict[str, Dict[str, Any]], Dict[str, asyncio.Task]]:
     """
-    from app.services.prompt_evaluator_service import get_prompt_evaluator
-    from app.services.skills_service import get_skills_service
+    關閉本回合（Actor 命令）
 
-    logger.info(f"⚔️ 開始處理回合 {room.current_turn + 1} 的所有行動...")
+    超時的玩家自動使用預設技能（無 Prompt 獎勵），並取出所有行動與背景工作；
+    之後提交的行動計入下一回合。
 
-    # 處理超時的玩家（使用第一個技能，無 Prompt 獎勵）
-    skills_service = get_skills_service()
+    Returns:
+        (回合數, 行動 {member_id: {skill, prompt}}, 背景工作)
+    """
     for member_id in room.get_pending_player_ids():
         member = room.members.get(member_id)
         if not member:
             continue
 
-        # 獲取該屬性的第一個技能
-        pokemon_type = member.pokemon_data.get("type", "normal")
-        skills = skills_service.get_skills_by_type(pokemon_type, count=1)
+        room.submit_action(member_id, member.default_skill["id"], prompt="")
+        logger.warning(f"⏰ 玩家 {member.player_name} 超時，自動使用技能 {member.default_skill['name']}")
 
-        if skills:
-            default_skill_id = skills[0]["id"]
-            room.submit_action(member_id, default_skill_id, prompt="")
-            logger.warning(f"⏰ 玩家 {member.player_name} 超時，自動使用技能 {skills[0]['name']}")
+    pending, jobs = room.take_actions()
 
-    # 1. 評分所有 Prompt 並計算傷害
-    evaluator = get_prompt_evaluator()
-    player_actions = []
+    # 技能在提交時已從技能配置中查出
+    actions = {
+        member_id: {"skill": action["skill"], "prompt": action.get("prompt", "")}
+        for member_id, action in pending.items()
+        if member_id in room.members
+    }
+    return room.current_turn, actions, jobs
 
-    for member_id, action in room.pending_actions.items():
-        member = room.members.get(member_id)
-        if not member:
-            continue
 
-        # 獲取技能資料
-        skill_id = action["skill_id"]
-        prompt = action.get("prompt", "")
+def settle_turn(
+    room: Room,
+    boss: Boss,
+    actions: Dict[str, Dict[str, Any]],
+    scores: Dict[str, float],
+    seed: int
+) -> Optional[turn_engine.TurnOutcome]:
+    """
+    以回合引擎結算並寫回 Room / Boss（Actor 命令）
 
-        # TODO: 從資料庫獲取真實技能，目前使用 skills_service
-        skills = skills_service.get_skills_by_type(
-            member.pokemon_data.get("type", "normal"),
-            count=12
-        )
-        skill = next((s for s in skills if s["id"] == skill_id), None)
-
-        if not skill:
-            # 使用預設技能
-            skill = {"id": skill_id, "name": "撞擊", "type": "normal", "power": 40}
-
-        # 評分 Prompt
-        prompt_multiplier = await evaluator.evaluate_prompt(
-            player_prompt=prompt,
-            skill_name=skill["name"],
-            skill_type=skill["type"],
-            boss_name=boss.name,
-            boss_type=boss.type
-        )
+    Returns:
+        TurnOutcome；評分期間戰鬥已停止（例如房間清空）返回 None
+    """
+    if room.status != "battle" or room.boss is not boss:
+        return None
 
-        # 計算傷害
-        damage, effectiveness, message = BattleService.calculate_damage(
-            skill_power=skill["power"],
-            skill_type=skill["type"],
-            defender_type=boss.type,
-            prompt_multiplier=prompt_multiplier
-        )
+    room_state, boss_state = build_turn_state(room, boss)
+    outcome = turn_engine.resolve_turn(
+        room_state, boss_state, actions, scores,
+        seed=seed,
+        strategy=get_boss_strategy(room, room_state, boss_state)
+    )
+    apply_turn_outcome(room, boss, outcome)
+    return outcome
 
-        player_actions.append({
-            "member_id": member_id,
-            "member": member,
-            "skill": skill,
-            "prompt": prompt,
-            "prompt_multiplier": prompt_multiplier,
-            "damage": damage,
-            "effectiveness": effectiveness,
-            "message": message
-        })
 
-    # 2. 對 Boss 造成所有傷害
-    total_damage = sum(action["damage"] for action in player_actions)
-    boss.current_hp = max(0, boss.current_hp - total_damage)
+def build_turn_resolved(
+    room: Room,
+    boss: Boss,
+    turn: int,
+    seed: int,
+    outcome: turn_engine.TurnOutcome
+) -> Dict[str, Any]:
+    """
+    組成 turn_resolved 訊息內容
 
-    logger.info(f"💥 總傷害: {total_damage}，Boss 剩餘 HP: {boss.current_hp}/{boss.max_hp}")
+    連續結算模式的 actions_resolved（小批次）與 boss_attack（Boss 反擊）使用相同格式
+    """
+    player_events = outcome.player_events
 
-    # 3. 廣播所有玩家的攻擊結果
-    for action in player_actions:
-        await ws_manager.broadcast_to_room(room_code, {
-            "type": "battle_action",
-            "data": {
-                "actor": action["member"].player_name,
-                "action": "attack",
-                "skill": action["skill"]["name"],
-                "prompt": action["prompt"],
-                "prompt_score": int(action["prompt_multiplier"] * 100),  # 0-50
-                "damage": action["damage"],
-                "boss_hp": boss.current_hp,
-                "boss_max_hp": boss.max_hp,
-                "effectiveness": action["effectiveness"],
-                "message": f"{action['member'].player_name} 使用了 {action['skill']['name']}！{action['message']} (Prompt獎勵: {int(action['prompt_multiplier']*100)}%)"
+    boss_event = outcome.boss_event
+    boss_action = None
+    if boss_event:
+        boss_action = {"action": "attack", **{k: v for k, v in boss_event.items() if k != "type"}}
+
+    return {
+        "turn": turn,
+        "seed": seed,
+        "actions": [
+            {"action": "attack", **{k: v for k, v in event.items() if k != "type"}}
+            for event in player_events
+        ],
+        "boss_action": boss_action,
+        "total_damage": sum(event["damage"] for event in player_events),
+        "boss_hp": boss.current_hp,
+        "boss_max_hp": boss.max_hp,
+        "members": [
+            {
+                "id": member.connection_id,
+                "name": member.player_name,
+                "hp": member.current_hp,
+                "max_hp": member.max_hp
             }
-        })
+            for member in room.members.values()
+        ],
+        "result": outcome.result
+    }
 
-        # 稍微延遲讓前端能依序顯示
-        await asyncio.sleep(0.5)
 
-    # 檢查是否擊敗 Boss (Phase 5)
-    if boss.current_hp == 0:
-        room.status = "finished"
+async def process_turn_actions(room_code: str, room: Room, boss: Boss) -> Optional[bool]:
+    """
+    批次處理所有玩家的回合行動 (Phase 3&4)
+
+    流程:
+    1. 關閉本回合，取出所有行動（Actor 命令）
+    2. 收集提交時已開始的 Prompt 評分（受 turn_resolution_deadline 限制，不佔用 Actor）：
+       逾期的評分已經送出過 AI 請求，改用本地預設倍率；沒有評分工作或工作失敗者
+       以保留的 turn_fallback_budget 批次補評分
+    3. 以回合引擎結算（玩家攻擊、Boss 反擊、勝負判定）並寫回狀態（Actor 命令）
+    4. 以單一 turn_resolved 訊息廣播整個回合結果（動畫節奏由客戶端控制）
+
+    Returns:
+        戰鬥是否結束；評分期間戰鬥已停止返回 None
+    """
+    from app.services.prompt_evaluator_service import get_prompt_evaluator
+
+    # 1. 關閉本回合
+    turn, actions, jobs = await room.actor.call(lambda: close_turn(room))
+    logger.info(f"⚔️ 開始處理回合 {turn + 1} 的所有行動...")
+
+    # 2. 收集提交時已開始的評分（有期限，期限的最後 turn_fallback_budget 秒保留給補評分）
+    clock = room.clock
+    deadline = clock.now() + settings.turn_resolution_deadline
+    fallback_budget = min(settings.turn_fallback_budget, settings.turn_resolution_deadline)
+    precomputed = await Room.collect_action_results(
+        jobs,
+        timeout=settings.turn_resolution_deadline - fallback_budget,
+        clock=clock
+    )
+    scores = {
+        member_id: result["prompt_multiplier"]
+        for member_id, result in precomputed.items()
+        if member_id in actions
+    }
+
+    evaluator = get_prompt_evaluator()
+
+    # 逾期被取消的評分（取消後尚未執行到的工作仍是未完成狀態）：AI 請求已送出過，
+    # 不再重送（避免同一個 Prompt 評分兩次），使用本地預設倍率
+    for member_id, job in jobs.items():
+        timed_out = not job.done() or job.cancelled()
+        if timed_out and member_id in actions and member_id not in scores:
+            scores[member_id] = evaluator.local_score(actions[member_id]["prompt"])
+
+    # 其餘沒有預先結果者（未設定評分工作或工作失敗）在剩餘期限內批次評分，逾期者使用預設倍率
+    missing = {member_id: action for member_id, action in actions.items() if member_id not in scores}
+    if missing:
+        scores.update(await evaluator.evaluate_turn(
+            {
+                member_id: {
+                    "player_prompt": action["prompt"],
+                    "skill_name": action["skill"]["name"],
+                    "skill_type": action["skill"]["type"],
+                    "boss_name": boss.name,
+                    "boss_type": boss.type
+                }
+                for member_id, action in missing.items()
+            },
+            timeout=max(fallback_budget, deadline - clock.now())
+        ))
+
+    # 3. 結算
+    seed = random.getrandbits(32)
+
+    def settle() -> Optional[Dict[str, Any]]:
+        outcome = settle_turn(room, boss, actions, scores, seed)
+        if outcome is None:
+            return None
+        return build_turn_resolved(room, boss, turn, seed, outcome)
+
+    data = await room.actor.call(settle)
+    if data is None:
+        return None
+
+    logger.info(f"💥 總傷害: {data['total_damage']}，Boss 剩餘 HP: {data['boss_hp']}/{data['boss_max_hp']}")
+
+    # 4. 廣播整個回合結果
+    await ws_manager.broadcast_to_room(room_code, {
+        "type": "turn_resolved",
+        "data": data
+    })
+
+    # 返回 True 表示戰鬥結束
+    return await broadcast_battle_end(room_code, data["result"])
+
+
+async def broadcast_battle_end(room_code: str, result: Optional[str]) -> bool:
+    """
+    戰鬥結束時廣播 battle_end
+
+    Returns:
+        戰鬥是否結束
+    """
+    if result == "win":
         await ws_manager.broadcast_to_room(room_code, {
             "type": "battle_end",
             "result": "win",
             "message": "🎉 恭喜！Boss 被擊敗了！"
         })
-        return True  # 返回 True 表示戰鬥結束
-
-    # 4. Boss 反擊
-    battle_ended = await handle_boss_turn(room_code, room, boss)
+        return True
 
-    if battle_ended:
+    if result == "lose":
+        await ws_manager.broadcast_to_room(room_code, {
+            "type": "battle_end",
+            "result": "lose",
+            "message": "💀 全軍覆沒！挑戰失敗..."
+        })
         return True
 
-    # 回合結束
-    room.current_turn += 1
     return False
 
 
-async def turn_timer_loop(room_code: str, room: Room, boss: Boss):
+def schedule_turn(room_code: str, room: Room):
+    """排程本回合的結算（期限到達，或所有玩家提交後立即觸發）"""
+    turn_scheduler.schedule(
+        room_code,
+        room.get_remaining_time(),
+        lambda: resolve_turn(room_code, room)
+    )
+
+
+async def end_battle(room_code: str, room: Room, task: asyncio.Task):
+    """
+    戰鬥結束後的處理
+
+    GLOBAL 分片換上下一隻 Boss 繼續戰鬥；其他房間釋放 Boss 與剩餘的評分工作，
+    由 RoomSupervisor 在保留時間後回收。
+
+    Args:
+        room_code: 房間代碼
+        room: 房間
+        task: 發出結算的任務（不會被取消）
+    """
+    if is_global_room(room_code):
+        await rotate_boss(room_code, room, task)
+        return
+
+    await room.actor.call(lambda: room_supervisor.stop_battle(room_code, keep=task))
+
+
+async def rotate_boss(room_code: str, room: Room, task: asyncio.Task):
+    """
+    GLOBAL 分片的 Boss 輪替：取得預先生成的下一隻 Boss，所有成員回滿血量後立即開始新戰鬥
+
+    以 boss_rotate 訊息（格式同 battle_start）通知客戶端。
+    """
+    previous = room.boss
+    boss = await global_raid.next_boss(room)
+
+    def swap() -> Optional[Dict[str, Any]]:
+        # 等待期間房間已清空重設或已開始新戰鬥
+        if previous is None or room.status != "finished" or room.boss is not previous or not room.members:
+            return None
+
+        room_supervisor.stop_battle(room_code, keep=task)
+        room.reset()
+        for member in room.members.values():
+            member.current_hp = member.max_hp
+            member.is_ready = True
+
+        if not start_battle(room_code, room, boss):
+            return None
+
+        message = f"{boss.name} 出現了！"
+        if previous.current_hp == 0:
+            message = f"{previous.name} 被擊敗了！{message}"
+
+        return {
+            "type": "boss_rotate",
+            "message": message,
+            "previous_boss": previous.name
+        }
+
+    announcement = await room.actor.call(swap)
+    if announcement is None:
+        return
+
+    await broadcast_battle_start(room_code, room, boss, announcement=announcement)
+    logger.info(f"🔁 {room_code} Boss 輪替: {previous.name} → {boss.name}")
+
+
+def begin_next_turn(room_code: str, room: Room, boss: Boss) -> Optional[Dict[str, Any]]:
+    """
+    開始新回合並排程結算（Actor 命令）
+
+    Returns:
+        new_turn 訊息內容；戰鬥已停止返回 None
+    """
+    if room.status != "battle" or room.boss is not boss:
+        return None
+
+    room.start_turn()
+    schedule_turn(room_code, room)
+
+    return {
+        "turn": room.current_turn,
+        "boss_hp": boss.current_hp,
+        "boss_max_hp": boss.max_hp,
+        "remaining_time": room.get_remaining_time(),
+        "duration": room.turn_duration
+    }
+
+
+async def resolve_turn(room_code: str, room: Room):
     """
-    回合計時器循環 (Phase 3)
+    結算回合 (Phase 3)
 
-    每秒廣播剩餘時間，30秒到時自動處理行動
+    由回合排程器觸發：處理所有行動，戰鬥未結束則開始新回合並排程下一次結算。
+    狀態修改都經由房間 Actor 執行，與玩家提交、加入、離開依序進行。
     """
+    task = asyncio.current_task()
+    room_supervisor.track(room_code, task)
+
     try:
-        while room.status == "battle":
-            remaining = room.get_remaining_time()
-
-            # 廣播剩餘時間
-            await ws_manager.broadcast_to_room(room_code, {
-                "type": "turn_timer",
-                "data": {
-                    "remaining_time": remaining,
-                    "current_turn": room.current_turn,
-                    "pending_count": len(room.get_pending_player_ids())
-                }
-            })
-
-            # 檢查是否時間到或所有人都已提交
-            if remaining <= 0 or room.is_all_actions_submitted():
-                # 處理所有行動
-                battle_ended = await process_turn_actions(room_code, room, boss)
-
-                if battle_ended:
-                    break
-
-                # 開始新回合
-                room.start_turn()
-
-                # 廣播新回合開始
-                await ws_manager.broadcast_to_room(room_code, {
-                    "type": "new_turn",
-                    "data": {
-                        "turn": room.current_turn,
-                        "boss_hp": boss.current_hp,
-                        "boss_max_hp": boss.max_hp
-                    }
-                })
+        boss = room.boss
+        if room.status != "battle" or boss is None:
+            return
+
+        # 處理所有行動
+        battle_ended = await process_turn_actions(room_code, room, boss)
+
+        if battle_ended is None:
+            return
+
+        if battle_ended:
+            await end_battle(room_code, room, task)
+            return
+
+        # 開始新回合
+        data = await room.actor.call(lambda: begin_next_turn(room_code, room, boss))
+        if data is None:
+            return
+
+        # 廣播新回合開始（客戶端依 remaining_time 自行倒數）
+        await ws_manager.broadcast_to_room(room_code, {
+            "type": "new_turn",
+            "data": data
+        })
+
+        # 結算期間所有人都已提交下一回合的行動：立即結算
+        if room.pending_actions and room.is_all_actions_submitted():
+            turn_scheduler.fire_now(room_code)
+
+    except asyncio.CancelledError:
+        logger.info(f"⏹️ 房間 {room_code} 回合結算已停止")
+    except Exception as e:
+        logger.error(f"❌ 回合結算錯誤: {e}")
+
+
+# ===== 連續結算模式（大型房間） =====
+
+def schedule_batch(room_code: str, room: Room):
+    """排程下一個小批次結算（已排程則不重複）"""
+    key = f"{room_code}:batch"
+    if key in turn_scheduler.entries:
+        return
+
+    turn_scheduler.schedule(
+        key,
+        settings.rolling_batch_interval_ms / 1000,
+        lambda: resolve_batch(room_code, room)
+    )
+
+
+def schedule_boss_attack(room_code: str, room: Room):
+    """排程 Boss 的下一次反擊"""
+    turn_scheduler.schedule(
+        f"{room_code}:boss",
+        settings.rolling_boss_interval,
+        lambda: resolve_boss_attack(room_code, room)
+    )
+
+
+def close_batch(room_code: str, room: Room) -> Tuple[int, Dict[str, Dict[str, Any]], Dict[str, asyncio.Task]]:
+    """
+    取出評分已完成（或已逾期）的行動（Actor 命令）
+
+    仍在評分的行動留到下一個小批次。
+
+    Returns:
+        (回合數, 行動 {member_id: {skill, prompt}}, 背景工作)
+    """
+    pending, jobs = room.take_actions(room.get_ready_action_ids(settings.turn_resolution_deadline))
+
+    if room.pending_actions:
+        schedule_batch(room_code, room)
+
+    actions = {
+        member_id: {"skill": action["skill"], "prompt": action.get("prompt", "")}
+        for member_id, action in pending.items()
+        if member_id in room.members
+    }
+    return room.current_turn, actions, jobs
+
+
+async def resolve_batch(room_code: str, room: Room):
+    """
+    連續結算一個小批次的玩家行動
+
+    由回合排程器觸發：只結算評分已完成的行動，Boss 不在這裡反擊。
+    評分失敗或逾期者使用本地評分。
+    """
+    from app.services.prompt_evaluator_service import get_prompt_evaluator
+
+    task = asyncio.current_task()
+    room_supervisor.track(room_code, task)
+
+    try:
+        boss = room.boss
+        if room.status != "battle" or boss is None:
+            return
+
+        turn, actions, jobs = await room.actor.call(lambda: close_batch(room_code, room))
+        if not actions:
+            return
+
+        # 背景評分已完成，不再等待
+        precomputed = await Room.collect_action_results(jobs, timeout=0, clock=room.clock)
+        evaluator = get_prompt_evaluator()
+        scores = {
+            member_id: (
+                precomputed[member_id]["prompt_multiplier"]
+                if member_id in precomputed
+                else evaluator.local_score(action["prompt"])
+            )
+            for member_id, action in actions.items()
+        }
+
+        def settle() -> Optional[Dict[str, Any]]:
+            if room.status != "battle" or room.boss is not boss:
+                return None
+            room_state, boss_state = build_turn_state(room, boss)
+            outcome = turn_engine.resolve_player_actions(room_state, boss_state, actions, scores)
+            apply_turn_outcome(room, boss, outcome)
+            return build_turn_resolved(room, boss, turn, None, outcome)
+
+        data = await room.actor.call(settle)
+        if data is None:
+            return
+
+        await ws_manager.broadcast_to_room(room_code, {
+            "type": "actions_resolved",
+            "data": data
+        })
+
+        if await broadcast_battle_end(room_code, data["result"]):
+            await end_battle(room_code, room, task)
+
+    except asyncio.CancelledError:
+        logger.info(f"⏹️ 房間 {room_code} 小批次結算已停止")
+    except Exception as e:
+        logger.error(f"❌ 小批次結算錯誤: {e}")
+
+
+async def resolve_boss_attack(room_code: str, room: Room):
+    """
+    連續結算模式的 Boss 反擊
+
+    由回合排程器依 rolling_boss_interval 觸發：Boss 攻擊一名隨機玩家（回合數 +1），
+    戰鬥未結束則排程下一次反擊。
+    """
+    task = asyncio.current_task()
+    room_supervisor.track(room_code, task)
+
+    try:
+        boss = room.boss
+        if room.status != "battle" or boss is None:
+            return
+
+        seed = random.getrandbits(32)
+
+        def settle() -> Optional[Dict[str, Any]]:
+            if room.status != "battle" or room.boss is not boss:
+                return None
+            turn = room.current_turn
+            room_state, boss_state = build_turn_state(room, boss)
+            outcome = turn_engine.resolve_boss_attack(
+                room_state, boss_state,
+                seed=seed,
+                strategy=get_boss_strategy(room, room_state, boss_state)
+            )
+            apply_turn_outcome(room, boss, outcome)
+            if not outcome.result:
+                schedule_boss_attack(room_code, room)
+            return build_turn_resolved(room, boss, turn, seed, outcome)
+
+        data = await room.actor.call(settle)
+        if data is None:
+            return
+
+        await ws_manager.broadcast_to_room(room_code, {
+            "type": "boss_attack",
+            "data": data
+        })
 
-            # 每秒更新一次
-            await asyncio.sleep(1)
+        if await broadcast_battle_end(room_code, data["result"]):
+            await end_battle(room_code, room, task)
 
     except asyncio.CancelledError:
-        logger.info(f"⏹️ 房間 {room_code} 計時器已停止")
+        logger.info(f"⏹️ 房間 {room_code} Boss 反擊已停止")
     except Exception as e:
-        logger.error(f"❌ 計時器錯誤: {e}")
+        logger.error(f"❌ Boss 反擊錯誤: {e}")
@@ -3,11 +3,12 @@
 提供技能查詢功能
 """
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
 from typing import List, Dict
 import logging
 
 from app.services.skills_service import get_skills_service
+from app.services.reference_cache import get_reference_cache
 
 logger = logging.getLogger(__name__)
 
@@ -74,11 +75,41 @@ async def get_skills(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def build_skill_types() -> Dict:
+    """技能屬性統計的回應內容（技能目錄重新載入後重新產生）"""
+    skills_service = get_skills_service()
+
+    if not skills_service._loaded:
+        skills_service.load_skills()
+
+    types = list(skills_service.skills_by_type.keys())
+    counts = {t: len(skills) for t, skills in skills_service.skills_by_type.items()}
+
+    return {
+        "success": True,
+        "data": {
+            "types": sorted(types),
+            "counts": counts,
+            "total_skills": len(skills_service.skills)
+        }
+    }
+
+
+get_reference_cache().register(
+    "skill_types",
+    build_skill_types,
+    version=lambda: get_skills_service().version
+)
+
+
 @router.get("/types")
-async def get_available_types():
+async def get_available_types(request: Request):
     """
     獲取所有可用的屬性列表
 
+    回應預先編碼並帶 ETag，技能目錄重新載入後才重新編碼；
+    客戶端以 If-None-Match 重新驗證，內容未變時返回 304
+
     Returns:
         {
             "success": true,
@@ -89,22 +120,7 @@ async def get_available_types():
         }
     """
     try:
-        skills_service = get_skills_service()
-
-        if not skills_service._loaded:
-            skills_service.load_skills()
-
-        types = list(skills_service.skills_by_type.keys())
-        counts = {t: len(skills) for t, skills in skills_service.skills_by_type.items()}
-
-        return {
-            "success": True,
-            "data": {
-                "types": sorted(types),
-                "counts": counts,
-                "total_skills": len(skills_service.skills)
-            }
-        }
+        return get_reference_cache().respond(request, "skill_types")
 
     except Exception as e:
         logger.error(f"❌ 獲取屬性列表失敗: {e}")
@@ -0,0 +1,110 @@
+"""
+系統監控 API
+提供伺服器內部運行狀態（WebSocket 處理器、房間生命週期、GLOBAL 分片、回合排程、准入控制、降級狀態等）
+"""
+
+from fastapi import APIRouter
+import logging
+
+from app.websocket.messages import message_router
+from app.websocket.manager import manager as ws_manager
+from app.websocket.scheduler import turn_scheduler
+from app.websocket.supervisor import room_supervisor
+from app.websocket.raid import global_raid
+from app.services.admission_service import get_admission_controller
+from app.services.brownout_service import get_brownout_controller
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1/system", tags=["System"])
+
+
+@router.get("/ws-handlers")
+async def get_ws_handler_stats():
+    """
+    獲取 WebSocket 訊息處理器統計
+
+    Returns:
+        {
+            "success": true,
+            "data": {
+                "handlers": {"use_skill": {"count": 12, "errors": 0, "avg_ms": 0.8, "max_ms": 3.1}, ...},
+                "rejected": 2
+            }
+        }
+    """
+    return {
+        "success": True,
+        "data": message_router.get_stats()
+    }
+
+
+@router.get("/rooms")
+async def get_room_lifecycle_stats():
+    """
+    獲取房間生命週期狀態
+
+    Returns:
+        房間數（依狀態）、背景任務數、房間 Actor 信箱積壓、記憶體用量與存活的 Boss 數
+    """
+    return {
+        "success": True,
+        "data": room_supervisor.get_stats()
+    }
+
+
+@router.get("/raid")
+async def get_global_raid_stats():
+    """
+    獲取 GLOBAL 分片狀態
+
+    Returns:
+        分片數、總人數、總傷害、Boss 階段與各分片的人數 / Boss 血量
+    """
+    return {
+        "success": True,
+        "data": global_raid.get_stats()
+    }
+
+
+@router.get("/turn-scheduler")
+async def get_turn_scheduler_stats():
+    """
+    獲取回合排程器統計
+
+    Returns:
+        排程中的房間數、heap 大小、執行中的結算任務數與累計觸發次數
+    """
+    return {
+        "success": True,
+        "data": turn_scheduler.get_stats()
+    }
+
+
+@router.get("/admission")
+async def get_admission_status():
+    """
+    獲取准入控制狀態
+
+    Returns:
+        事件迴圈延遲、連線數、待處理 AI 任務數與各門檻
+    """
+    controller = get_admission_controller()
+    return {
+        "success": True,
+        "data": controller.get_status(len(ws_manager.active_connections))
+    }
+
+
+@router.get("/brownout")
+async def get_brownout_status():
+    """
+    獲取降級狀態
+
+    Returns:
+        目前階段、壓力值與各 AI 功能是否啟用
+    """
+    return {
+        "success": True,
+        "data": get_brownout_controller().get_status()
+    }
@@ -0,0 +1,151 @@
+"""
+准入控制服務
+依事件迴圈延遲、連線數與待處理 AI 任務數決定是否接受新的負載
+"""
+
+from fastapi import HTTPException
+from contextlib import contextmanager
+from typing import Optional, Dict, Any
+import asyncio
+import logging
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionController:
+    """
+    准入控制器
+
+    超過門檻時:
+    - 拒絕新的 WebSocket 連線（close code 1013 Try Again Later）
+    - 昂貴的 REST 端點返回 503 並附帶 Retry-After
+
+    已建立的連線與進行中的戰鬥不受影響。
+    """
+
+    def __init__(self):
+        self.loop_lag_ms = 0.0  # 平滑後的事件迴圈延遲
+        self.pending_ai_jobs = 0
+        self.rejected_websockets = 0
+        self.rejected_requests = 0
+        self.monitor_task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """啟動事件迴圈延遲監測（如果尚未啟動）"""
+        if self.monitor_task is None or self.monitor_task.done():
+            self.monitor_task = asyncio.create_task(self._monitor_loop())
+
+    async def _monitor_loop(self):
+        """
+        背景任務：量測事件迴圈延遲
+
+        以 sleep 實際耗時與預期間隔的差值作為延遲。
+        延遲上升時立即反映，下降時平滑衰減，避免門檻附近反覆切換。
+        """
+        logger.info("⏱️  事件迴圈延遲監測啟動")
+        loop = asyncio.get_running_loop()
+        interval = settings.admission_lag_sample_interval
+
+        while True:
+            try:
+                start = loop.time()
+                await asyncio.sleep(interval)
+                lag_ms = max(0.0, loop.time() - start - interval) * 1000
+
+                if lag_ms > self.loop_lag_ms:
+                    self.loop_lag_ms = lag_ms
+                else:
+                    self.loop_lag_ms = self.loop_lag_ms * 0.7 + lag_ms * 0.3
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"❌ 延遲監測錯誤: {e}")
+
+    @contextmanager
+    def track_ai_job(self):
+        """標記一個進行中的 AI 任務（例如圖片處理）"""
+        self.pending_ai_jobs += 1
+        try:
+            yield
+        finally:
+            self.pending_ai_jobs -= 1
+
+    def check_websocket(self, active_connections: int) -> Optional[str]:
+        """
+        檢查是否可接受新的 WebSocket 連線
+
+        Args:
+            active_connections: 目前的連線數
+
+        Returns:
+            拒絕原因，可接受則返回 None
+        """
+        if self.loop_lag_ms > settings.admission_max_loop_lag_ms:
+            return f"伺服器忙碌（延遲 {self.loop_lag_ms:.0f} ms）"
+        if active_connections >= settings.admission_max_connections:
+            return "連線數已達上限"
+        return None
+
+    def check_expensive_request(self) -> Optional[str]:
+        """
+        檢查是否可接受昂貴的 REST 請求（上傳、創建房間）
+
+        Returns:
+            拒絕原因，可接受則返回 None
+        """
+        if self.loop_lag_ms > settings.admission_max_loop_lag_ms:
+            return f"伺服器忙碌（延遲 {self.loop_lag_ms:.0f} ms）"
+        if self.pending_ai_jobs >= settings.admission_max_pending_ai_jobs:
+            return "AI 處理佇列已滿"
+        return None
+
+    def get_status(self, active_connections: int) -> Dict[str, Any]:
+        """獲取准入控制狀態"""
+        return {
+            "loop_lag_ms": round(self.loop_lag_ms, 2),
+            "active_connections": active_connections,
+            "pending_ai_jobs": self.pending_ai_jobs,
+            "accepting_websockets": self.check_websocket(active_connections) is None,
+            "accepting_expensive_requests": self.check_expensive_request() is None,
+            "rejected_websockets": self.rejected_websockets,
+            "rejected_requests": self.rejected_requests,
+            "thresholds": {
+                "max_loop_lag_ms": settings.admission_max_loop_lag_ms,
+                "max_connections": settings.admission_max_connections,
+                "max_pending_ai_jobs": settings.admission_max_pending_ai_jobs
+            }
+        }
+
+
+# 創建全局單例
+_admission_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """獲取准入控制器單例"""
+    global _admission_controller
+    if _admission_controller is None:
+        _admission_controller = AdmissionController()
+    return _admission_controller
+
+
+async def require_capacity():
+    """
+    FastAPI 依賴：昂貴端點的負載保護
+
+    Raises:
+        HTTPException: 503，附帶 Retry-After 標頭
+    """
+    controller = get_admission_controller()
+    reason = controller.check_expensive_request()
+    if reason:
+        controller.rejected_requests += 1
+        logger.warning(f"🚦 拒絕請求: {reason}")
+        raise HTTPException(
+            status_code=503,
+            detail=reason,
+            headers={"Retry-After": str(settings.admission_retry_after)}
+        )
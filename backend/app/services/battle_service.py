@@ -4,7 +4,8 @@
 """
 
 import random
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple, Sequence, Union, Optional
+import numpy as np
 from app.config import settings
 
 
@@ -171,9 +172,87 @@ TYPE_EFFECTIVENESS: Dict[str, Dict[str, float]] = {
 }
 
 
+# 屬性 ID（依 settings.POKEMON_TYPES 的順序）
+TYPE_IDS: Dict[str, int] = {type_name: i for i, type_name in enumerate(settings.POKEMON_TYPES)}
+NORMAL_TYPE_ID = TYPE_IDS["normal"]
+
+# 免疫倍率
+IMMUNE_MULTIPLIER = -1.0
+
+# 屬性值傷害公式：亂數範圍與會心一擊
+DAMAGE_ROLL_MIN = 0.85
+DAMAGE_ROLL_MAX = 1.0
+CRITICAL_CHANCE = 1 / 16
+CRITICAL_MULTIPLIER = 1.5
+
+
+def _compile_type_matrix() -> np.ndarray:
+    """將 TYPE_EFFECTIVENESS 編譯成 [攻擊屬性 ID, 防禦屬性 ID] 的稠密矩陣（未列出的組合為 0.0）"""
+    matrix = np.zeros((len(TYPE_IDS), len(TYPE_IDS)), dtype=np.float64)
+    for attack_type, row in TYPE_EFFECTIVENESS.items():
+        if attack_type not in TYPE_IDS:
+            continue
+        for defense_type, value in row.items():
+            if defense_type in TYPE_IDS:
+                matrix[TYPE_IDS[attack_type], TYPE_IDS[defense_type]] = value
+    matrix.flags.writeable = False
+    return matrix
+
+
+# 18x18 屬性倍率矩陣（匯入時編譯一次，唯讀）
+TYPE_MATRIX: np.ndarray = _compile_type_matrix()
+
+# 同一張表的巢狀 list，單次查詢用（避免 NumPy 純量的額外開銷）
+_TYPE_ROWS: List[List[float]] = TYPE_MATRIX.tolist()
+
+# 屬性可以是名稱或 ID
+TypeKey = Union[str, int]
+
+
 class BattleService:
     """戰鬥系統服務類"""
 
+    @classmethod
+    def get_type_id(cls, type_name: str) -> int:
+        """
+        獲取屬性 ID
+
+        Args:
+            type_name: 屬性名稱（不合法的屬性視為 normal）
+
+        Returns:
+            屬性 ID（TYPE_MATRIX 的索引）
+        """
+        return TYPE_IDS.get(type_name, NORMAL_TYPE_ID)
+
+    @classmethod
+    def get_type_ids(cls, types: Sequence[TypeKey]) -> np.ndarray:
+        """
+        將屬性名稱或 ID 轉為屬性 ID 陣列
+
+        Args:
+            types: 屬性名稱或 ID（不合法的名稱視為 normal）
+
+        Returns:
+            屬性 ID 陣列（int64）
+
+        Raises:
+            ValueError: 屬性 ID 超出 TYPE_MATRIX 範圍（負數 ID 不會被當成從尾端索引）
+        """
+        if isinstance(types, np.ndarray) and types.dtype.kind in "iu":
+            ids = types.astype(np.int64, copy=False)
+        else:
+            ids = np.fromiter(
+                (t if isinstance(t, (int, np.integer)) else TYPE_IDS.get(t, NORMAL_TYPE_ID) for t in types),
+                dtype=np.int64,
+                count=len(types)
+            )
+
+        if ids.size and (ids.min() < 0 or ids.max() >= len(TYPE_IDS)):
+            invalid = sorted(set(ids[(ids < 0) | (ids >= len(TYPE_IDS))].tolist()))
+            raise ValueError(f"屬性 ID 超出範圍 0-{len(TYPE_IDS) - 1}: {invalid}")
+        return ids
+
     @classmethod
     def get_type_effectiveness(cls, attack_type: str, defense_type: str) -> float:
         """
@@ -186,15 +265,8 @@ class BattleService:
         Returns:
             倍率 (-1.0 = 免疫, -0.2 = 劣勢, 0.0 = 普通, +0.25 = 優勢)
         """
-        # 驗證屬性是否合法
-        if attack_type not in settings.POKEMON_TYPES:
-            attack_type = "normal"
-        if defense_type not in settings.POKEMON_TYPES:
-            defense_type = "normal"
-
-        # 查詢倍率，預設為 0.0（普通傷害）
-        effectiveness = TYPE_EFFECTIVENESS.get(attack_type, {}).get(defense_type, 0.0)
-        return effectiveness
+        # 不合法的屬性視為 normal；未列出的組合為 0.0（普通傷害）
+        return _TYPE_ROWS[TYPE_IDS.get(attack_type, NORMAL_TYPE_ID)][TYPE_IDS.get(defense_type, NORMAL_TYPE_ID)]
 
     @classmethod
     def get_effectiveness_message(cls, effectiveness: float) -> str:
@@ -207,7 +279,7 @@ class BattleService:
         Returns:
             效果訊息（中文）
         """
-        if effectiveness == -1.0:
+        if effectiveness == IMMUNE_MULTIPLIER:
             return "完全沒有效果..."
         elif effectiveness == -0.2:
             return "效果不佳..."
@@ -241,7 +313,7 @@ class BattleService:
         attribute_multiplier = cls.get_type_effectiveness(skill_type, defender_type)
 
         # 檢查是否免疫（-1.0）
-        if attribute_multiplier == -1.0:
+        if attribute_multiplier == IMMUNE_MULTIPLIER:
             return 0, attribute_multiplier, cls.get_effectiveness_message(attribute_multiplier)
 
         # 計算傷害: 威力 × (1 + 屬性倍率 + Prompt倍率)
@@ -260,6 +332,189 @@ class BattleService:
 
         return final_damage, attribute_multiplier, message
 
+    @classmethod
+    def damage_formula(
+        cls,
+        powers: np.ndarray,
+        effectiveness: np.ndarray,
+        multipliers: Union[np.ndarray, float] = 0.0
+    ) -> np.ndarray:
+        """
+        向量化的傷害公式（與 calculate_damage 相同）：威力 × (1 + 屬性倍率 + Prompt倍率)，
+        取整數且最少 1，免疫為 0
+
+        Args:
+            powers: 技能威力（任意形狀）
+            effectiveness: 屬性相剋倍率（可廣播到 powers 的形狀）
+            multipliers: Prompt倍率（可廣播）
+
+        Returns:
+            傷害值陣列（float64，值皆為整數）
+        """
+        damage = np.maximum(1.0, np.trunc(powers * (1.0 + effectiveness + multipliers)))
+        return np.where(effectiveness == IMMUNE_MULTIPLIER, 0.0, damage)
+
+    @classmethod
+    def calculate_damage_batch(
+        cls,
+        powers: Sequence[float],
+        attacker_types: Sequence[TypeKey],
+        defender_types: Sequence[TypeKey],
+        multipliers: Optional[Sequence[float]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        一次計算多次攻擊的傷害（結果與逐一呼叫 calculate_damage 相同）
+
+        Args:
+            powers: 技能威力
+            attacker_types: 技能屬性（名稱或 ID）
+            defender_types: 防禦方屬性（名稱或 ID，長度為 1 時套用到所有攻擊）
+            multipliers: Prompt倍率（預設全為 0.0）
+
+        Returns:
+            (傷害值陣列 int64, 屬性相剋倍率陣列 float64)
+
+        Raises:
+            ValueError: 屬性 ID 超出範圍
+        """
+        power_array = np.asarray(powers, dtype=np.float64)
+        effectiveness = TYPE_MATRIX[cls.get_type_ids(attacker_types), cls.get_type_ids(defender_types)]
+        multiplier_array = 0.0 if multipliers is None else np.asarray(multipliers, dtype=np.float64)
+
+        damage = cls.damage_formula(power_array, effectiveness, multiplier_array)
+        return damage.astype(np.int64), effectiveness
+
+    # ===== 屬性值傷害（等級 / 攻擊 / 防禦） =====
+
+    @classmethod
+    def stat_base_damage(
+        cls,
+        skill_power: Union[float, np.ndarray],
+        attacker_level: Union[float, np.ndarray],
+        attacker_attack: Union[float, np.ndarray],
+        defender_defense: Union[float, np.ndarray]
+    ) -> Union[float, np.ndarray]:
+        """
+        屬性值基礎傷害（未含屬性相剋、Prompt 倍率與亂數）
+        公式: ((2 × 等級 / 5 + 2) × 威力 × 攻擊 / 防禦) / 50 + 2
+
+        參數可以是純量或可互相廣播的 NumPy 陣列。
+
+        Returns:
+            基礎傷害
+        """
+        defense = np.maximum(defender_defense, 1)
+        return ((2 * attacker_level / 5 + 2) * skill_power * attacker_attack / defense) / 50 + 2
+
+    @classmethod
+    def roll_stat_damage(
+        cls,
+        expected_damage: float,
+        effectiveness: float,
+        rng: Optional[random.Random] = None,
+        is_critical: bool = False
+    ) -> int:
+        """
+        對預先算好的傷害擲亂數（× 0.85 ~ 1.0，會心 × 1.5），最少 1，免疫為 0
+
+        Args:
+            expected_damage: 基礎傷害 × (1 + 屬性倍率 + Prompt倍率)
+            effectiveness: 屬性相剋倍率
+            rng: 亂數產生器（預設使用 random 模組）
+            is_critical: 是否會心一擊
+
+        Returns:
+            傷害值
+        """
+        if effectiveness == IMMUNE_MULTIPLIER:
+            return 0
+
+        rng = rng or random
+        damage = expected_damage * rng.uniform(DAMAGE_ROLL_MIN, DAMAGE_ROLL_MAX)
+        if is_critical:
+            damage *= CRITICAL_MULTIPLIER
+        return max(1, int(damage))
+
+    @classmethod
+    def calculate_stat_damage(
+        cls,
+        skill_power: int,
+        skill_type: str,
+        defender_type: str,
+        attacker_level: int,
+        attacker_attack: int,
+        defender_defense: int,
+        prompt_multiplier: float = 0.0,
+        is_critical: Optional[bool] = False,
+        rng: Optional[random.Random] = None
+    ) -> Tuple[int, float, str]:
+        """
+        計算考慮等級、攻擊與防禦的傷害
+        公式: 基礎傷害 × (1 + 屬性倍率 + Prompt倍率) × 亂數(0.85 ~ 1.0) × 會心(1.5)
+
+        Args:
+            skill_power: 技能威力
+            skill_type: 技能屬性
+            defender_type: 防禦方屬性
+            attacker_level: 攻擊方等級
+            attacker_attack: 攻擊方攻擊力
+            defender_defense: 防禦方防禦力
+            prompt_multiplier: Prompt倍率 (0.0 到 0.5，預設 0.0)
+            is_critical: 是否會心一擊（None = 依 CRITICAL_CHANCE 隨機）
+            rng: 亂數產生器（預設使用 random 模組）
+
+        Returns:
+            (傷害值, 屬性相剋倍率, 效果訊息)
+        """
+        rng = rng or random
+        effectiveness = cls.get_type_effectiveness(skill_type, defender_type)
+        if is_critical is None:
+            is_critical = rng.random() < CRITICAL_CHANCE
+
+        base_damage = cls.stat_base_damage(skill_power, attacker_level, attacker_attack, defender_defense)
+        expected_damage = float(base_damage) * (1 + effectiveness + prompt_multiplier)
+        damage = cls.roll_stat_damage(expected_damage, effectiveness, rng, is_critical)
+
+        message = cls.get_effectiveness_message(effectiveness)
+        if is_critical and damage > 0:
+            message = f"會心一擊！{message}"
+
+        return damage, effectiveness, message
+
+    @classmethod
+    def stat_damage_matrix(
+        cls,
+        skill_powers: Sequence[float],
+        skill_types: Sequence[TypeKey],
+        attacker_level: float,
+        attacker_attack: float,
+        defender_types: Sequence[TypeKey],
+        defender_defenses: Sequence[float]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        一次計算一名攻擊方的每個技能對每個防禦方的期望傷害（擲亂數前）
+
+        Args:
+            skill_powers: 技能威力（S 個）
+            skill_types: 技能屬性（S 個，名稱或 ID）
+            attacker_level: 攻擊方等級
+            attacker_attack: 攻擊方攻擊力
+            defender_types: 防禦方屬性（M 個，名稱或 ID）
+            defender_defenses: 防禦方防禦力（M 個）
+
+        Returns:
+            (期望傷害 [S, M], 屬性相剋倍率 [S, M])
+        """
+        powers = np.asarray(skill_powers, dtype=np.float64)[:, None]
+        defenses = np.asarray(defender_defenses, dtype=np.float64)[None, :]
+        effectiveness = TYPE_MATRIX[
+            cls.get_type_ids(skill_types)[:, None],
+            cls.get_type_ids(defender_types)[None, :]
+        ]
+
+        base_damage = cls.stat_base_damage(powers, attacker_level, attacker_attack, defenses)
+        return base_damage * (1.0 + effectiveness), effectiveness
+
     @classmethod
     def get_all_type_chart(cls) -> Dict[str, Dict[str, float]]:
         """
@@ -268,13 +523,8 @@ class BattleService:
         Returns:
             完整的屬性相剋字典
         """
-        # 構建完整的對照表（包含預設值 1.0）
-        full_chart = {}
-        for attack_type in settings.POKEMON_TYPES:
-            full_chart[attack_type] = {}
-            for defense_type in settings.POKEMON_TYPES:
-                full_chart[attack_type][defense_type] = cls.get_type_effectiveness(
-                    attack_type, defense_type
-                )
-
-        return full_chart
+        # 構建完整的對照表（包含預設值 0.0）
+        return {
+            attack_type: dict(zip(settings.POKEMON_TYPES, _TYPE_ROWS[attack_id]))
+            for attack_type, attack_id in TYPE_IDS.items()
+        }
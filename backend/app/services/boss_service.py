@@ -1,6 +1,6 @@
 """
 Boss 戰鬥服務
-處理 Boss 生成、技能選擇、AI 行為
+處理 Boss 生成與依人數調整強度（戰鬥中的技能與目標選擇見 BossStrategy）
 """
 
 from typing import Dict, List, Any, Optional, Tuple
@@ -8,8 +8,7 @@ import random
 import logging
 
 from app.config import settings
-from app.services.battle_service import BattleService
-from app.services.skills_service import SkillsService
+from app.services.skills_service import get_skills_service
 
 logger = logging.getLogger(__name__)
 
@@ -50,34 +49,6 @@ class Boss:
         is_defeated = self.current_hp == 0
         return actual_damage, is_defeated
 
-    def select_skill(self) -> Dict[str, Any]:
-        """
-        選擇技能（AI 邏輯）
-
-        目前使用簡單隨機選擇，未來可以加入策略：
-        - 優先使用高威力技能
-        - 根據玩家屬性選擇相剋技能
-        - 血量低時使用特殊技能
-        """
-        if not self.skills:
-            # Fallback: 基礎攻擊
-            return {
-                "id": 0,
-                "name": "撞擊",
-                "name_en": "Tackle",
-                "type": self.type,
-                "power": 40,
-                "accuracy": 100
-            }
-
-        # 簡單策略：70% 高威力，30% 隨機
-        if random.random() < 0.7:
-            # 選擇威力最高的技能
-            return max(self.skills, key=lambda s: s.get("power", 0))
-        else:
-            # 隨機選擇
-            return random.choice(self.skills)
-
     def to_dict(self) -> Dict[str, Any]:
         """轉換為字典"""
         return {
@@ -121,6 +92,10 @@ class BossService:
         "fairy": "妖精女王"
     }
 
+    # Boss 攻擊力 = 基礎 + 每個額外玩家增加（以 scripts/simulate_battles.py 調整，1-10 人勝率約 50%-70%）
+    BOSS_ATTACK_BASE = 22
+    BOSS_ATTACK_PER_PLAYER = 10
+
     @classmethod
     async def generate_boss(
         cls,
@@ -146,152 +121,66 @@ class BossService:
         # Boss 名稱
         boss_name = cls.BOSS_NAMES.get(boss_type, "神秘 Boss")
 
-        # Boss 等級（根據玩家數量調整）
-        boss_level = 10 + (player_count * 5)
-
-        # Boss 血量（基礎 + 每個額外玩家增加）
-        boss_hp = base_hp + (player_count - 1) * settings.boss_hp_per_player
-
-        # Boss 屬性值（根據等級和玩家數量）
-        difficulty_multiplier = 1.0 + (player_count - 1) * 0.3
-        boss_attack = int(80 * difficulty_multiplier)
-        boss_defense = int(60 * difficulty_multiplier)
-        boss_speed = int(70 * difficulty_multiplier)
-
         # Boss 技能（選擇 4 個強力技能）
-        skills_service = SkillsService()
-        all_skills = skills_service.get_skills_by_type(boss_type, count=20)
+        all_skills = get_skills_service().get_skills_by_type(boss_type, count=20)
 
         # 選擇 4 個技能：2 個高威力 + 2 個中威力
-        skills_by_power = sorted(all_skills, key=lambda s: s.power, reverse=True)
+        skills_by_power = sorted(all_skills, key=lambda s: s.get("power") or 0, reverse=True)
         boss_skills = []
 
         # 高威力技能（前 5 個中選 2 個）
-        high_power = [s.to_dict() for s in skills_by_power[:5]]
+        high_power = skills_by_power[:5]
         boss_skills.extend(random.sample(high_power, min(2, len(high_power))))
 
         # 中威力技能（6-15 個中選 2 個）
-        mid_power = [s.to_dict() for s in skills_by_power[5:15]]
+        mid_power = skills_by_power[5:15]
         boss_skills.extend(random.sample(mid_power, min(2, len(mid_power))))
 
-        # 創建 Boss
+        # 創建 Boss（等級、血量、屬性值依玩家數量調整）
         boss = Boss(
             name=boss_name,
             pokemon_type=boss_type,
-            level=boss_level,
-            max_hp=boss_hp,
-            attack=boss_attack,
-            defense=boss_defense,
-            speed=boss_speed,
+            level=0,
+            max_hp=0,
+            attack=0,
+            defense=0,
+            speed=0,
             skills=boss_skills
         )
+        cls.scale_boss(boss, player_count, base_hp)
 
-        logger.info(f"🐉 生成 Boss: {boss_name} ({boss_type}) Lv.{boss_level} HP:{boss_hp}")
+        logger.info(f"🐉 生成 Boss: {boss_name} ({boss_type}) Lv.{boss.level} HP:{boss.max_hp}")
         return boss
 
     @classmethod
-    def calculate_boss_damage(
-        cls,
-        boss: Boss,
-        target_defense: int,
-        skill: Dict[str, Any],
-        target_type: str
-    ) -> Tuple[int, float, str]:
+    def scale_boss(cls, boss: Boss, player_count: int, base_hp: int = 1000) -> Boss:
         """
-        計算 Boss 造成的傷害
+        依玩家數量設定 Boss 的等級、血量與屬性值（血量回滿）
 
-        Args:
-            boss: Boss 實例
-            target_defense: 目標防禦力
-            skill: 使用的技能
-            target_type: 目標屬性
-
-        Returns:
-            (傷害值, 屬性相剋倍率, 訊息)
-        """
-        return BattleService.calculate_damage(
-            attacker_level=boss.level,
-            attacker_attack=boss.attack,
-            defender_defense=target_defense,
-            skill_power=skill.get("power", 40),
-            skill_type=skill.get("type", boss.type),
-            defender_type=target_type,
-            is_critical=False  # Boss 固定不會心
-        )
-
-    @classmethod
-    def calculate_player_damage(
-        cls,
-        player_level: int,
-        player_attack: int,
-        boss: Boss,
-        skill: Dict[str, Any]
-    ) -> Tuple[int, float, str]:
-        """
-        計算玩家對 Boss 造成的傷害
+        預先生成的 Boss 上場時以當下的玩家數量重新調整。
 
         Args:
-            player_level: 玩家等級
-            player_attack: 玩家攻擊力
             boss: Boss 實例
-            skill: 使用的技能
-
-        Returns:
-            (傷害值, 屬性相剋倍率, 訊息)
-        """
-        return BattleService.calculate_damage(
-            attacker_level=player_level,
-            attacker_attack=player_attack,
-            defender_defense=boss.defense,
-            skill_power=skill.get("power", 40),
-            skill_type=skill.get("type", "normal"),
-            defender_type=boss.type,
-            is_critical=None  # 隨機會心
-        )
-
-    @classmethod
-    async def boss_turn(
-        cls,
-        boss: Boss,
-        targets: List[Dict[str, Any]]
-    ) -> Dict[str, Any]:
-        """
-        Boss 回合行動
-
-        Args:
-            boss: Boss 實例
-            targets: 可攻擊的目標列表（玩家資料）
+            player_count: 玩家數量
+            base_hp: 基礎血量
 
         Returns:
-            行動結果
+            同一個 Boss 實例
         """
-        if not targets:
-            return {
-                "success": False,
-                "message": "沒有可攻擊的目標"
-            }
-
-        # 選擇技能
-        skill = boss.select_skill()
+        player_count = max(1, player_count)
 
-        # 選擇目標（隨機或策略）
-        # 簡單策略：隨機選擇一個目標
-        target = random.choice(targets)
+        # Boss 等級（根據玩家數量調整）
+        boss.level = 10 + (player_count * 5)
 
-        # 計算傷害
-        target_defense = target.get("stats", {}).get("defense", 50)
-        target_type = target.get("type", "normal")
+        # Boss 血量（基礎 + 每個額外玩家增加）
+        boss.max_hp = base_hp + (player_count - 1) * settings.boss_hp_per_player
+        boss.current_hp = boss.max_hp
 
-        damage, effectiveness, message = cls.calculate_boss_damage(
-            boss, target_defense, skill, target_type
-        )
+        # Boss 攻擊力（Boss 每回合只攻擊一名玩家，隨人數線性增加）
+        boss.attack = cls.BOSS_ATTACK_BASE + (player_count - 1) * cls.BOSS_ATTACK_PER_PLAYER
 
-        return {
-            "success": True,
-            "action": "attack",
-            "skill": skill,
-            "target": target,
-            "damage": damage,
-            "effectiveness": effectiveness,
-            "message": message
-        }
+        # 其他屬性值（根據玩家數量）
+        difficulty_multiplier = 1.0 + (player_count - 1) * 0.3
+        boss.defense = int(60 * difficulty_multiplier)
+        boss.speed = int(70 * difficulty_multiplier)
+        return boss
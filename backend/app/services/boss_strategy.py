@@ -0,0 +1,130 @@
+"""
+Boss 策略
+依傷害表為每名成員預先選好最有效的技能，並以優先佇列維護「最容易被擊倒」的目標，
+Boss 每次反擊只需 O(log n) 即可選出目標與技能（99 人房間也不必逐一比較）
+"""
+
+from typing import Dict, List, Any, Optional, Tuple
+import heapq
+import itertools
+import random
+
+from app.services.damage_table import BossDamageTable
+
+
+# Boss 採用策略（攻擊最容易擊倒的目標、使用最有效的技能）的機率，其餘隨機
+BOSS_STRATEGY_CHANCE = 0.7
+
+
+class BossStrategy:
+    """
+    Boss 目標與技能選擇
+
+    - 建立時（戰鬥開始 / 成員變動）從傷害表取出每名成員的最佳技能與其期望傷害
+    - 目標優先度 = 目前 HP - 最佳技能期望傷害（越低越容易被擊倒；HP 低、被剋制的成員優先）
+    - 成員 HP 改變時以 update_hp() 推入新的優先度（O(log n)），舊項目在取出時略過
+    - 倒下的成員不會被選為目標
+
+    狀態格式與回合引擎相同:
+        members = {member_id: {"hp": 100, ...}}
+    """
+
+    def __init__(self, damage_table: BossDamageTable, members: Dict[str, Dict[str, Any]]):
+        self.damage_table = damage_table
+
+        # 每名成員的最佳技能與期望傷害（成員屬性與防禦在戰鬥中固定）
+        self.best_skill: Dict[str, int] = {}
+        self.best_damage: Dict[str, float] = {}
+        skill_count = len(damage_table.skills)
+        for member_id in damage_table.member_ids:
+            expected = [damage_table.lookup(i, member_id)[0] for i in range(skill_count)]
+            best = max(range(skill_count), key=lambda i: expected[i])
+            self.best_skill[member_id] = best
+            self.best_damage[member_id] = expected[best]
+
+        self.hp: Dict[str, int] = {}
+        self.heap: List[Tuple[float, int, str]] = []
+        self.entry: Dict[str, int] = {}  # 每名成員目前有效的佇列項目序號
+        self._seq = itertools.count()
+
+        # 存活成員（隨機選擇目標用；交換刪除，O(1)）
+        self.alive: List[str] = []
+        self.alive_index: Dict[str, int] = {}
+
+        for member_id, member in members.items():
+            self.update_hp(member_id, member["hp"])
+
+    def covers(self, members) -> bool:
+        """策略是否涵蓋目前所有成員（成員變動後需要重建）"""
+        return self.damage_table.covers(members)
+
+    def _set_alive(self, member_id: str, alive: bool):
+        index = self.alive_index.get(member_id)
+        if alive and index is None:
+            self.alive_index[member_id] = len(self.alive)
+            self.alive.append(member_id)
+        elif not alive and index is not None:
+            last = self.alive.pop()
+            if last != member_id:
+                self.alive[index] = last
+                self.alive_index[last] = index
+            del self.alive_index[member_id]
+
+    def update_hp(self, member_id: str, hp: int):
+        """
+        更新成員 HP（HP 未改變時不做任何事）
+
+        Args:
+            member_id: 成員 ID
+            hp: 目前 HP
+        """
+        if self.hp.get(member_id) == hp:
+            return
+        self.hp[member_id] = hp
+        self._set_alive(member_id, hp > 0)
+
+        if hp > 0:
+            seq = next(self._seq)
+            self.entry[member_id] = seq
+            heapq.heappush(self.heap, (hp - self.best_damage[member_id], seq, member_id))
+        else:
+            self.entry.pop(member_id, None)
+
+        # 過期項目過多時重建佇列（只保留有效項目）
+        if len(self.heap) > 2 * len(self.entry) + 16:
+            self.heap = [item for item in self.heap if self.entry.get(item[2]) == item[1]]
+            heapq.heapify(self.heap)
+
+    def pick_target(self) -> Optional[str]:
+        """
+        最容易被擊倒的存活成員（略過過期的佇列項目）
+
+        Returns:
+            成員 ID；沒有存活成員時返回 None
+        """
+        while self.heap:
+            _, seq, member_id = self.heap[0]
+            if self.entry.get(member_id) == seq:
+                return member_id
+            heapq.heappop(self.heap)
+        return None
+
+    def choose(self, rng: random.Random) -> Tuple[int, Optional[str]]:
+        """
+        選擇 Boss 的技能與目標：BOSS_STRATEGY_CHANCE 的機率依策略，否則隨機
+
+        Args:
+            rng: 亂數產生器
+
+        Returns:
+            (技能索引, 目標成員 ID；沒有存活成員時為 None)
+        """
+        if rng.random() < BOSS_STRATEGY_CHANCE:
+            target_id = self.pick_target()
+            if target_id is None:
+                return 0, None
+            return self.best_skill[target_id], target_id
+
+        skill_index = rng.randrange(len(self.damage_table.skills))
+        target_id = rng.choice(self.alive) if self.alive else None
+        return skill_index, target_id
@@ -0,0 +1,200 @@
+"""
+降級（Brownout）控制服務
+負載升高時分階段關閉昂貴的 AI 功能，壓力下降後自動恢復
+"""
+
+from fastapi import HTTPException
+from enum import IntEnum
+from typing import Optional, Dict, Any
+import asyncio
+import logging
+import time
+
+from app.config import settings
+from app.services.admission_service import get_admission_controller
+
+logger = logging.getLogger(__name__)
+
+
+class BrownoutStage(IntEnum):
+    """降級階段（數字越大降級越多，每個階段包含前面所有階段）"""
+    NORMAL = 0  # 正常運作
+    MIRROR_BACK_VIEW = 1  # 背面圖改用鏡像，不呼叫 AI 生成
+    LOCAL_PROMPT_SCORE = 2  # Prompt 評分改用本地預設分數
+    PAUSE_UPLOADS = 3  # 暫停新的圖片上傳
+
+
+# 進入各階段所需的壓力值（壓力 = 各指標 / 門檻 的最大值）
+STAGE_ENTRY_PRESSURE = {
+    BrownoutStage.MIRROR_BACK_VIEW: 1.0,
+    BrownoutStage.LOCAL_PROMPT_SCORE: 1.5,
+    BrownoutStage.PAUSE_UPLOADS: 2.0,
+}
+
+
+class BrownoutController:
+    """
+    降級控制器
+
+    依事件迴圈延遲、AI 呼叫延遲與 AI 任務佇列深度計算壓力：
+    - 壓力超過階段門檻時立即升級
+    - 壓力低於目前階段門檻的 80% 並持續 brownout_recovery_seconds 秒後，降一級恢復
+    """
+
+    def __init__(self):
+        self.stage = BrownoutStage.NORMAL
+        self.pressure = 0.0
+        self.ai_latency_ms = 0.0  # AI 呼叫延遲（指數移動平均）
+        self.last_ai_call_at = 0.0
+        self.stage_changed_at = time.time()
+        self.calm_since: Optional[float] = None
+        self.monitor_task: Optional[asyncio.Task] = None
+
+    # ===== 指標 =====
+
+    def record_ai_latency(self, elapsed_ms: float):
+        """
+        記錄一次 AI 呼叫延遲
+
+        Args:
+            elapsed_ms: 呼叫耗時（毫秒）
+        """
+        self.last_ai_call_at = time.time()
+        if self.ai_latency_ms == 0.0:
+            self.ai_latency_ms = elapsed_ms
+        else:
+            self.ai_latency_ms = self.ai_latency_ms * 0.8 + elapsed_ms * 0.2
+
+    def compute_pressure(self) -> float:
+        """計算目前壓力值"""
+        admission = get_admission_controller()
+        return max(
+            admission.loop_lag_ms / settings.brownout_loop_lag_ms,
+            self.ai_latency_ms / settings.brownout_ai_latency_ms,
+            admission.pending_ai_jobs / settings.brownout_queue_depth,
+        )
+
+    # ===== 狀態轉換 =====
+
+    def evaluate(self):
+        """依目前壓力更新降級階段"""
+        # 降級後 AI 呼叫減少，延遲樣本不再更新；長時間無呼叫時讓延遲逐步衰減
+        if time.time() - self.last_ai_call_at > settings.brownout_recovery_seconds:
+            self.ai_latency_ms *= 0.8
+
+        self.pressure = self.compute_pressure()
+
+        target = BrownoutStage.NORMAL
+        for stage, entry in STAGE_ENTRY_PRESSURE.items():
+            if self.pressure >= entry:
+                target = stage
+
+        if target > self.stage:
+            self._set_stage(target)
+            self.calm_since = None
+            return
+
+        if self.stage == BrownoutStage.NORMAL:
+            return
+
+        # 恢復：壓力需持續低於目前階段門檻的 80%
+        if self.pressure < STAGE_ENTRY_PRESSURE[self.stage] * 0.8:
+            now = time.time()
+            if self.calm_since is None:
+                self.calm_since = now
+            elif now - self.calm_since >= settings.brownout_recovery_seconds:
+                self._set_stage(BrownoutStage(self.stage - 1))
+                self.calm_since = now
+        else:
+            self.calm_since = None
+
+    def _set_stage(self, stage: BrownoutStage):
+        """切換降級階段"""
+        if stage > self.stage:
+            logger.warning(f"🟠 降級: {self.stage.name} → {stage.name}（壓力 {self.pressure:.2f}）")
+        else:
+            logger.info(f"🟢 恢復: {self.stage.name} → {stage.name}（壓力 {self.pressure:.2f}）")
+        self.stage = stage
+        self.stage_changed_at = time.time()
+
+    def start(self):
+        """啟動降級監測（如果尚未啟動）"""
+        if self.monitor_task is None or self.monitor_task.done():
+            self.monitor_task = asyncio.create_task(self._monitor_loop())
+
+    async def _monitor_loop(self):
+        """背景任務：每秒重新評估降級階段"""
+        logger.info("🟢 降級控制器啟動")
+        while True:
+            try:
+                await asyncio.sleep(1)
+                self.evaluate()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"❌ 降級評估錯誤: {e}")
+
+    # ===== 功能開關 =====
+
+    @property
+    def skip_back_view_generation(self) -> bool:
+        """是否略過 AI 背面圖生成（改用鏡像）"""
+        return self.stage >= BrownoutStage.MIRROR_BACK_VIEW
+
+    @property
+    def use_local_prompt_score(self) -> bool:
+        """是否以本地預設分數取代 AI Prompt 評分"""
+        return self.stage >= BrownoutStage.LOCAL_PROMPT_SCORE
+
+    @property
+    def pause_uploads(self) -> bool:
+        """是否暫停新的圖片上傳"""
+        return self.stage >= BrownoutStage.PAUSE_UPLOADS
+
+    def get_status(self) -> Dict[str, Any]:
+        """獲取降級狀態"""
+        return {
+            "stage": int(self.stage),
+            "stage_name": self.stage.name.lower(),
+            "pressure": round(self.pressure, 3),
+            "ai_latency_ms": round(self.ai_latency_ms, 1),
+            "stage_changed_at": self.stage_changed_at,
+            "features": {
+                "ai_back_view": not self.skip_back_view_generation,
+                "ai_prompt_score": not self.use_local_prompt_score,
+                "uploads": not self.pause_uploads
+            },
+            "thresholds": {
+                "loop_lag_ms": settings.brownout_loop_lag_ms,
+                "ai_latency_ms": settings.brownout_ai_latency_ms,
+                "queue_depth": settings.brownout_queue_depth,
+                "recovery_seconds": settings.brownout_recovery_seconds
+            }
+        }
+
+
+# 創建全局單例
+_brownout_controller: Optional[BrownoutController] = None
+
+
+def get_brownout_controller() -> BrownoutController:
+    """獲取降級控制器單例"""
+    global _brownout_controller
+    if _brownout_controller is None:
+        _brownout_controller = BrownoutController()
+    return _brownout_controller
+
+
+async def require_uploads_enabled():
+    """
+    FastAPI 依賴：降級至暫停上傳階段時拒絕上傳
+
+    Raises:
+        HTTPException: 503，附帶 Retry-After 標頭
+    """
+    if get_brownout_controller().pause_uploads:
+        raise HTTPException(
+            status_code=503,
+            detail="伺服器負載過高，暫停上傳",
+            headers={"Retry-After": str(settings.brownout_recovery_seconds)}
+        )
@@ -0,0 +1,98 @@
+"""
+Boss 傷害表
+Boss 與成員的屬性值在一場戰鬥中固定，戰鬥開始時一次算好每個 Boss 技能對每名成員的期望傷害，
+每次 Boss 反擊只需查表再擲亂數
+"""
+
+from typing import Dict, List, Any, Optional, Tuple
+import random
+
+from app.services.battle_service import BattleService
+
+
+# Boss 沒有技能時使用的基礎攻擊
+BOSS_FALLBACK_SKILL = {"id": 0, "name": "撞擊", "name_en": "Tackle", "power": 40, "accuracy": 100}
+
+# 成員寶可夢缺少數值時的預設值（與 PokemonStats 預設值相同）
+DEFAULT_MEMBER_DEFENSE = 50
+
+
+def boss_skills(boss_state: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Boss 可用的技能（沒有技能時為基礎攻擊）"""
+    skills = boss_state.get("skills") or []
+    if not skills:
+        return [{**BOSS_FALLBACK_SKILL, "type": boss_state["type"]}]
+    return skills
+
+
+class BossDamageTable:
+    """
+    Boss 傷害表
+
+    以 (Boss 技能索引, 成員 ID) 查詢期望傷害與屬性相剋倍率；
+    成員加入或離開時由持有者重新建立（covers() 用來判斷是否過期）。
+
+    狀態格式與回合引擎相同:
+        boss_state = {"type": "...", "level": 30, "attack": 152, "skills": [...]}
+        members = {member_id: {"type": "fire", "stats": {"defense": 50, ...}, ...}}
+    """
+
+    def __init__(self, boss_state: Dict[str, Any], members: Dict[str, Dict[str, Any]]):
+        self.skills = boss_skills(boss_state)
+        self.level = boss_state.get("level", 1)
+        self.attack = boss_state.get("attack", 1)
+        self.member_ids: List[str] = list(members)
+        self.columns: Dict[str, int] = {member_id: i for i, member_id in enumerate(self.member_ids)}
+
+        expected, effectiveness = BattleService.stat_damage_matrix(
+            skill_powers=[skill.get("power", 40) for skill in self.skills],
+            skill_types=[skill.get("type", boss_state["type"]) for skill in self.skills],
+            attacker_level=self.level,
+            attacker_attack=self.attack,
+            defender_types=[member.get("type", "normal") for member in members.values()],
+            defender_defenses=[
+                (member.get("stats") or {}).get("defense", DEFAULT_MEMBER_DEFENSE)
+                for member in members.values()
+            ]
+        )
+
+        # 轉為巢狀 list，查詢時不經過 NumPy 純量
+        self.expected: List[List[float]] = expected.tolist()
+        self.effectiveness: List[List[float]] = effectiveness.tolist()
+
+    def covers(self, member_ids) -> bool:
+        """傷害表是否涵蓋目前所有成員（成員變動後需要重建）"""
+        return len(member_ids) == len(self.columns) and all(
+            member_id in self.columns for member_id in member_ids
+        )
+
+    def lookup(self, skill_index: int, member_id: str) -> Tuple[float, float]:
+        """
+        查詢期望傷害
+
+        Returns:
+            (期望傷害, 屬性相剋倍率)
+        """
+        column = self.columns[member_id]
+        return self.expected[skill_index][column], self.effectiveness[skill_index][column]
+
+    def roll(
+        self,
+        skill_index: int,
+        member_id: str,
+        rng: Optional[random.Random] = None
+    ) -> Tuple[int, float, str]:
+        """
+        查表並擲亂數得到實際傷害（Boss 不會心）
+
+        Args:
+            skill_index: Boss 技能索引
+            member_id: 目標成員 ID
+            rng: 亂數產生器
+
+        Returns:
+            (傷害值, 屬性相剋倍率, 效果訊息)
+        """
+        expected, effectiveness = self.lookup(skill_index, member_id)
+        damage = BattleService.roll_stat_damage(expected, effectiveness, rng)
+        return damage, effectiveness, BattleService.get_effectiveness_message(effectiveness)
@@ -14,10 +14,12 @@ import io
 import logging
 from typing import Optional
 import os
+import time
 from datetime import date
 
 from app.config import settings
 from app.database import get_service_db
+from app.services.brownout_service import get_brownout_controller
 
 logger = logging.getLogger(__name__)
 
@@ -192,10 +194,12 @@ class GeminiService:
 """
 
             # 調用 Gemini Vision API (新 SDK)
+            start = time.perf_counter()
             response = self.client.models.generate_content(
                 model=self.vision_model,
                 contents=[prompt, image]
             )
+            get_brownout_controller().record_ai_latency((time.perf_counter() - start) * 1000)
 
             # 解析結果
             detected_type = response.text.strip().lower()
@@ -262,6 +266,7 @@ Important: This is a back sprite for a pokemon game, similar to Pokemon games wh
             logger.debug(f"   屬性: {pokemon_type} ({type_chinese})")
 
             # 調用 Gemini 2.5 Flash Image API
+            start = time.perf_counter()
             response = self.client.models.generate_content(
                 model=self.image_model,
                 contents=[prompt, front_image],
@@ -272,6 +277,7 @@ Important: This is a back sprite for a pokemon game, similar to Pokemon games wh
                     )
                 )
             )
+            get_brownout_controller().record_ai_latency((time.perf_counter() - start) * 1000)
 
             # 提取生成的圖片
             for part in response.parts:
@@ -352,6 +358,7 @@ The pokemon should be:
             logger.info(f"🎨 開始生成背面圖片 (純文字 prompt)...")
 
             # 調用 Gemini 2.5 Flash Image API
+            start = time.perf_counter()
             response = self.client.models.generate_content(
                 model=self.image_model,
                 contents=[prompt],
@@ -362,6 +369,7 @@ The pokemon should be:
                     )
                 )
             )
+            get_brownout_controller().record_ai_latency((time.perf_counter() - start) * 1000)
 
             # 提取生成的圖片
             for part in response.parts:
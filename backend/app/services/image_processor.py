@@ -129,6 +129,21 @@ class ImageProcessor:
         b64 = base64.b64encode(image_bytes).decode('utf-8')
         return f"data:image/png;base64,{b64}"
 
+    @classmethod
+    def from_base64(cls, data_uri: str) -> bytes:
+        """
+        將 base64 字串（data URI 或純 base64）還原為圖片 bytes
+
+        Args:
+            data_uri: base64 編碼的字串
+
+        Returns:
+            圖片位元組
+        """
+        if data_uri.startswith("data:"):
+            data_uri = data_uri.split(",", 1)[1]
+        return base64.b64decode(data_uri)
+
     @classmethod
     def mirror_image(cls, image_bytes: bytes) -> bytes:
         """
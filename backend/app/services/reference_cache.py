@@ -0,0 +1,176 @@
+"""
+靜態參考資料回應快取
+屬性列表、屬性相剋表、技能屬性統計等很少變動的回應只編碼一次，
+之後直接返回預先編碼的 JSON bytes，並支援 ETag / If-None-Match（返回 304）
+"""
+
+from fastapi import Request
+from fastapi.responses import Response
+from typing import Callable, Dict, Any, Optional
+import hashlib
+import json
+import logging
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# 產生回應內容的函數
+Builder = Callable[[], Any]
+
+# 資料版本（版本改變時重新編碼，例如技能目錄重新載入）
+VersionGetter = Callable[[], Any]
+
+
+class CachedResponse:
+    """一個預先編碼的回應"""
+
+    def __init__(self, body: bytes, version: Any):
+        self.body = body
+        self.version = version
+        # 強 ETag：內容雜湊
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+class ReferenceCache:
+    """
+    靜態參考資料回應快取
+
+    功能:
+    - register() 登記回應的產生函數，第一次請求或 warm() 時編碼
+    - 登記時可指定資料版本，版本改變時重新編碼（不需要手動清除）
+    - 回應帶強 ETag；沒有版本的內容使用長效 Cache-Control（reference_cache_max_age），
+      有版本的內容（可能重新載入）要求客戶端每次以 ETag 重新驗證
+    - If-None-Match 符合時返回 304（不傳送內容）
+    """
+
+    def __init__(self):
+        self.builders: Dict[str, Builder] = {}
+        self.versions: Dict[str, VersionGetter] = {}
+        self.entries: Dict[str, CachedResponse] = {}
+        self.builds = 0
+        self.hits = 0
+        self.not_modified = 0
+
+    def register(self, key: str, builder: Builder, version: Optional[VersionGetter] = None):
+        """
+        登記回應
+
+        Args:
+            key: 回應名稱
+            builder: 產生回應內容（可 JSON 序列化）的函數
+            version: 資料版本函數（可選）
+        """
+        self.builders[key] = builder
+        if version is not None:
+            self.versions[key] = version
+        self.entries.pop(key, None)
+
+    @staticmethod
+    def _encode(content: Any) -> bytes:
+        """與 JSONResponse 相同的編碼方式"""
+        return json.dumps(
+            content,
+            ensure_ascii=False,
+            allow_nan=False,
+            indent=None,
+            separators=(",", ":")
+        ).encode("utf-8")
+
+    def get(self, key: str) -> CachedResponse:
+        """
+        獲取預先編碼的回應（尚未編碼或版本已改變時重新編碼）
+
+        Args:
+            key: 回應名稱
+
+        Returns:
+            CachedResponse
+        """
+        version_getter = self.versions.get(key)
+        version = version_getter() if version_getter else None
+
+        entry = self.entries.get(key)
+        if entry is not None and entry.version == version:
+            self.hits += 1
+            return entry
+
+        body = self._encode(self.builders[key]())
+        # 產生內容時可能載入資料（例如技能目錄），以產生後的版本為準
+        if version_getter:
+            version = version_getter()
+
+        entry = CachedResponse(body, version)
+        self.entries[key] = entry
+        self.builds += 1
+        logger.info(f"📦 參考資料已編碼: {key} ({len(body)} bytes)")
+        return entry
+
+    def warm(self):
+        """編碼所有已登記的回應（啟動時呼叫）"""
+        for key in list(self.builders):
+            try:
+                self.get(key)
+            except Exception as e:
+                logger.error(f"❌ 參考資料編碼失敗 ({key}): {e}")
+
+    @staticmethod
+    def _etag_matches(if_none_match: str, etag: str) -> bool:
+        """If-None-Match 是否符合（弱比較，忽略 W/ 前綴）"""
+        if if_none_match.strip() == "*":
+            return True
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag.startswith("W/"):
+                tag = tag[2:]
+            if tag == etag:
+                return True
+        return False
+
+    def respond(self, request: Request, key: str) -> Response:
+        """
+        返回預先編碼的回應（ETag 符合時返回 304）
+
+        Args:
+            request: 請求
+            key: 回應名稱
+
+        Returns:
+            Response
+        """
+        entry = self.get(key)
+
+        if key in self.versions:
+            cache_control = "public, no-cache"
+        else:
+            cache_control = f"public, max-age={settings.reference_cache_max_age}"
+        headers = {"ETag": entry.etag, "Cache-Control": cache_control}
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and self._etag_matches(if_none_match, entry.etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """獲取快取統計"""
+        return {
+            "entries": {key: len(entry.body) for key, entry in self.entries.items()},
+            "builds": self.builds,
+            "hits": self.hits,
+            "not_modified": self.not_modified
+        }
+
+
+# 全局單例
+_reference_cache: Optional[ReferenceCache] = None
+
+
+def get_reference_cache() -> ReferenceCache:
+    """獲取參考資料回應快取單例"""
+    global _reference_cache
+    if _reference_cache is None:
+        _reference_cache = ReferenceCache()
+    return _reference_cache
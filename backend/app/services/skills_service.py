@@ -5,7 +5,7 @@
 
 import csv
 import os
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union, Iterable
 import logging
 import random
 
@@ -14,6 +14,19 @@ from app.config import settings
 logger = logging.getLogger(__name__)
 
 
+def to_skill_id(value: Union[str, int]) -> str:
+    """
+    將技能編號正規化為技能 ID（"skill_52"）
+
+    Args:
+        value: 技能 ID 或數字編號（52、"52"、"skill_52"）
+    """
+    value = str(value).strip()
+    if value.startswith("skill_"):
+        return value
+    return f"skill_{value}"
+
+
 class Skill:
     """技能資料類"""
     def __init__(self, data: Dict):
@@ -99,7 +112,9 @@ class SkillsService:
     def __init__(self):
         self.skills: List[Skill] = []
         self.skills_by_type: Dict[str, List[Skill]] = {}
+        self.skills_by_id: Dict[str, Dict] = {}  # {skill_id: 技能字典}
         self._loaded = False
+        self.version = 0  # 每次載入技能後遞增（讓依賴技能目錄的快取重新產生）
 
     def load_skills(self, csv_path: str = None):
         """
@@ -113,6 +128,9 @@ class SkillsService:
         Args:
             csv_path: CSV 檔案路徑，如果不提供則使用預設路徑
         """
+        # 重新載入時清除舊資料
+        self.skills = []
+
         # 優先從資料庫載入
         if self._load_from_database():
             return
@@ -198,13 +216,19 @@ class SkillsService:
             return False
 
     def _organize_by_type(self):
-        """按屬性分類技能"""
+        """按屬性分類技能，並建立 ID 索引"""
         self.skills_by_type = {}
+        self.skills_by_id = {}
         for skill in self.skills:
             if skill.type not in self.skills_by_type:
                 self.skills_by_type[skill.type] = []
             self.skills_by_type[skill.type].append(skill)
 
+            skill_dict = skill.to_dict()
+            self.skills_by_id[skill_dict["id"]] = skill_dict
+
+        self.version += 1
+
     def _load_default_skills(self):
         """載入預設技能（fallback）"""
         default_skills_data = [
@@ -239,15 +263,46 @@ class SkillsService:
                 self.skills.append(skill)
 
         # 按屬性分類
-        self.skills_by_type = {}
-        for skill in self.skills:
-            if skill.type not in self.skills_by_type:
-                self.skills_by_type[skill.type] = []
-            self.skills_by_type[skill.type].append(skill)
+        self._organize_by_type()
 
         self._loaded = True
         logger.info(f"✅ 使用預設技能資料 ({len(self.skills)} 個)")
 
+    def get_skill(self, skill_id: Union[str, int]) -> Optional[Dict]:
+        """
+        根據 ID 獲取技能
+
+        Args:
+            skill_id: 技能 ID 或數字編號
+
+        Returns:
+            技能字典，找不到返回 None
+        """
+        if not self._loaded:
+            self.load_skills()
+
+        return self.skills_by_id.get(to_skill_id(skill_id))
+
+    def get_skills(self, skill_ids: Iterable[Union[str, int]]) -> List[Dict]:
+        """
+        根據 ID 列表獲取技能（略過找不到的 ID，保留順序）
+
+        Args:
+            skill_ids: 技能 ID 列表
+
+        Returns:
+            技能字典列表
+        """
+        if not self._loaded:
+            self.load_skills()
+
+        skills = []
+        for skill_id in skill_ids:
+            skill = self.skills_by_id.get(to_skill_id(skill_id))
+            if skill:
+                skills.append(skill)
+        return skills
+
     def get_skills_by_type(self, pokemon_type: str, count: int = 12) -> List[Dict]:
         """
         根據屬性獲取技能
@@ -308,7 +363,8 @@ class SkillsService:
 
         # 4. 如果還是不足，用所有技能補足
         if len(result) < count:
-            all_available = [s for s in self.skills if s.to_dict() not in result]
+            selected_ids = {skill["id"] for skill in result}
+            all_available = [s for s in self.skills if f"skill_{s.id}" not in selected_ids]
             need = count - len(result)
             if all_available:
                 selected_fill = random.sample(all_available, min(need, len(all_available)))
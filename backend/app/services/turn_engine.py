@@ -0,0 +1,294 @@
+"""
+回合結算引擎
+純函數、無 I/O：輸入（房間狀態, Boss 狀態, 行動, Prompt 分數, 隨機種子），
+輸出（新狀態, 依序排列的事件）。
+
+WebSocket 路由只負責收集行動、評分與廣播；戰鬥規則集中在這裡，
+可以在沒有伺服器的情況下大量執行、分析效能或做模糊測試。
+
+回合制使用 resolve_turn；連續結算模式分別使用 resolve_player_actions（小批次）
+與 resolve_boss_attack（Boss 依自己的節奏反擊）。
+
+狀態格式（皆為可序列化的 dict）:
+    room_state = {
+        "turn": 0,
+        "members": {
+            member_id: {"name": "...", "type": "fire", "stats": {...}, "hp": 100, "max_hp": 100}
+        }
+    }
+    boss_state = {
+        "name": "...", "type": "psychic", "level": 30, "attack": 152, "hp": 500, "max_hp": 500,
+        "skills": [{"name": "...", "type": "psychic", "power": 90}, ...]
+    }
+    actions = {member_id: {"skill": {...}, "prompt": "..."}}
+    scores = {member_id: Prompt 倍率}
+"""
+
+from typing import Dict, List, Any, Optional, Tuple
+import copy
+import random
+
+from app.services.battle_service import BattleService
+from app.services.damage_table import BossDamageTable
+from app.services.boss_strategy import BossStrategy
+
+
+class TurnOutcome:
+    """一個回合的結算結果"""
+
+    def __init__(
+        self,
+        room_state: Dict[str, Any],
+        boss_state: Dict[str, Any],
+        events: List[Dict[str, Any]],
+        result: Optional[str]
+    ):
+        self.room_state = room_state
+        self.boss_state = boss_state
+        self.events = events
+        self.result = result  # "win", "lose" 或 None（戰鬥繼續）
+
+    @property
+    def player_events(self) -> List[Dict[str, Any]]:
+        """玩家攻擊事件（依結算順序）"""
+        return [event for event in self.events if event["type"] == "player_attack"]
+
+    @property
+    def boss_event(self) -> Optional[Dict[str, Any]]:
+        """Boss 反擊事件（沒有反擊返回 None）"""
+        return next((event for event in self.events if event["type"] == "boss_attack"), None)
+
+
+def player_attack_damage(
+    skill: Dict[str, Any],
+    boss_type: str,
+    prompt_multiplier: float
+) -> Tuple[int, float, str]:
+    """
+    計算玩家技能對 Boss 的傷害
+
+    Returns:
+        (傷害值, 屬性相剋倍率, 效果訊息)
+    """
+    return BattleService.calculate_damage(
+        skill_power=skill["power"],
+        skill_type=skill["type"],
+        defender_type=boss_type,
+        prompt_multiplier=prompt_multiplier
+    )
+
+
+def _apply_player_actions(
+    members: Dict[str, Any],
+    boss: Dict[str, Any],
+    actions: Dict[str, Dict[str, Any]],
+    scores: Dict[str, float],
+    events: List[Dict[str, Any]]
+):
+    """依行動順序對 Boss 造成傷害（就地修改 boss，事件附加到 events）"""
+    valid = [(member_id, action) for member_id, action in actions.items() if member_id in members]
+    if not valid:
+        return
+
+    # 傷害與 Boss 剩餘血量無關，整批一次計算
+    damages, effectiveness_values = BattleService.calculate_damage_batch(
+        powers=[action["skill"]["power"] for _, action in valid],
+        attacker_types=[action["skill"]["type"] for _, action in valid],
+        defender_types=[boss["type"]],
+        multipliers=[scores.get(member_id, 0.0) for member_id, _ in valid]
+    )
+
+    for (member_id, action), damage, effectiveness in zip(valid, damages.tolist(), effectiveness_values.tolist()):
+        member = members[member_id]
+        skill = action["skill"]
+        prompt = action.get("prompt", "")
+        prompt_multiplier = scores.get(member_id, 0.0)
+        prompt_score = int(prompt_multiplier * 100)  # 0-50
+        message = BattleService.get_effectiveness_message(effectiveness)
+
+        boss["hp"] = max(0, boss["hp"] - damage)
+
+        events.append({
+            "type": "player_attack",
+            "actor_id": member_id,
+            "actor": member["name"],
+            "skill": skill["name"],
+            "prompt": prompt,
+            "prompt_score": prompt_score,
+            "damage": damage,
+            "boss_hp": boss["hp"],
+            "effectiveness": effectiveness,
+            "message": f"{member['name']} 使用了 {skill['name']}！{message} (Prompt獎勵: {prompt_score}%)"
+        })
+
+
+def _apply_boss_attack(
+    members: Dict[str, Any],
+    boss: Dict[str, Any],
+    rng: random.Random,
+    events: List[Dict[str, Any]],
+    strategy: Optional[BossStrategy] = None
+) -> Optional[str]:
+    """
+    Boss 反擊一名玩家（就地修改 members，事件附加到 events）
+
+    目標與技能由 BossStrategy 選擇（最容易擊倒的存活成員 + 對其最有效的技能，或隨機）；
+    傷害 = 傷害表的期望傷害（等級 / 攻擊 / 防禦 / 屬性相剋）× 亂數。
+    沒有傳入策略或策略未涵蓋目前成員時當場建立。
+
+    Returns:
+        全員倒下返回 "lose"，否則 None
+    """
+    if not members:
+        return None
+
+    if strategy is None or not strategy.covers(members):
+        strategy = BossStrategy(BossDamageTable(boss, members), members)
+
+    skill_index, target_id = strategy.choose(rng)
+    if target_id is None:
+        target_id = rng.choice(list(members))
+    skill = strategy.damage_table.skills[skill_index]
+    target = members[target_id]
+
+    damage, effectiveness, message = strategy.damage_table.roll(skill_index, target_id, rng)
+    target["hp"] = max(0, target["hp"] - damage)
+
+    events.append({
+        "type": "boss_attack",
+        "actor": boss["name"],
+        "skill": skill["name"],
+        "target": target["name"],
+        "target_id": target_id,
+        "damage": damage,
+        "target_hp": target["hp"],
+        "effectiveness": effectiveness,
+        "message": f"{boss['name']} 使用了 {skill['name']}！{message}"
+    })
+
+    if all(member["hp"] == 0 for member in members.values()):
+        return "lose"
+    return None
+
+
+def resolve_turn(
+    room_state: Dict[str, Any],
+    boss_state: Dict[str, Any],
+    actions: Dict[str, Dict[str, Any]],
+    scores: Dict[str, float],
+    seed: Optional[int] = None,
+    strategy: Optional[BossStrategy] = None
+) -> TurnOutcome:
+    """
+    結算一個回合
+
+    流程:
+    1. 依行動順序對 Boss 造成傷害（記錄每次攻擊後的 Boss HP）
+    2. Boss 未被擊敗時反擊一名玩家
+    3. 判定勝負
+
+    輸入不會被修改；相同輸入與種子必定得到相同結果。
+
+    Args:
+        room_state: 房間狀態
+        boss_state: Boss 狀態
+        actions: {member_id: {"skill": 技能, "prompt": 戰術描述}}（順序即結算順序）
+        scores: {member_id: Prompt 倍率}，缺少者為 0
+        seed: 隨機種子
+        strategy: 這場戰鬥的 Boss 策略（含預先算好的傷害表，可選；HP 需與 room_state 一致）
+
+    Returns:
+        TurnOutcome
+    """
+    rng = random.Random(seed)
+    room = copy.deepcopy(room_state)
+    boss = copy.deepcopy(boss_state)
+    events: List[Dict[str, Any]] = []
+
+    # 1. 玩家攻擊
+    _apply_player_actions(room["members"], boss, actions, scores, events)
+
+    # 2. Boss 反擊 / 3. 判定勝負
+    if boss["hp"] == 0:
+        result = "win"
+    else:
+        result = _apply_boss_attack(room["members"], boss, rng, events, strategy)
+
+    if result:
+        events.append({"type": "battle_end", "result": result})
+    else:
+        room["turn"] += 1
+
+    return TurnOutcome(room, boss, events, result)
+
+
+def resolve_player_actions(
+    room_state: Dict[str, Any],
+    boss_state: Dict[str, Any],
+    actions: Dict[str, Dict[str, Any]],
+    scores: Dict[str, float]
+) -> TurnOutcome:
+    """
+    只結算玩家攻擊（連續結算模式的小批次）
+
+    Boss 不反擊，回合數不變；Boss 被擊敗時結果為 "win"。
+    輸入不會被修改。
+
+    Args:
+        room_state: 房間狀態
+        boss_state: Boss 狀態
+        actions: {member_id: {"skill": 技能, "prompt": 戰術描述}}（順序即結算順序）
+        scores: {member_id: Prompt 倍率}，缺少者為 0
+
+    Returns:
+        TurnOutcome
+    """
+    room = copy.deepcopy(room_state)
+    boss = copy.deepcopy(boss_state)
+    events: List[Dict[str, Any]] = []
+
+    _apply_player_actions(room["members"], boss, actions, scores, events)
+
+    result = "win" if boss["hp"] == 0 else None
+    if result:
+        events.append({"type": "battle_end", "result": result})
+
+    return TurnOutcome(room, boss, events, result)
+
+
+def resolve_boss_attack(
+    room_state: Dict[str, Any],
+    boss_state: Dict[str, Any],
+    seed: Optional[int] = None,
+    strategy: Optional[BossStrategy] = None
+) -> TurnOutcome:
+    """
+    只結算 Boss 反擊（連續結算模式依 Boss 自己的節奏呼叫）
+
+    每次反擊視為一個回合（回合數 +1）；全員倒下時結果為 "lose"。
+    輸入不會被修改；相同輸入與種子必定得到相同結果。
+
+    Args:
+        room_state: 房間狀態
+        boss_state: Boss 狀態
+        seed: 隨機種子
+        strategy: 這場戰鬥的 Boss 策略（含預先算好的傷害表，可選；HP 需與 room_state 一致）
+
+    Returns:
+        TurnOutcome
+    """
+    rng = random.Random(seed)
+    room = copy.deepcopy(room_state)
+    boss = copy.deepcopy(boss_state)
+    events: List[Dict[str, Any]] = []
+
+    result = None
+    if boss["hp"] > 0:
+        result = _apply_boss_attack(room["members"], boss, rng, events, strategy)
+
+    if result:
+        events.append({"type": "battle_end", "result": result})
+    else:
+        room["turn"] += 1
+
+    return TurnOutcome(room, boss, events, result)
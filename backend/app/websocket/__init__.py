@@ -5,8 +5,16 @@ WebSocket 模組
 
 from .manager import ConnectionManager
 from .room import RoomManager
+from .batcher import RoomBatcher
+from .actor import RoomActor
+from .clock import Clock, MonotonicClock, VirtualClock
 
 __all__ = [
     "ConnectionManager",
     "RoomManager",
+    "RoomBatcher",
+    "RoomActor",
+    "Clock",
+    "MonotonicClock",
+    "VirtualClock",
 ]
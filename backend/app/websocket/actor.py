@@ -0,0 +1,143 @@
+"""
+房間 Actor
+每個房間以單一消費者依序執行所有會修改房間狀態的命令，
+WebSocket 處理器、回合結算與斷線清理只需把命令放進信箱，不必加鎖
+"""
+
+from typing import Optional, Callable, Any, Tuple, Dict
+import asyncio
+import inspect
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# 命令：無參數的函數，可以是一般函數或協程函數
+Command = Callable[[], Any]
+
+
+class RoomActor:
+    """
+    房間 Actor
+
+    功能:
+    - 以 asyncio.Queue 作為信箱，依提交順序逐一執行命令（同一時間只有一個命令在修改房間）
+    - call() 等待命令執行完畢並取得返回值（命令拋出的例外會傳回呼叫者）
+    - tell() 只放入信箱，不等待結果
+    - 信箱深度即為房間的待處理積壓量
+
+    注意: 命令本身不應等待耗時的外部呼叫（例如 AI 評分），否則會阻塞後續命令；
+    在命令內再次呼叫同一個 Actor 會直接執行（避免自己等待自己）。
+    """
+
+    def __init__(self):
+        self.mailbox: "asyncio.Queue[Tuple[Command, Optional[asyncio.Future]]]" = asyncio.Queue()
+        self.task: Optional[asyncio.Task] = None
+        self.stopped = False
+        self.processed = 0
+        self.failed = 0
+        self.max_depth = 0
+
+    def _ensure_running(self):
+        """第一次收到命令時才啟動消費者任務"""
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+
+    def _in_actor(self) -> bool:
+        """目前是否在 Actor 的消費者任務中執行"""
+        return self.task is not None and asyncio.current_task() is self.task
+
+    @staticmethod
+    async def _execute(command: Command) -> Any:
+        result = command()
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    def _enqueue(self, command: Command, future: Optional[asyncio.Future]):
+        self.mailbox.put_nowait((command, future))
+        self.max_depth = max(self.max_depth, self.mailbox.qsize())
+        self._ensure_running()
+
+    async def call(self, command: Command) -> Any:
+        """
+        放入命令並等待執行結果
+
+        Args:
+            command: 無參數的函數或協程函數
+
+        Returns:
+            命令的返回值
+        """
+        # 已停止（房間已回收）或在命令內重入時直接執行
+        if self.stopped or self._in_actor():
+            return await self._execute(command)
+
+        future = asyncio.get_running_loop().create_future()
+        self._enqueue(command, future)
+        return await future
+
+    def tell(self, command: Command):
+        """
+        放入命令，不等待結果（錯誤只記錄在日誌）
+
+        Args:
+            command: 無參數的函數或協程函數
+        """
+        if self.stopped:
+            return
+        self._enqueue(command, None)
+
+    async def _run(self):
+        """消費者任務：依序執行信箱中的命令"""
+        while not self.stopped:
+            command, future = await self.mailbox.get()
+
+            # 呼叫者放棄等待（例如連線中斷）時仍執行命令，確保狀態一致
+            try:
+                result = await self._execute(command)
+                if future is not None and not future.done():
+                    future.set_result(result)
+            except asyncio.CancelledError:
+                if future is not None:
+                    future.cancel()
+                raise
+            except Exception as e:
+                self.failed += 1
+                if future is not None and not future.done():
+                    future.set_exception(e)
+                else:
+                    logger.error(f"❌ 房間命令執行錯誤: {e}")
+            finally:
+                self.processed += 1
+                self.mailbox.task_done()
+
+    def stop(self):
+        """
+        停止 Actor：取消消費者任務，信箱中尚未執行的命令一併取消
+
+        在命令內呼叫時，目前的命令會執行完畢後才結束消費者任務。
+        """
+        self.stopped = True
+
+        if self.task is not None and not self._in_actor():
+            self.task.cancel()
+
+        while not self.mailbox.empty():
+            _, future = self.mailbox.get_nowait()
+            if future is not None and not future.done():
+                future.cancel()
+
+    def get_depth(self) -> int:
+        """信箱中等待執行的命令數"""
+        return self.mailbox.qsize()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """獲取 Actor 統計"""
+        return {
+            "depth": self.get_depth(),
+            "max_depth": self.max_depth,
+            "processed": self.processed,
+            "failed": self.failed,
+            "stopped": self.stopped
+        }
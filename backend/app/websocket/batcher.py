@@ -0,0 +1,108 @@
+"""
+房間訊息批次器
+在短時間窗口內收集房間的外送訊息，合併成每個連線一個 WebSocket frame
+"""
+
+from typing import Dict, List, Optional, Any, Iterable, TYPE_CHECKING
+import asyncio
+import json
+import logging
+
+if TYPE_CHECKING:
+    from app.websocket.manager import ConnectionManager
+
+logger = logging.getLogger(__name__)
+
+
+class RoomBatcher:
+    """
+    單一房間的外送訊息批次器
+
+    同一窗口內（例如 30~50 ms）發往同一連線的訊息會依序合併，
+    窗口結束時每個連線只送出一個 frame：
+    - 只有 1 則訊息：原樣送出（與未批次時格式相同）
+    - 多則訊息：{"type": "batch", "messages": [...]}
+
+    每則訊息只做一次 JSON 編碼，廣播給多個連線時共用編碼結果。
+    """
+
+    def __init__(self, manager: "ConnectionManager", room_code: str, window_ms: int):
+        self.manager = manager
+        self.room_code = room_code
+        self.window = window_ms / 1000
+
+        # 待送訊息 {connection_id: [已編碼訊息, ...]}
+        self.pending: Dict[str, List[str]] = {}
+        self.flush_task: Optional[asyncio.Task] = None
+
+        # 統計
+        self.messages_queued = 0
+        self.frames_sent = 0
+
+    def enqueue(self, connection_ids: Iterable[str], message: Dict[str, Any]):
+        """
+        將訊息加入批次
+
+        Args:
+            connection_ids: 目標連線 ID
+            message: 訊息內容
+        """
+        encoded = json.dumps(message, ensure_ascii=False)
+        for conn_id in connection_ids:
+            self.pending.setdefault(conn_id, []).append(encoded)
+            self.messages_queued += 1
+
+        if self.pending and (self.flush_task is None or self.flush_task.done()):
+            self.flush_task = asyncio.create_task(self._flush_after_window())
+
+    def discard(self, connection_id: str):
+        """丟棄某連線尚未送出的訊息（斷線時使用）"""
+        self.pending.pop(connection_id, None)
+
+    async def _flush_after_window(self):
+        """等待批次窗口結束後送出"""
+        try:
+            await self.manager.clock.sleep(self.window)
+        except asyncio.CancelledError:
+            return
+        await self.flush()
+
+    async def flush(self):
+        """立即送出所有待送訊息"""
+        if not self.pending:
+            return
+
+        pending, self.pending = self.pending, {}
+
+        tasks = []
+        for conn_id, parts in pending.items():
+            connection = self.manager.active_connections.get(conn_id)
+            if connection is None:
+                continue
+
+            if len(parts) == 1:
+                frame = parts[0]
+            else:
+                frame = '{"type": "batch", "messages": [' + ", ".join(parts) + "]}"
+            tasks.append(connection.send_text(frame))
+
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.frames_sent += len(tasks)
+
+        logger.debug(f"📦 房間 {self.room_code} 批次送出: {len(tasks)} 個 frame")
+
+    async def close(self):
+        """送出剩餘訊息並停止批次器"""
+        if self.flush_task and not self.flush_task.done():
+            self.flush_task.cancel()
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """獲取批次統計"""
+        return {
+            "window_ms": int(self.window * 1000),
+            "messages_queued": self.messages_queued,
+            "frames_sent": self.frames_sent,
+            "pending_connections": len(self.pending)
+        }
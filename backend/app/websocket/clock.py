@@ -0,0 +1,164 @@
+"""
+時鐘
+回合計時、心跳逾時與房間保留時間共用的時間來源。
+預設使用 monotonic 時間；模擬與壓力測試可注入 VirtualClock，手動快轉時間而不必真的等待
+"""
+
+from abc import ABC, abstractmethod
+from typing import Iterable, List, Tuple
+import asyncio
+import heapq
+import itertools
+import time
+
+
+class Clock(ABC):
+    """
+    時鐘介面
+
+    - now(): 目前時間（秒，只用於計算間隔，不是時間戳）
+    - sleep(seconds): 等待一段時間
+    - wait(event, timeout): 等待事件或逾時
+    - wait_tasks(tasks, timeout): 等待任務完成或逾時
+    """
+
+    @abstractmethod
+    def now(self) -> float:
+        """目前時間（秒）"""
+
+    @abstractmethod
+    async def sleep(self, seconds: float):
+        """等待 seconds 秒"""
+
+    async def wait(self, event: asyncio.Event, timeout: float) -> bool:
+        """
+        等待事件發生，最多 timeout 秒
+
+        Returns:
+            事件是否已發生
+        """
+        if event.is_set():
+            return True
+
+        waiter = asyncio.ensure_future(event.wait())
+        sleeper = asyncio.ensure_future(self.sleep(timeout))
+        try:
+            await asyncio.wait({waiter, sleeper}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            waiter.cancel()
+            sleeper.cancel()
+        return event.is_set()
+
+    async def wait_tasks(self, tasks: Iterable[asyncio.Future], timeout: float):
+        """
+        等待所有任務完成，最多 timeout 秒（不取消未完成的任務）
+
+        Args:
+            tasks: 任務
+            timeout: 最多等待的秒數
+        """
+        tasks = list(tasks)
+        if not tasks:
+            return
+
+        waiter = asyncio.ensure_future(asyncio.wait(tasks))
+        sleeper = asyncio.ensure_future(self.sleep(timeout))
+        try:
+            await asyncio.wait({waiter, sleeper}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            waiter.cancel()
+            sleeper.cancel()
+
+
+class MonotonicClock(Clock):
+    """系統 monotonic 時鐘（預設，不受系統時間調整影響）"""
+
+    def now(self) -> float:
+        return time.monotonic()
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(seconds)
+
+    async def wait(self, event: asyncio.Event, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return event.is_set()
+
+    async def wait_tasks(self, tasks: Iterable[asyncio.Future], timeout: float):
+        tasks = list(tasks)
+        if tasks:
+            await asyncio.wait(tasks, timeout=timeout)
+
+
+class VirtualClock(Clock):
+    """
+    虛擬時鐘（模擬 / 壓力測試用）
+
+    時間只在呼叫 advance() 時前進；sleep() 會等到虛擬時間到達才返回。
+    advance() 依期限順序喚醒等待者，每次喚醒後讓事件迴圈執行被喚醒的任務，
+    因此一秒內可以快轉數千個 30 秒回合。
+
+    範例:
+        clock = VirtualClock()
+        room = Room("TEST", clock=clock)
+        turn_scheduler.clock = clock
+        await clock.advance(30)  # 立即經過 30 秒
+    """
+
+    def __init__(self, start: float = 0.0, settle_steps: int = 20):
+        """
+        Args:
+            start: 起始時間
+            settle_steps: 每次喚醒後讓事件迴圈執行的輪數（被喚醒的任務可能還要經過幾次 await 才會再次 sleep）
+        """
+        self._now = start
+        self.settle_steps = settle_steps
+        self._waiters: List[Tuple[float, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+    def now(self) -> float:
+        return self._now
+
+    async def sleep(self, seconds: float):
+        if seconds <= 0:
+            await asyncio.sleep(0)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (self._now + seconds, next(self._seq), future))
+        await future
+
+    async def _settle(self):
+        """讓事件迴圈執行已就緒的任務"""
+        for _ in range(self.settle_steps):
+            await asyncio.sleep(0)
+
+    async def advance(self, seconds: float):
+        """
+        快轉時間，依序喚醒期限已到的等待者
+
+        Args:
+            seconds: 前進的秒數
+        """
+        target = self._now + max(0.0, seconds)
+
+        while self._waiters and self._waiters[0][0] <= target:
+            deadline, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue  # 等待者已被取消
+            self._now = max(self._now, deadline)
+            future.set_result(None)
+            await self._settle()
+
+        self._now = target
+        await self._settle()
+
+    def get_pending_count(self) -> int:
+        """尚未到期的等待者數量"""
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+
+# 全局預設時鐘
+system_clock = MonotonicClock()
@@ -10,6 +10,11 @@ import logging
 import time
 import json
 
+from app.config import settings
+from app.websocket.batcher import RoomBatcher
+from app.websocket.clock import Clock, system_clock
+from app.services.admission_service import get_admission_controller
+
 logger = logging.getLogger(__name__)
 
 
@@ -21,13 +26,15 @@ class Connection:
         websocket: WebSocket,
         connection_id: str,
         room_code: str,
-        user_data: Optional[Dict[str, Any]] = None
+        user_data: Optional[Dict[str, Any]] = None,
+        clock: Optional[Clock] = None
     ):
         self.websocket = websocket
         self.connection_id = connection_id
         self.room_code = room_code
         self.user_data = user_data or {}
-        self.last_heartbeat = time.time()
+        self.clock = clock or system_clock
+        self.last_heartbeat = self.clock.now()
         self.is_alive = True
 
     async def send_json(self, data: Dict[str, Any]):
@@ -48,11 +55,11 @@ class Connection:
 
     def update_heartbeat(self):
         """更新心跳時間"""
-        self.last_heartbeat = time.time()
+        self.last_heartbeat = self.clock.now()
 
     def is_timeout(self, timeout: int = 300) -> bool:
         """檢查是否逾時（預設 5 分鐘）"""
-        return (time.time() - self.last_heartbeat) > timeout
+        return (self.clock.now() - self.last_heartbeat) > timeout
 
 
 class ConnectionManager:
@@ -66,7 +73,10 @@ class ConnectionManager:
     - 自動清理斷線連接
     """
 
-    def __init__(self):
+    def __init__(self, clock: Optional[Clock] = None):
+        # 心跳逾時與檢測間隔使用的時鐘（模擬 / 壓力測試可替換為 VirtualClock）
+        self.clock = clock or system_clock
+
         # 所有活動連線 {connection_id: Connection}
         self.active_connections: Dict[str, Connection] = {}
 
@@ -76,13 +86,19 @@ class ConnectionManager:
         # 心跳檢測任務
         self.heartbeat_task: Optional[asyncio.Task] = None
 
+        # 房間訊息批次器 {room_code: RoomBatcher}
+        self.room_batchers: Dict[str, RoomBatcher] = {}
+
+        # 各房間批次窗口覆寫 {room_code: window_ms}，未設定則使用 settings.ws_batch_window_ms
+        self.batch_windows: Dict[str, int] = {}
+
     async def connect(
         self,
         websocket: WebSocket,
         connection_id: str,
         room_code: str,
         user_data: Optional[Dict[str, Any]] = None
-    ) -> Connection:
+    ) -> Optional[Connection]:
         """
         建立新連線
 
@@ -93,11 +109,20 @@ class ConnectionManager:
             user_data: 用戶資料（可選）
 
         Returns:
-            Connection 實例
+            Connection 實例，伺服器過載時關閉連線（1013）並返回 None
         """
         await websocket.accept()
 
-        connection = Connection(websocket, connection_id, room_code, user_data)
+        # 准入控制：過載時拒絕新連線，保護進行中的戰鬥
+        admission = get_admission_controller()
+        reason = admission.check_websocket(len(self.active_connections))
+        if reason:
+            admission.rejected_websockets += 1
+            logger.warning(f"🚦 拒絕 WebSocket 連線 {connection_id}: {reason}")
+            await websocket.close(code=1013, reason="Try Again Later")
+            return None
+
+        connection = Connection(websocket, connection_id, room_code, user_data, clock=self.clock)
         self.active_connections[connection_id] = connection
 
         # 加入房間索引
@@ -130,6 +155,10 @@ class ConnectionManager:
         # 從活動連線中移除
         del self.active_connections[connection_id]
 
+        batcher = self.room_batchers.get(room_code)
+        if batcher:
+            batcher.discard(connection_id)
+
         # 從房間索引中移除
         if room_code in self.room_connections:
             if connection_id in self.room_connections[room_code]:
@@ -138,6 +167,9 @@ class ConnectionManager:
             # 如果房間沒有連線了，移除房間索引
             if len(self.room_connections[room_code]) == 0:
                 del self.room_connections[room_code]
+                batcher = self.room_batchers.pop(room_code, None)
+                if batcher:
+                    await batcher.close()
                 logger.info(f"🗑️  房間 {room_code} 已清空")
 
         logger.info(f"❌ WebSocket 斷線: {connection_id} ← 房間 {room_code}")
@@ -153,6 +185,12 @@ class ConnectionManager:
         """
         if connection_id in self.active_connections:
             connection = self.active_connections[connection_id]
+
+            batcher = self._get_batcher(connection.room_code)
+            if batcher:
+                batcher.enqueue([connection_id], message)
+                return
+
             await connection.send_json(message)
 
     async def broadcast_to_room(
@@ -176,6 +214,18 @@ class ConnectionManager:
         exclude = exclude or []
         connection_ids = self.room_connections[room_code]
 
+        # 批次模式：加入房間批次器，窗口結束時一次送出
+        batcher = self._get_batcher(room_code)
+        if batcher:
+            batcher.enqueue(
+                [
+                    conn_id for conn_id in connection_ids
+                    if conn_id not in exclude and conn_id in self.active_connections
+                ],
+                message
+            )
+            return
+
         # 並發發送訊息
         tasks = []
         for conn_id in connection_ids:
@@ -205,6 +255,56 @@ class ConnectionManager:
 
         logger.debug(f"📢 廣播訊息到所有連線: {len(tasks)} 個")
 
+    def set_batch_window(self, room_code: str, window_ms: int):
+        """
+        設定房間的批次窗口
+
+        Args:
+            room_code: 房間代碼
+            window_ms: 批次窗口（毫秒），0 表示停用批次、立即發送
+        """
+        self.batch_windows[room_code] = window_ms
+
+        batcher = self.room_batchers.pop(room_code, None)
+        if batcher:
+            # 窗口變更時先送出既有訊息，下次發送再以新窗口建立
+            asyncio.create_task(batcher.close())
+
+        logger.info(f"📦 房間 {room_code} 批次窗口: {window_ms} ms")
+
+    async def close_room(self, room_code: str):
+        """
+        釋放房間的批次器與批次窗口設定（房間回收時呼叫）
+
+        Args:
+            room_code: 房間代碼
+        """
+        self.batch_windows.pop(room_code, None)
+
+        batcher = self.room_batchers.pop(room_code, None)
+        if batcher:
+            await batcher.close()
+
+    def _get_batcher(self, room_code: str) -> Optional[RoomBatcher]:
+        """獲取房間批次器（未啟用批次則返回 None）"""
+        batcher = self.room_batchers.get(room_code)
+        if batcher:
+            return batcher
+
+        window_ms = self.batch_windows.get(room_code, settings.ws_batch_window_ms)
+        if window_ms <= 0 or room_code not in self.room_connections:
+            return None
+
+        batcher = RoomBatcher(self, room_code, window_ms)
+        self.room_batchers[room_code] = batcher
+        return batcher
+
+    async def flush_room(self, room_code: str):
+        """立即送出房間內所有批次中的訊息"""
+        batcher = self.room_batchers.get(room_code)
+        if batcher:
+            await batcher.flush()
+
     def get_room_connections(self, room_code: str) -> List[Connection]:
         """
         獲取房間內所有連線
@@ -240,7 +340,7 @@ class ConnectionManager:
 
         while True:
             try:
-                await asyncio.sleep(30)  # 每 30 秒檢查一次
+                await self.clock.sleep(30)  # 每 30 秒檢查一次
 
                 # 檢查所有連線
                 timeout_connections = []
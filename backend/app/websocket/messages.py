@@ -0,0 +1,198 @@
+"""
+WebSocket 客戶端訊息定義與處理器註冊表
+每種訊息類型對應一個型別化的訊息模型與一個處理函數
+"""
+
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+from typing import Dict, Any, Callable, Awaitable, Optional, Union, Literal, Type, Annotated
+import logging
+import time
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# ===== 客戶端 → 伺服器 訊息模型 =====
+
+class HeartbeatMessage(BaseModel):
+    """心跳"""
+    type: Literal["heartbeat"]
+
+
+class ReadyMessage(BaseModel):
+    """玩家準備"""
+    type: Literal["ready"]
+    is_ready: bool = True
+
+
+class UseSkillMessage(BaseModel):
+    """提交技能行動"""
+    type: Literal["use_skill"]
+    skill_id: Union[str, int]
+    prompt: str = Field(default="", max_length=500)
+
+
+class ChatMessage(BaseModel):
+    """聊天訊息"""
+    type: Literal["chat"]
+    message: str = Field(default="", max_length=200)
+
+
+class MessageDecodeError(Exception):
+    """訊息無法解碼（格式錯誤、未知類型或欄位驗證失敗）"""
+
+    def __init__(self, message: str, message_type: Optional[str] = None):
+        super().__init__(message)
+        self.message_type = message_type
+
+
+class MessageContext:
+    """處理器執行時的連線上下文"""
+
+    def __init__(self, websocket: Any, connection_id: str, room_code: str, room: Any):
+        self.websocket = websocket
+        self.connection_id = connection_id
+        self.room_code = room_code
+        self.room = room
+
+
+Handler = Callable[[MessageContext, Any], Awaitable[None]]
+
+
+class HandlerStats:
+    """單一處理器的延遲統計"""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, elapsed_ms: float, failed: bool = False):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        if failed:
+            self.errors += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3)
+        }
+
+
+class MessageRouter:
+    """
+    訊息處理器註冊表
+
+    功能:
+    - 以訊息類型為鍵註冊處理器與對應模型
+    - 透過 discriminated union 一次完成 JSON 解析、分派與驗證
+      （依 type 欄位直接選擇模型，未知類型不會嘗試其他模型）
+    - 記錄每個處理器的呼叫次數與延遲
+    """
+
+    def __init__(self):
+        self.handlers: Dict[str, Handler] = {}
+        self.models: Dict[str, Type[BaseModel]] = {}
+        self.stats: Dict[str, HandlerStats] = {}
+        self.rejected = 0
+        self._adapter: Optional[TypeAdapter] = None
+
+    def handler(self, model: Type[BaseModel]) -> Callable[[Handler], Handler]:
+        """
+        註冊處理器的裝飾器
+
+        Args:
+            model: 訊息模型（type 欄位須為 Literal）
+        """
+        message_type = model.model_fields["type"].annotation.__args__[0]
+
+        def decorator(func: Handler) -> Handler:
+            self.handlers[message_type] = func
+            self.models[message_type] = model
+            self.stats[message_type] = HandlerStats()
+            self._adapter = None  # 重新建立解碼器
+            return func
+
+        return decorator
+
+    def _get_adapter(self) -> TypeAdapter:
+        """獲取（或建立）所有已註冊模型的解碼器"""
+        if self._adapter is None:
+            models = tuple(self.models.values())
+            if len(models) == 1:
+                self._adapter = TypeAdapter(models[0])
+            else:
+                self._adapter = TypeAdapter(
+                    Annotated[Union[models], Field(discriminator="type")]
+                )
+        return self._adapter
+
+    def decode(self, data: Union[str, bytes]) -> BaseModel:
+        """
+        解碼並驗證訊息
+
+        Args:
+            data: 原始 JSON 文字
+
+        Returns:
+            型別化的訊息模型
+
+        Raises:
+            MessageDecodeError: 訊息過大（以 UTF-8 bytes 計算）、格式錯誤、未知類型或欄位驗證失敗
+        """
+        limit = settings.ws_max_message_size
+        if isinstance(data, str):
+            # 每個字元至少 1 byte：字元數已超過上限時不必編碼
+            if len(data) <= limit:
+                data = data.encode("utf-8", "surrogatepass")
+        if len(data) > limit:
+            self.rejected += 1
+            raise MessageDecodeError("訊息過大")
+
+        try:
+            return self._get_adapter().validate_json(data)
+        except ValidationError as e:
+            self.rejected += 1
+            error = e.errors()[0]
+            if error["type"] == "union_tag_invalid":
+                raise MessageDecodeError("未知訊息類型", error["ctx"].get("tag"))
+            if error["type"] == "union_tag_not_found":
+                raise MessageDecodeError("缺少訊息類型")
+            raise MessageDecodeError("無效的訊息格式")
+
+    async def dispatch(self, context: MessageContext, message: BaseModel):
+        """
+        執行訊息對應的處理器並記錄延遲
+
+        Args:
+            context: 連線上下文
+            message: 已解碼的訊息
+        """
+        message_type = message.type
+        stats = self.stats[message_type]
+        start = time.perf_counter()
+        failed = False
+        try:
+            await self.handlers[message_type](context, message)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            stats.record((time.perf_counter() - start) * 1000, failed)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """獲取所有處理器的統計"""
+        return {
+            "handlers": {t: s.to_dict() for t, s in self.stats.items()},
+            "rejected": self.rejected
+        }
+
+
+# 全局 MessageRouter 實例
+message_router = MessageRouter()
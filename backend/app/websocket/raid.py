@@ -0,0 +1,303 @@
+"""
+全域房間分片
+GLOBAL 是由多個分片房間（GLOBAL、GLOBAL-2、GLOBAL-3...）組成的邏輯房間，
+每個分片有自己的 Boss 與回合結算，玩家加入時分配到人數最少的分片
+"""
+
+from typing import Dict, List, Optional, Any
+import asyncio
+import logging
+
+from app.config import settings
+from app.websocket.room import room_manager, Room, GLOBAL_ROOM_CODE, is_global_room
+from app.websocket.clock import Clock, system_clock
+from app.websocket.manager import manager as ws_manager
+from app.websocket.supervisor import room_supervisor
+from app.services.boss_service import BossService, Boss
+
+logger = logging.getLogger(__name__)
+
+
+# Boss 階段：依所有分片 Boss 的剩餘血量比例（高於門檻即為該階段）
+RAID_PHASE_THRESHOLDS = (0.66, 0.33)
+
+
+class GlobalRaid:
+    """
+    全域房間分片管理器
+
+    功能:
+    - 玩家加入 GLOBAL 時分配到人數最少、尚未額滿的分片；分配時即保留名額，
+      加入完成（或失敗）後釋放，同時加入的玩家不會都擠進同一個快滿的分片
+    - 所有分片額滿時新增分片（不超過 global_max_shards）
+    - 定期（global_aggregate_interval）向所有分片廣播總覽：人數、總傷害、Boss 階段，
+      內容沒有變化時不廣播
+    - 戰鬥進行中在背景預先生成下一隻 Boss，Boss 被擊敗時直接換上（不必再等待生成）
+
+    分片即為 room_manager 中的一般房間，清空並閒置後由 RoomSupervisor 回收（GLOBAL 本身除外）。
+    """
+
+    def __init__(self, clock: Optional[Clock] = None):
+        # 總覽廣播間隔使用的時鐘
+        self.clock = clock or system_clock
+
+        self.create_lock = asyncio.Lock()
+        self.pending_joins: Dict[str, int] = {}  # 已分配但尚未完成加入的玩家數 {room_code: 人數}
+        self.aggregate_task: Optional[asyncio.Task] = None
+        self.last_aggregate: Optional[Dict[str, Any]] = None
+        self.broadcasts = 0
+
+        # 各分片預先生成中的下一隻 Boss {room_code: 任務}
+        self.next_bosses: Dict[str, asyncio.Task] = {}
+        self.prefetch_hits = 0
+        self.prefetch_misses = 0
+
+    def get_shards(self) -> List[Room]:
+        """獲取所有分片（依代碼排序，GLOBAL 在最前面）"""
+        return sorted(
+            (room for room in room_manager.get_all_rooms() if is_global_room(room.room_code)),
+            key=lambda room: (len(room.room_code), room.room_code)
+        )
+
+    def _next_shard_code(self) -> str:
+        """下一個可用的分片代碼"""
+        if room_manager.get_room(GLOBAL_ROOM_CODE) is None:
+            return GLOBAL_ROOM_CODE
+
+        number = 2
+        while room_manager.get_room(f"{GLOBAL_ROOM_CODE}-{number}"):
+            number += 1
+        return f"{GLOBAL_ROOM_CODE}-{number}"
+
+    async def create_shard(self) -> Room:
+        """創建分片（第一個分片的代碼為 GLOBAL）"""
+        room = await room_manager.create_room(
+            max_players=settings.global_shard_capacity,
+            boss_base_hp=settings.boss_base_hp,
+            room_code=self._next_shard_code()
+        )
+        room.resolution_mode = settings.global_resolution_mode
+        logger.info(f"✅ 全域房間分片已創建: {room.room_code} (結算模式: {room.resolution_mode})")
+        return room
+
+    def _load(self, room: Room) -> int:
+        """分片目前的人數（包含已保留名額）"""
+        return len(room.members) + self.pending_joins.get(room.room_code, 0)
+
+    def _least_loaded(self) -> Optional[Room]:
+        """人數最少且尚未額滿的分片（包含已保留名額）"""
+        candidates = [room for room in self.get_shards() if self._load(room) < room.max_players]
+        if not candidates:
+            return None
+        return min(candidates, key=self._load)
+
+    def _reserve(self, room: Room) -> Room:
+        """為分配到的玩家保留名額"""
+        self.pending_joins[room.room_code] = self.pending_joins.get(room.room_code, 0) + 1
+        return room
+
+    def release(self, room_code: str):
+        """
+        釋放 assign() 保留的名額（加入完成或失敗後呼叫）
+
+        Args:
+            room_code: assign() 返回的分片代碼
+        """
+        count = self.pending_joins.get(room_code, 0) - 1
+        if count > 0:
+            self.pending_joins[room_code] = count
+        else:
+            self.pending_joins.pop(room_code, None)
+
+    async def assign(self) -> Optional[Room]:
+        """
+        為新玩家分配分片並保留名額（呼叫者加入後須以 release() 釋放）
+
+        Returns:
+            分片房間；所有分片額滿且已達分片上限時返回 None
+        """
+        shard = self._least_loaded()
+        if shard:
+            return self._reserve(shard)
+
+        async with self.create_lock:
+            # 等待鎖期間可能已有其他連線創建了分片
+            shard = self._least_loaded()
+            if shard:
+                return self._reserve(shard)
+
+            if len(self.get_shards()) >= settings.global_max_shards:
+                logger.warning(f"⚠️  GLOBAL 所有分片已滿（{settings.global_max_shards} 個）")
+                return None
+
+            return self._reserve(await self.create_shard())
+
+    # ===== Boss 輪替 =====
+
+    def prefetch_boss(self, room: Room):
+        """
+        在背景預先生成分片的下一隻 Boss（已在生成中則略過）
+
+        任務由 RoomSupervisor 持有，分片清空或回收時一併取消。
+        """
+        room_code = room.room_code
+        task = self.next_bosses.get(room_code)
+        if task is not None and not task.cancelled():
+            return
+
+        task = asyncio.create_task(BossService.generate_boss(
+            player_count=len(room.members),
+            base_hp=room.boss_base_hp
+        ))
+        self.next_bosses[room_code] = task
+        room_supervisor.track(room_code, task)
+
+        def discard(done: asyncio.Task):
+            # 被取消的預先生成不保留；完成的結果留到輪替時取用
+            if done.cancelled() and self.next_bosses.get(room_code) is done:
+                del self.next_bosses[room_code]
+
+        task.add_done_callback(discard)
+
+    async def next_boss(self, room: Room) -> Boss:
+        """
+        取得分片的下一隻 Boss（優先使用預先生成的結果），並依目前玩家數量調整強度
+
+        Args:
+            room: 分片房間
+
+        Returns:
+            Boss 實例
+        """
+        task = self.next_bosses.pop(room.room_code, None)
+        boss = None
+
+        if task is not None and not task.cancelled():
+            try:
+                boss = await asyncio.shield(task)
+            except asyncio.CancelledError:
+                # 只忽略預先生成任務本身被取消的情況
+                if not task.cancelled():
+                    raise
+            except Exception as e:
+                logger.error(f"❌ 預先生成 Boss 失敗: {e}")
+
+        if boss is None:
+            self.prefetch_misses += 1
+            boss = await BossService.generate_boss(
+                player_count=len(room.members),
+                base_hp=room.boss_base_hp
+            )
+        else:
+            self.prefetch_hits += 1
+
+        return BossService.scale_boss(boss, len(room.members), room.boss_base_hp)
+
+    # ===== 跨分片總覽 =====
+
+    def get_aggregate(self) -> Dict[str, Any]:
+        """計算所有分片的總覽"""
+        shards = self.get_shards()
+        fighting = [room for room in shards if room.status == "battle" and room.boss_max_hp > 0]
+
+        boss_hp = sum(room.boss_hp for room in fighting)
+        boss_max_hp = sum(room.boss_max_hp for room in fighting)
+        remaining = boss_hp / boss_max_hp if boss_max_hp else 1.0
+
+        phase = 1 + sum(1 for threshold in RAID_PHASE_THRESHOLDS if remaining <= threshold)
+
+        return {
+            "shards": len(shards),
+            "players": sum(len(room.members) for room in shards),
+            "fighting_shards": len(fighting),
+            "boss_hp": boss_hp,
+            "boss_max_hp": boss_max_hp,
+            "total_damage": boss_max_hp - boss_hp,
+            "phase": phase
+        }
+
+    def get_overview(self) -> Dict[str, Any]:
+        """
+        GLOBAL 邏輯房間的總覽（房間資訊與觀戰使用）：所有分片的合計與各分片摘要
+
+        Returns:
+            get_aggregate() 的內容，加上 shard_rooms: [{room_code, status, players, ...}]
+        """
+        return {
+            **self.get_aggregate(),
+            "shard_rooms": [
+                {
+                    "room_code": room.room_code,
+                    "status": room.status,
+                    "players": len(room.members),
+                    "max_players": room.max_players,
+                    "boss_hp": room.boss_hp,
+                    "boss_max_hp": room.boss_max_hp
+                }
+                for room in self.get_shards()
+            ]
+        }
+
+    def _prune_next_bosses(self):
+        """移除已回收分片的預先生成結果"""
+        for room_code in [code for code in self.next_bosses if room_manager.get_room(code) is None]:
+            task = self.next_bosses.pop(room_code)
+            task.cancel()
+
+    async def broadcast_aggregate(self):
+        """向所有分片廣播總覽（內容沒有變化時略過）"""
+        self._prune_next_bosses()
+        aggregate = self.get_aggregate()
+        if aggregate == self.last_aggregate:
+            return
+        self.last_aggregate = aggregate
+
+        message = {"type": "raid_update", "data": aggregate}
+        for room in self.get_shards():
+            if room.members:
+                await ws_manager.broadcast_to_room(room.room_code, message)
+        self.broadcasts += 1
+
+    def start(self):
+        """啟動總覽廣播任務（如果尚未啟動）"""
+        if self.aggregate_task is None or self.aggregate_task.done():
+            self.aggregate_task = asyncio.create_task(self._aggregate_loop())
+
+    async def _aggregate_loop(self):
+        """背景任務：定期廣播跨分片總覽"""
+        logger.info("🌐 GLOBAL 分片總覽任務啟動")
+        while True:
+            try:
+                await self.clock.sleep(settings.global_aggregate_interval)
+                await self.broadcast_aggregate()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"❌ GLOBAL 分片總覽錯誤: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """獲取分片狀態"""
+        return {
+            **self.get_aggregate(),
+            "capacity_per_shard": settings.global_shard_capacity,
+            "max_shards": settings.global_max_shards,
+            "pending_joins": sum(self.pending_joins.values()),
+            "broadcasts": self.broadcasts,
+            "prefetched_bosses": sum(1 for task in self.next_bosses.values() if task.done()),
+            "prefetch_hits": self.prefetch_hits,
+            "prefetch_misses": self.prefetch_misses,
+            "shard_rooms": [
+                {
+                    "room_code": room.room_code,
+                    "status": room.status,
+                    "players": len(room.members),
+                    "boss_hp": room.boss_hp,
+                    "boss_max_hp": room.boss_max_hp
+                }
+                for room in self.get_shards()
+            ]
+        }
+
+
+# 全局 GlobalRaid 實例
+global_raid = GlobalRaid()
@@ -3,20 +3,37 @@
 處理房間創建、加入、離開、狀態管理
 """
 
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Callable, Awaitable, Tuple
 import logging
 import random
 import string
 import asyncio
 from datetime import datetime
-from time import time
 
 from app.database import get_service_db
+from app.services.skills_service import get_skills_service, to_skill_id
 from app.config import settings
+from app.websocket.actor import RoomActor
+from app.websocket.clock import Clock, system_clock
 
 logger = logging.getLogger(__name__)
 
 
+# 成員資料只保留對戰需要的欄位，圖片改由 sprite 端點提供
+MEMBER_POKEMON_FIELDS = ("id", "name", "type", "stats")
+
+# 技能配置缺失或無效時的預設技能
+FALLBACK_SKILL = {"id": "skill_fallback", "name": "撞擊", "type": "normal", "power": 40}
+
+# 全域房間（邏輯房間，由 GLOBAL、GLOBAL-2、GLOBAL-3... 等分片組成）
+GLOBAL_ROOM_CODE = "GLOBAL"
+
+
+def is_global_room(room_code: str) -> bool:
+    """是否為全域房間的分片（允許隨時加入、自動準備、不因戰鬥結束被回收）"""
+    return room_code == GLOBAL_ROOM_CODE or room_code.startswith(f"{GLOBAL_ROOM_CODE}-")
+
+
 class RoomMember:
     """房間成員"""
 
@@ -25,16 +42,43 @@ class RoomMember:
         connection_id: str,
         pokemon_id: str,
         pokemon_data: Dict[str, Any],
-        player_name: str = "Trainer"
+        player_name: str = "Trainer",
+        skills: Optional[List[Dict[str, Any]]] = None
     ):
         self.connection_id = connection_id
         self.pokemon_id = pokemon_id
-        self.pokemon_data = pokemon_data
+        self.pokemon_data = {
+            key: pokemon_data[key] for key in MEMBER_POKEMON_FIELDS if key in pokemon_data
+        }
         self.player_name = player_name
         self.is_ready = False
         self.current_hp = pokemon_data.get("stats", {}).get("hp", 100)
         self.max_hp = self.current_hp
 
+        # 技能配置 {skill_id: 技能}，提交行動時直接查表
+        self.skills: Dict[str, Dict[str, Any]] = {skill["id"]: skill for skill in skills or []}
+
+        # 超時使用的預設技能：同屬性中威力最低者（沒有同屬性技能則從全部技能中選）
+        pokemon_type = self.pokemon_data.get("type", "normal")
+        same_type = [skill for skill in self.skills.values() if skill["type"] == pokemon_type]
+        candidates = same_type or list(self.skills.values())
+        self.default_skill = min(candidates, key=lambda skill: skill["power"]) if candidates else FALLBACK_SKILL
+
+    def get_skill(self, skill_id: Any) -> Optional[Dict[str, Any]]:
+        """
+        從技能配置中獲取技能
+
+        Args:
+            skill_id: 技能 ID 或數字編號
+
+        Returns:
+            技能字典，不在配置中返回 None
+        """
+        skill_id = to_skill_id(skill_id)
+        if skill_id == self.default_skill["id"]:
+            return self.default_skill
+        return self.skills.get(skill_id)
+
     def to_dict(self) -> Dict[str, Any]:
         """轉換為字典"""
         return {
@@ -44,7 +88,10 @@ class RoomMember:
             "pokemon": {
                 "name": self.pokemon_data.get("name", "Unknown"),
                 "type": self.pokemon_data.get("type", "normal"),
-                "front_image": self.pokemon_data.get("front_image_url", ""),
+                "sprites": {
+                    "front": f"/api/v1/pokemon/{self.pokemon_id}/sprite/front",
+                    "back": f"/api/v1/pokemon/{self.pokemon_id}/sprite/back"
+                },
                 "stats": self.pokemon_data.get("stats", {}),
             },
             "is_ready": self.is_ready,
@@ -60,11 +107,14 @@ class Room:
         self,
         room_code: str,
         max_players: int = 4,
-        boss_base_hp: int = 1000
+        boss_base_hp: int = 1000,
+        clock: Optional[Clock] = None
     ):
         self.room_code = room_code
         self.max_players = max_players
         self.boss_base_hp = boss_base_hp
+        self.clock = clock or system_clock  # 回合計時與保留時間的時間來源
+        self.last_activity = self.clock.now()  # 最後一次成員進出或提交行動（閒置回收用）
         self.status = "waiting"  # waiting, ready, battle, finished
         self.members: Dict[str, RoomMember] = {}
         self.boss_hp = 0
@@ -73,13 +123,64 @@ class Room:
         self.battle_log: List[Dict[str, Any]] = []
         self.created_at = datetime.now()
 
+        # 結算模式: "turn" = 回合制（等待所有人或期限），"rolling" = 連續結算（小批次 + Boss 固定節奏反擊）
+        self.resolution_mode = "turn"
+
         # 回合計時器 (Phase 3)
         self.turn_duration = 30  # 30 秒
-        self.turn_start_time: Optional[float] = None  # 回合開始時間 (timestamp)
-        self.turn_timer_task: Optional[asyncio.Task] = None  # 計時器任務
+        self.turn_start_time: Optional[float] = None  # 回合開始時間（clock.now()）
+
+        # Boss 實體（開始戰鬥時設定，戰鬥停止或房間回收時釋放）
+        self.boss: Optional[Any] = None
+
+        # Boss 策略與傷害表（開始戰鬥時建立，成員變動後於下次 Boss 反擊前重建）
+        self.boss_strategy: Optional[Any] = None
 
         # 行動收集 (Phase 4)
         self.pending_actions: Dict[str, Dict[str, Any]] = {}  # {connection_id: {skill, prompt}}
+        self.last_action_at: Dict[str, float] = {}  # 連續結算的行動冷卻 {connection_id: 上次提交時間}
+
+        # 提交行動時即開始的背景工作（Prompt 評分 + 傷害計算）
+        # action_evaluator(connection_id, skill, prompt) 由開始戰鬥時設定，返回預先計算的結果
+        self.action_evaluator: Optional[Callable[[str, Dict[str, Any], str], Awaitable[Dict[str, Any]]]] = None
+        self.action_jobs: Dict[str, asyncio.Task] = {}  # {connection_id: 工作}
+        self.prompt_batcher: Optional[Any] = None  # Prompt 評分微批次（開始戰鬥時建立）
+
+        # 所有狀態修改（加入、離開、準備、提交、結算）都經由 Actor 依序執行
+        self.actor = RoomActor()
+
+    @property
+    def status(self) -> str:
+        """房間狀態: waiting, ready, battle, finished"""
+        return self._status
+
+    @status.setter
+    def status(self, value: str):
+        # 記錄狀態轉換時間（戰鬥結束後依此計算保留時間）
+        if getattr(self, "_status", None) != value:
+            self._status = value
+            self.status_changed_at = self.clock.now()
+            self.last_activity = self.status_changed_at
+
+    def touch(self):
+        """更新最後活動時間"""
+        self.last_activity = self.clock.now()
+
+    def reset(self):
+        """重設為等待狀態（釋放 Boss 與本回合的行動）"""
+        self.status = "waiting"
+        self.boss = None
+        self.boss_strategy = None
+        self.boss_hp = 0
+        self.boss_max_hp = 0
+        self.current_turn = 0
+        self.battle_log = []
+        self.turn_start_time = None
+        self.action_evaluator = None
+        self.pending_actions = {}
+        self.last_action_at = {}
+        self.cancel_action_jobs()
+        self.close_prompt_batcher()
 
     def add_member(self, member: RoomMember) -> bool:
         """
@@ -97,6 +198,7 @@ class Room:
             return False
 
         self.members[member.connection_id] = member
+        self.touch()
         logger.info(f"✅ 成員加入房間 {self.room_code}: {member.player_name}")
         return True
 
@@ -112,6 +214,10 @@ class Room:
 
         member = self.members[connection_id]
         del self.members[connection_id]
+        self.pending_actions.pop(connection_id, None)
+        self.last_action_at.pop(connection_id, None)
+        self._cancel_action_job(connection_id)
+        self.touch()
         logger.info(f"❌ 成員離開房間 {self.room_code}: {member.player_name}")
 
         # 如果房間空了，標記為 finished
@@ -132,9 +238,12 @@ class Room:
         return all(member.is_ready for member in self.members.values())
 
     def start_turn(self):
-        """開始新回合"""
-        self.turn_start_time = time()
-        self.pending_actions = {}
+        """
+        開始新回合
+
+        上一回合的行動已由 take_actions 取出；結算期間提交的行動計入新回合。
+        """
+        self.turn_start_time = self.clock.now()
         logger.info(f"⏱️  房間 {self.room_code} 開始回合 {self.current_turn + 1}")
 
     def get_remaining_time(self) -> float:
@@ -142,32 +251,168 @@ class Room:
         if self.turn_start_time is None:
             return 0.0
 
-        elapsed = time() - self.turn_start_time
+        elapsed = self.clock.now() - self.turn_start_time
         remaining = max(0.0, self.turn_duration - elapsed)
         return remaining
 
-    def submit_action(self, connection_id: str, skill_id: int, prompt: str = ""):
+    def submit_action(self, connection_id: str, skill_id: Any, prompt: str = ""):
         """
         提交玩家行動
 
         Args:
             connection_id: 玩家 ID
-            skill_id: 技能 ID
+            skill_id: 技能 ID（須在玩家的技能配置中）
             prompt: 玩家的戰術描述 Prompt
         """
-        if connection_id not in self.members:
+        member = self.members.get(connection_id)
+        if member is None:
             logger.warning(f"⚠️  無效的玩家 ID: {connection_id}")
             return False
 
+        skill = member.get_skill(skill_id)
+        if skill is None:
+            logger.warning(f"⚠️  玩家 {connection_id} 沒有技能 {skill_id}")
+            return False
+
+        if self.get_action_cooldown(connection_id) > 0:
+            logger.warning(f"⚠️  玩家 {connection_id} 行動冷卻中")
+            return False
+
+        now = self.clock.now()
+        self.touch()
         self.pending_actions[connection_id] = {
-            "skill_id": skill_id,
+            "skill_id": skill["id"],
+            "skill": skill,
             "prompt": prompt,
-            "submitted_at": time()
+            "submitted_at": now
         }
+        if self.resolution_mode == "rolling":
+            self.last_action_at[connection_id] = now
+
+        # 重新提交時取消舊的工作，以新的行動重新計算
+        self._cancel_action_job(connection_id)
+        if self.action_evaluator is not None:
+            self.action_jobs[connection_id] = asyncio.create_task(
+                self.action_evaluator(connection_id, skill, prompt)
+            )
 
-        logger.info(f"✅ 玩家 {connection_id} 提交行動: 技能 {skill_id}")
+        logger.info(f"✅ 玩家 {connection_id} 提交行動: 技能 {skill['name']}")
         return True
 
+    def get_action_cooldown(self, connection_id: str) -> float:
+        """
+        連續結算模式下玩家距離下次可提交行動的剩餘秒數
+
+        每位玩家在 ROLLING_ACTION_COOLDOWN_MS（至少一個小批次間隔）內只接受一次行動，
+        避免單一玩家以大量提交佔滿評分與結算。回合制不受限制。
+
+        Returns:
+            剩餘冷卻秒數（0 表示可以提交）
+        """
+        if self.resolution_mode != "rolling":
+            return 0.0
+        last = self.last_action_at.get(connection_id)
+        if last is None:
+            return 0.0
+        cooldown = max(settings.rolling_action_cooldown_ms, settings.rolling_batch_interval_ms) / 1000
+        return max(0.0, last + cooldown - self.clock.now())
+
+    def _cancel_action_job(self, connection_id: str):
+        """取消玩家尚未完成的背景工作"""
+        job = self.action_jobs.pop(connection_id, None)
+        if job and not job.done():
+            job.cancel()
+
+    def cancel_action_jobs(self):
+        """取消所有玩家的背景工作"""
+        for connection_id in list(self.action_jobs):
+            self._cancel_action_job(connection_id)
+
+    def close_prompt_batcher(self):
+        """取消尚未完成的 Prompt 評分並釋放微批次"""
+        if self.prompt_batcher is not None:
+            self.prompt_batcher.close()
+            self.prompt_batcher = None
+
+    def take_actions(
+        self,
+        connection_ids: Optional[List[str]] = None
+    ) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, asyncio.Task]]:
+        """
+        取出本回合的行動與其背景工作（之後提交的行動計入下一回合）
+
+        Args:
+            connection_ids: 只取出這些玩家的行動（連續結算模式），None = 全部
+
+        Returns:
+            (行動 {connection_id: 行動}, 背景工作 {connection_id: 工作})
+        """
+        if connection_ids is None:
+            actions, self.pending_actions = self.pending_actions, {}
+        else:
+            actions = {
+                connection_id: self.pending_actions.pop(connection_id)
+                for connection_id in connection_ids
+                if connection_id in self.pending_actions
+            }
+        jobs = {
+            connection_id: self.action_jobs.pop(connection_id)
+            for connection_id in actions
+            if connection_id in self.action_jobs
+        }
+        return actions, jobs
+
+    @staticmethod
+    async def collect_action_results(
+        jobs: Dict[str, asyncio.Task],
+        timeout: float,
+        clock: Optional[Clock] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        收集行動的預先計算結果
+
+        大部分工作在提交後已完成；期限內仍未完成者會被取消。
+
+        Args:
+            jobs: take_actions 取出的背景工作
+            timeout: 最多等待的秒數
+            clock: 計算期限的時鐘（房間的時鐘），None = 系統時鐘
+
+        Returns:
+            {connection_id: 結果}，只包含成功完成的工作
+        """
+        if jobs:
+            await (clock or system_clock).wait_tasks(jobs.values(), timeout)
+            for job in jobs.values():
+                if not job.done():
+                    job.cancel()
+
+        results = {}
+        for connection_id, job in jobs.items():
+            if job.done() and not job.cancelled() and job.exception() is None:
+                results[connection_id] = job.result()
+        return results
+
+    def get_ready_action_ids(self, deadline: float) -> List[str]:
+        """
+        獲取可以結算的行動（連續結算模式）
+
+        背景評分已完成、沒有背景工作，或提交超過 deadline 秒的行動
+
+        Args:
+            deadline: 評分期限（秒）
+
+        Returns:
+            玩家 ID 列表（依提交順序）
+        """
+        now = self.clock.now()
+        ready = []
+        for connection_id, action in self.pending_actions.items():
+            job = self.action_jobs.get(connection_id)
+            if job is None or job.done() or now - action["submitted_at"] >= deadline:
+                ready.append(connection_id)
+        return ready
+
     def is_all_actions_submitted(self) -> bool:
         """檢查是否所有玩家都已提交行動"""
         return len(self.pending_actions) == len(self.members)
@@ -224,6 +469,7 @@ class Room:
         return {
             "room_code": self.room_code,
             "status": self.status,
+            "resolution_mode": self.resolution_mode,
             "max_players": self.max_players,
             "current_players": len(self.members),
             "members": [member.to_dict() for member in self.members.values()],
@@ -253,10 +499,16 @@ class RoomManager:
     - 房間狀態管理
     """
 
-    def __init__(self):
+    def __init__(self, clock: Optional[Clock] = None):
         # 所有活動房間 {room_code: Room}
         self.rooms: Dict[str, Room] = {}
 
+        # 新房間使用的時鐘（模擬 / 壓力測試可替換為 VirtualClock）
+        self.clock = clock or system_clock
+
+        # pokemon 資料表是否有技能配置欄位（尚未執行 005_pokemon_skill_loadout 遷移時為 False）
+        self.has_skill_loadout = True
+
     def generate_room_code(self) -> str:
         """
         生成 8 位房間代碼
@@ -274,7 +526,8 @@ class RoomManager:
     async def create_room(
         self,
         max_players: int = 4,
-        boss_base_hp: Optional[int] = None
+        boss_base_hp: Optional[int] = None,
+        room_code: Optional[str] = None
     ) -> Room:
         """
         創建房間
@@ -282,6 +535,7 @@ class RoomManager:
         Args:
             max_players: 最大玩家數（2-99，全域房間可設為 99）
             boss_base_hp: Boss 基礎血量
+            room_code: 指定房間代碼（全域房間分片使用），None = 隨機產生
 
         Returns:
             Room 實例
@@ -290,8 +544,8 @@ class RoomManager:
         max_players = max(2, min(99, max_players))
         boss_base_hp = boss_base_hp or settings.boss_base_hp
 
-        room_code = self.generate_room_code()
-        room = Room(room_code, max_players, boss_base_hp)
+        room_code = room_code or self.generate_room_code()
+        room = Room(room_code, max_players, boss_base_hp, clock=self.clock)
         self.rooms[room_code] = room
 
         # 儲存到資料庫
@@ -337,18 +591,18 @@ class RoomManager:
         room = self.rooms[room_code]
 
         # 檢查房間狀態（GLOBAL 房間允許隨時加入）
-        if room.status != "waiting" and room_code != "GLOBAL":
+        if room.status != "waiting" and not is_global_room(room_code):
             logger.warning(f"⚠️  房間 {room_code} 已開始或結束")
             return None
 
         # GLOBAL 房間允許在戰鬥中加入
-        if room_code == "GLOBAL" and room.status == "battle":
+        if is_global_room(room_code) and room.status == "battle":
             logger.info(f"✅ 玩家 {player_name} 加入進行中的戰鬥")
 
         # 獲取寶可夢資料
         try:
             db = get_service_db()
-            result = db.table("pokemon").select("*").eq("id", pokemon_id).execute()
+            result = self._select_pokemon(db, pokemon_id)
 
             if not result.data or len(result.data) == 0:
                 logger.warning(f"⚠️  找不到寶可夢: {pokemon_id}")
@@ -359,15 +613,21 @@ class RoomManager:
             logger.error(f"❌ 獲取寶可夢資料失敗: {e}")
             return None
 
+        # 解析技能配置（舊資料沒有配置時依屬性分配一次，整場戰鬥固定）
+        skills_service = get_skills_service()
+        skills = skills_service.get_skills(pokemon_data.get("skill_ids") or [])
+        if not skills:
+            skills = skills_service.get_skills_by_type(pokemon_data.get("type", "normal"), count=12)
+
         # 創建成員並加入房間
-        member = RoomMember(connection_id, pokemon_id, pokemon_data, player_name)
+        member = RoomMember(connection_id, pokemon_id, pokemon_data, player_name, skills)
 
         # GLOBAL 房間自動設為準備好（無需等待）
-        if room_code == "GLOBAL":
+        if is_global_room(room_code):
             member.is_ready = True
             logger.info(f"✅ GLOBAL 房間玩家 {player_name} 自動設為準備狀態")
 
-        if not room.add_member(member):
+        if not await room.actor.call(lambda: room.add_member(member)):
             return None
 
         # 儲存到資料庫
@@ -376,13 +636,33 @@ class RoomManager:
                 "room_id": room_code,  # 使用 room_code 作為臨時 ID
                 "pokemon_id": pokemon_id,
                 "user_id": connection_id,
-                "is_ready": room_code == "GLOBAL"  # GLOBAL 房間自動準備
+                "is_ready": is_global_room(room_code)  # GLOBAL 房間自動準備
             }).execute()
         except Exception as e:
             logger.error(f"❌ 儲存房間成員失敗: {e}")
 
         return room
 
+    def _select_pokemon(self, db, pokemon_id: str):
+        """
+        查詢加入房間所需的寶可夢資料（包含技能配置）
+
+        資料庫尚未執行 005_pokemon_skill_loadout 遷移（沒有 skill_ids 欄位）時改為不查詢技能配置，
+        之後的查詢也不再嘗試該欄位（技能依屬性分配）
+        """
+        if self.has_skill_loadout:
+            try:
+                return db.table("pokemon").select(
+                    ", ".join(MEMBER_POKEMON_FIELDS + ("skill_ids",))
+                ).eq("id", pokemon_id).execute()
+            except Exception as e:
+                if "skill_ids" not in str(e):
+                    raise
+                logger.warning("⚠️  pokemon 資料表沒有 skill_ids 欄位（尚未執行 005 遷移），改依屬性分配技能")
+                self.has_skill_loadout = False
+
+        return db.table("pokemon").select(", ".join(MEMBER_POKEMON_FIELDS)).eq("id", pokemon_id).execute()
+
     async def leave_room(self, room_code: str, connection_id: str):
         """
         離開房間
@@ -395,12 +675,9 @@ class RoomManager:
             return
 
         room = self.rooms[room_code]
-        room.remove_member(connection_id)
+        await room.actor.call(lambda: room.remove_member(connection_id))
 
-        # 如果房間空了，移除房間
-        if len(room.members) == 0:
-            del self.rooms[room_code]
-            logger.info(f"🗑️  刪除空房間: {room_code}")
+        # 空房間不立即刪除，由 RoomSupervisor 在閒置超過 room_idle_ttl 後回收
 
     def get_room(self, room_code: str) -> Optional[Room]:
         """獲取房間"""
@@ -410,6 +687,13 @@ class RoomManager:
         """獲取所有房間"""
         return list(self.rooms.values())
 
+    def remove_room(self, room_code: str) -> Optional[Room]:
+        """移除房間（返回被移除的房間）"""
+        room = self.rooms.pop(room_code, None)
+        if room:
+            logger.info(f"🗑️  刪除房間: {room_code}")
+        return room
+
 
 # 全局 RoomManager 實例
 room_manager = RoomManager()
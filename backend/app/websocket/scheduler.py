@@ -0,0 +1,156 @@
+"""
+回合期限排程器
+以單一背景任務管理所有房間的回合期限，取代每個房間每秒輪詢的計時器
+"""
+
+from typing import Dict, List, Tuple, Optional, Callable, Awaitable, Set, Any
+import asyncio
+import heapq
+import itertools
+import logging
+
+from app.websocket.clock import Clock, system_clock
+
+logger = logging.getLogger(__name__)
+
+
+Callback = Callable[[], Awaitable[Any]]
+
+
+class TurnScheduler:
+    """
+    回合期限排程器
+
+    功能:
+    - 以 min-heap 保存所有房間的期限，只在最早的期限到達時喚醒
+    - 期限到達時以獨立任務執行回呼（不阻塞排程器）
+    - 支援立即觸發（例如所有玩家都已提交行動）與取消
+
+    成本只與事件數量有關，與房間數 × 秒數無關。
+    """
+
+    def __init__(self, clock: Optional[Clock] = None):
+        # 期限的時間來源（模擬 / 壓力測試可替換為 VirtualClock 快轉）
+        self.clock = clock or system_clock
+
+        # (deadline, seq, key)；過期或被取代的項目在彈出時略過
+        self.heap: List[Tuple[float, int, str]] = []
+
+        # 每個 key 目前有效的排程 {key: (deadline, seq, callback)}
+        self.entries: Dict[str, Tuple[float, int, Callback]] = {}
+
+        self.seq = itertools.count()
+        self.wakeup = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.running: Set[asyncio.Task] = set()
+        self.fired = 0
+
+    def _now(self) -> float:
+        return self.clock.now()
+
+    def schedule(self, key: str, delay: float, callback: Callback):
+        """
+        排程（同一 key 的舊排程會被取代）
+
+        Args:
+            key: 排程鍵（通常是房間代碼）
+            delay: 幾秒後觸發
+            callback: 觸發時執行的協程函數
+        """
+        deadline = self._now() + max(0.0, delay)
+        seq = next(self.seq)
+        self.entries[key] = (deadline, seq, callback)
+        heapq.heappush(self.heap, (deadline, seq, key))
+
+        # 新期限比目前等待的更早時喚醒排程器
+        if self.heap[0][1] == seq:
+            self.wakeup.set()
+
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+
+    def fire_now(self, key: str):
+        """立即觸發某個排程（不存在則忽略）"""
+        entry = self.entries.get(key)
+        if entry:
+            self.schedule(key, 0, entry[2])
+
+    def cancel(self, key: str):
+        """取消排程"""
+        self.entries.pop(key, None)
+
+    def cancel_room(self, room_code: str):
+        """
+        取消房間的所有排程
+
+        排程鍵為房間代碼（回合結算）或「房間代碼:用途」（例如連續結算的小批次與 Boss 反擊）
+        """
+        prefix = f"{room_code}:"
+        keys = [key for key in self.entries if key == room_code or key.startswith(prefix)]
+        if not keys:
+            return
+        for key in keys:
+            del self.entries[key]
+
+        # 一併移除佇列中的項目（房間關閉不常發生，不必等到彈出時才略過）；
+        # 排程器若正在等待被移除的期限，醒來後會發現佇列已變而重新等待
+        self.heap = [item for item in self.heap if self._is_current(item)]
+        heapq.heapify(self.heap)
+
+    def get_remaining(self, key: str) -> Optional[float]:
+        """獲取距離期限的秒數（無排程返回 None）"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        return max(0.0, entry[0] - self._now())
+
+    def _is_current(self, item: Tuple[float, int, str]) -> bool:
+        entry = self.entries.get(item[2])
+        return entry is not None and entry[1] == item[1]
+
+    async def _run(self):
+        """背景任務：等待最早的期限並觸發"""
+        logger.info("⏱️  回合排程器啟動")
+
+        while True:
+            try:
+                # 移除已取消或被取代的項目
+                while self.heap and not self._is_current(self.heap[0]):
+                    heapq.heappop(self.heap)
+
+                self.wakeup.clear()
+
+                if not self.heap:
+                    await self.wakeup.wait()
+                    continue
+
+                delay = self.heap[0][0] - self._now()
+                if delay > 0:
+                    await self.clock.wait(self.wakeup, delay)
+                    continue
+
+                _, _, key = heapq.heappop(self.heap)
+                _, _, callback = self.entries.pop(key)
+                self.fired += 1
+
+                task = asyncio.create_task(callback())
+                self.running.add(task)
+                task.add_done_callback(self.running.discard)
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"❌ 回合排程器錯誤: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """獲取排程器統計"""
+        return {
+            "scheduled": len(self.entries),
+            "heap_size": len(self.heap),
+            "running_callbacks": len(self.running),
+            "fired": self.fired
+        }
+
+
+# 全局 TurnScheduler 實例
+turn_scheduler = TurnScheduler()
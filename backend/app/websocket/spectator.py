@@ -0,0 +1,157 @@
+"""
+觀戰串流
+提供唯讀的房間快照串流（Server-Sent Events），供直播畫面與大廳螢幕使用
+"""
+
+from typing import Dict, Optional, AsyncIterator
+import asyncio
+import json
+import logging
+
+from app.config import settings
+from app.websocket.room import room_manager, is_global_room
+from app.websocket.raid import global_raid
+
+logger = logging.getLogger(__name__)
+
+
+class SpectatorFeed:
+    """
+    單一房間的觀戰快照緩衝
+
+    每個 tick 由發布任務將房間狀態編碼一次成 SSE frame，
+    所有觀眾共用同一份已編碼的 bytes，觀眾數量不影響序列化成本。
+    """
+
+    def __init__(self, room_code: str):
+        self.room_code = room_code
+        self.frame: bytes = b""
+        self.version = 0
+        self.viewers = 0
+        self.closed = False
+        self.updated = asyncio.Event()
+        self.publisher_task: Optional[asyncio.Task] = None
+
+    def publish(self, frame: bytes):
+        """發布新快照並喚醒所有等待中的觀眾"""
+        self.frame = frame
+        self.version += 1
+        updated, self.updated = self.updated, asyncio.Event()
+        updated.set()
+
+    def close(self, frame: bytes):
+        """發布最後一個 frame 並結束串流"""
+        self.closed = True
+        self.publish(frame)
+
+
+class SpectatorHub:
+    """
+    觀戰串流管理器
+
+    功能:
+    - 每個房間一個共用快照緩衝與一個發布任務（僅在有觀眾時運行）
+    - 快照節流：每 spectator_tick_interval 秒最多編碼一次
+    - 觀眾只讀取已編碼的 frame，不經過 ConnectionManager，也不佔用玩家名額
+    """
+
+    KEEPALIVE_INTERVAL = 15  # 秒
+
+    def __init__(self):
+        # {room_code: SpectatorFeed}
+        self.feeds: Dict[str, SpectatorFeed] = {}
+
+    def get_viewer_count(self, room_code: Optional[str] = None) -> int:
+        """獲取觀眾數（不指定房間則為全部）"""
+        if room_code is not None:
+            feed = self.feeds.get(room_code)
+            return feed.viewers if feed else 0
+        return sum(feed.viewers for feed in self.feeds.values())
+
+    @staticmethod
+    def _encode(event: str, data: Dict) -> bytes:
+        """編碼為 SSE frame"""
+        payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        return f"event: {event}\ndata: {payload}\n\n".encode("utf-8")
+
+    def _get_feed(self, room_code: str) -> SpectatorFeed:
+        """獲取房間快照緩衝，必要時啟動發布任務"""
+        feed = self.feeds.get(room_code)
+        if feed is None:
+            feed = SpectatorFeed(room_code)
+            self.feeds[room_code] = feed
+
+        if feed.publisher_task is None or feed.publisher_task.done():
+            feed.publisher_task = asyncio.create_task(self._publisher(feed))
+
+        return feed
+
+    async def _publisher(self, feed: SpectatorFeed):
+        """
+        背景任務：定期編碼房間快照
+
+        房間狀態未變化時不重新發布；房間消失時發布 end 並結束。
+        """
+        logger.info(f"📺 房間 {feed.room_code} 觀戰串流啟動")
+        last_snapshot = None
+
+        try:
+            while feed.viewers > 0:
+                room = room_manager.get_room(feed.room_code)
+                if room is None:
+                    feed.close(self._encode("end", {"room_code": feed.room_code}))
+                    break
+
+                snapshot = room.to_dict()
+                if is_global_room(feed.room_code):
+                    # GLOBAL 由多個分片組成，附帶所有分片的總覽
+                    snapshot["raid"] = global_raid.get_overview()
+                if snapshot != last_snapshot:
+                    feed.publish(self._encode("snapshot", snapshot))
+                    last_snapshot = snapshot
+
+                await asyncio.sleep(settings.spectator_tick_interval)
+
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"❌ 觀戰串流錯誤: {e}")
+        finally:
+            if self.feeds.get(feed.room_code) is feed and (feed.viewers == 0 or feed.closed):
+                del self.feeds[feed.room_code]
+            logger.info(f"📺 房間 {feed.room_code} 觀戰串流停止")
+
+    async def subscribe(self, room_code: str) -> AsyncIterator[bytes]:
+        """
+        訂閱房間快照串流
+
+        Args:
+            room_code: 房間代碼
+
+        Yields:
+            已編碼的 SSE frame
+        """
+        feed = self._get_feed(room_code)
+        feed.viewers += 1
+        seen_version = 0
+
+        try:
+            while True:
+                if feed.version != seen_version:
+                    seen_version = feed.version
+                    yield feed.frame
+                    if feed.closed:
+                        return
+                    continue
+
+                updated = feed.updated
+                try:
+                    await asyncio.wait_for(updated.wait(), timeout=self.KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+        finally:
+            feed.viewers -= 1
+
+
+# 全局 SpectatorHub 實例
+spectator_hub = SpectatorHub()
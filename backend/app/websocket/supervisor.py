@@ -0,0 +1,256 @@
+"""
+房間生命週期管理
+負責房間的背景任務、Boss 的持有與釋放，以及閒置 / 已結束房間的回收
+"""
+
+from typing import Dict, Set, Optional, Any
+import asyncio
+import logging
+import os
+import weakref
+
+from app.config import settings
+from app.websocket.room import room_manager, Room, GLOBAL_ROOM_CODE, is_global_room
+from app.websocket.manager import manager as ws_manager
+from app.websocket.scheduler import turn_scheduler
+from app.websocket.clock import Clock, system_clock
+
+logger = logging.getLogger(__name__)
+
+
+class RoomSupervisor:
+    """
+    房間生命週期管理器
+
+    功能:
+    - 持有每個房間的背景任務（回合結算等），停止戰鬥時一併取消
+    - Boss 由 Room 明確持有，停止戰鬥或回收房間時釋放
+    - 只有房間清空時才停止戰鬥（單一玩家斷線不影響其他人）
+    - 回收房間時停止房間 Actor
+    - 定期回收閒置（沒有成員）超過 room_idle_ttl 的房間（含額外的 GLOBAL 分片），
+      以及結束超過 room_finished_ttl 的房間（關閉剩餘連線）
+    - 回報房間、任務與記憶體狀態
+    """
+
+    def __init__(self, clock: Optional[Clock] = None):
+        # 回收間隔使用的時鐘（各房間的保留時間依房間自己的時鐘計算）
+        self.clock = clock or system_clock
+
+        # 各房間的背景任務 {room_code: {task}}
+        self.tasks: Dict[str, Set[asyncio.Task]] = {}
+
+        # 仍存活的 Boss（弱引用，用來確認回收後沒有殘留）
+        self.bosses: "weakref.WeakSet[Any]" = weakref.WeakSet()
+
+        self.reaped = 0
+        self.reaper_task: Optional[asyncio.Task] = None
+
+    # ===== 任務與 Boss =====
+
+    def track(self, room_code: str, task: asyncio.Task):
+        """
+        登記房間的背景任務（完成後自動移除）
+
+        Args:
+            room_code: 房間代碼
+            task: 背景任務
+        """
+        tasks = self.tasks.setdefault(room_code, set())
+        tasks.add(task)
+
+        def discard(done: asyncio.Task):
+            tasks.discard(done)
+            if not tasks and self.tasks.get(room_code) is tasks:
+                del self.tasks[room_code]
+
+        task.add_done_callback(discard)
+
+    def attach_boss(self, room: Room, boss: Any):
+        """讓房間持有 Boss"""
+        room.boss = boss
+        self.bosses.add(boss)
+
+    def stop_battle(self, room_code: str, keep: Optional[asyncio.Task] = None):
+        """
+        停止房間的戰鬥：取消回合排程、背景任務與行動評分，並釋放 Boss
+
+        Args:
+            room_code: 房間代碼
+            keep: 不取消的房間任務（預設為呼叫者本身，例如回合結算；
+                  經由房間 Actor 呼叫時由發出命令的任務傳入）
+        """
+        turn_scheduler.cancel_room(room_code)
+
+        keep = keep or asyncio.current_task()
+        for task in list(self.tasks.get(room_code, ())):
+            if task is not keep and not task.done():
+                task.cancel()
+
+        room = room_manager.get_room(room_code)
+        if room:
+            room.boss = None
+            room.boss_strategy = None
+            room.action_evaluator = None
+            room.cancel_action_jobs()
+            room.close_prompt_batcher()
+
+    def on_member_left(self, room: Room):
+        """
+        成員離開後的處理
+
+        房間清空時停止戰鬥；GLOBAL 分片重設為等待狀態，讓下一位玩家可以重新開始。
+        """
+        if room.members:
+            return
+
+        self.stop_battle(room.room_code)
+
+        if is_global_room(room.room_code):
+            room.reset()
+            logger.info(f"🔄 {room.room_code} 房間已清空，重設為等待狀態")
+
+    # ===== 回收 =====
+
+    async def close_room(self, room_code: str, reason: str):
+        """
+        關閉並移除房間（通知並斷開剩餘連線）
+
+        Args:
+            room_code: 房間代碼
+            reason: 關閉原因
+        """
+        room = room_manager.get_room(room_code)
+        if room:
+            await room.actor.call(lambda: self.stop_battle(room_code))
+        room_manager.remove_room(room_code)
+
+        for connection_id in list(ws_manager.room_connections.get(room_code, ())):
+            connection = ws_manager.active_connections.get(connection_id)
+            if connection is None:
+                continue
+            await connection.send_json({"type": "room_closed", "message": reason})
+            try:
+                await connection.websocket.close(code=1000, reason="room closed")
+            except Exception:
+                pass
+            await ws_manager.disconnect(connection_id)
+
+        # 房間的訊息批次器與批次窗口設定
+        await ws_manager.close_room(room_code)
+
+        # 房間已移除，停止 Actor（之後的命令直接執行）
+        if room:
+            room.actor.stop()
+
+        self.reaped += 1
+        logger.info(f"🧹 回收房間 {room_code}: {reason}")
+
+    def _reap_reason(self, room: Room, now: float) -> Optional[str]:
+        """判斷房間是否應回收，返回原因"""
+        if room.room_code == GLOBAL_ROOM_CODE:
+            return None
+        if is_global_room(room.room_code):
+            # 額外的 GLOBAL 分片只在清空並閒置後回收
+            if not room.members and now - room.last_activity >= settings.room_idle_ttl:
+                return "分片閒置"
+            return None
+        if room.status == "finished" and now - room.status_changed_at >= settings.room_finished_ttl:
+            return "戰鬥已結束"
+        if not room.members and now - room.last_activity >= settings.room_idle_ttl:
+            return "房間閒置"
+        return None
+
+    async def reap(self) -> int:
+        """
+        回收所有符合條件的房間
+
+        Returns:
+            回收的房間數
+        """
+        targets = [
+            (room.room_code, reason)
+            for room in room_manager.get_all_rooms()
+            for reason in [self._reap_reason(room, room.clock.now())]
+            if reason
+        ]
+        for room_code, reason in targets:
+            await self.close_room(room_code, reason)
+        return len(targets)
+
+    def start(self):
+        """啟動回收任務（如果尚未啟動）"""
+        if self.reaper_task is None or self.reaper_task.done():
+            self.reaper_task = asyncio.create_task(self._reaper_loop())
+
+    async def _reaper_loop(self):
+        """背景任務：定期回收房間"""
+        logger.info("🧹 房間回收任務啟動")
+        while True:
+            try:
+                await self.clock.sleep(settings.room_reap_interval)
+                await self.reap()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"❌ 房間回收錯誤: {e}")
+
+    # ===== 狀態 =====
+
+    @staticmethod
+    def _memory_rss_mb() -> float:
+        """目前行程的常駐記憶體（MB）"""
+        try:
+            with open("/proc/self/statm") as f:
+                pages = int(f.read().split()[1])
+            return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+        except (OSError, ValueError, IndexError, AttributeError):
+            pass
+
+        # 非 Linux：改用峰值（macOS 單位為 bytes，其他為 KB）
+        try:
+            import resource
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        except ImportError:
+            return 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """獲取房間、任務與記憶體狀態"""
+        rooms = room_manager.get_all_rooms()
+        by_status: Dict[str, int] = {}
+        for room in rooms:
+            by_status[room.status] = by_status.get(room.status, 0) + 1
+
+        return {
+            "rooms": {
+                "total": len(rooms),
+                "by_status": by_status,
+                "members": sum(len(room.members) for room in rooms),
+                "reaped": self.reaped
+            },
+            "tasks": {
+                "room_tasks": sum(len(tasks) for tasks in self.tasks.values()),
+                "action_jobs": sum(len(room.action_jobs) for room in rooms),
+                "scheduled_turns": len(turn_scheduler.entries),
+                "asyncio_tasks": len(asyncio.all_tasks())
+            },
+            "mailboxes": {
+                "queued": sum(room.actor.get_depth() for room in rooms),
+                "max_depth": max((room.actor.get_depth() for room in rooms), default=0),
+                "peak_depth": max((room.actor.max_depth for room in rooms), default=0),
+                "processed": sum(room.actor.processed for room in rooms),
+                "failed": sum(room.actor.failed for room in rooms)
+            },
+            "memory": {
+                "rss_mb": round(self._memory_rss_mb(), 1),
+                "live_bosses": len(self.bosses),
+                "connections": len(ws_manager.active_connections)
+            },
+            "ttl": {
+                "idle_seconds": settings.room_idle_ttl,
+                "finished_seconds": settings.room_finished_ttl
+            }
+        }
+
+
+# 全局 RoomSupervisor 實例
+room_supervisor = RoomSupervisor()
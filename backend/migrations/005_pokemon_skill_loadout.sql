@@ -0,0 +1,5 @@
+-- 寶可夢技能配置
+-- 上傳時分配的技能以 ID 列表儲存（例如 ["skill_52", "skill_53"]），
+-- 加入房間時直接由技能索引解析，不再每回合重新隨機抽選
+
+ALTER TABLE pokemon ADD COLUMN IF NOT EXISTS skill_ids JSONB DEFAULT '[]'::jsonb;
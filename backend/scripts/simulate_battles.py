@@ -0,0 +1,488 @@
+"""
+Boss 戰鬥蒙地卡羅模擬器
+
+在沒有伺服器與真人玩家的情況下大量模擬 Boss 戰，用於調整
+boss_base_hp、boss_hp_per_player、TYPE_EFFECTIVENESS 與 Boss 技能選擇策略，
+以及估算不同人數下的回合數（容量規劃）。
+
+使用方式:
+    python scripts/simulate_battles.py --players 1,2,4,8 --fights 1000000
+    python scripts/simulate_battles.py --players 4 --boss-types fire,water --by-boss-type --format json
+    python scripts/simulate_battles.py --prompt-scores 0:0.5,0.3:0.5 --hp-per-player 400 -o result.csv
+
+模型（回合規則與 app/services/turn_engine.py 相同）:
+    - 每回合所有玩家先攻擊，Boss 被擊敗則勝利（Boss 不反擊）
+    - 玩家傷害 = 威力 × (1 + 屬性倍率 + Prompt 倍率)，最少 1，免疫為 0
+    - 每名玩家在戰鬥開始時獲得固定的技能配置（--loadout-size 個不重複的技能），
+      每回合從配置中使用一個，Prompt 倍率依 --prompt-scores 分布抽樣
+    - Boss 有 4 個不重複的技能（前 5 強中 2 個、第 6-15 強中 2 個，與 BossService.generate_boss 相同）
+    - Boss 期望傷害表以 BattleService.stat_damage_matrix 計算（與 BossDamageTable 相同），
+      選擇規則與 BossStrategy 相同：以 --boss-strategy-chance 的機率攻擊 HP - 最佳技能期望傷害 最低的
+      存活玩家並使用對其期望傷害最高的技能，否則隨機技能攻擊隨機一名存活玩家
+    - Boss 傷害 = 期望傷害 × 亂數 0.85~1.0，最少 1，免疫為 0（Boss 不會心，與 BossDamageTable.roll 相同）
+    - 所有玩家 HP 歸零則失敗；超過 --max-turns 回合視為逾時
+
+與實際戰鬥的差異（為了向量化而簡化）:
+    - 技能只從同屬性技能中抽選；實際的 get_skills_by_type 另外混入一般系與其他屬性的技能
+      （玩家配置 12 個技能中約 8 個同屬性；Boss 從 20 個候選中依威力挑選，也可能不是同屬性）
+    - 玩家每回合從配置中均勻隨機使用一個技能（實際由玩家自行選擇）
+    - 玩家 HP 固定為 100、防禦固定為 DEFAULT_MEMBER_DEFENSE（實際依寶可夢的 stats）
+
+屬性與傷害以 NumPy 陣列向量化計算（一次處理整批戰鬥），各批次分散到多個行程執行。
+
+前置條件:
+    .env 已配置（讀取 settings.POKEMON_TYPES 與 Boss 血量預設值）
+    技能 CSV 位於 data/（找不到時使用預設技能）
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Tuple, Any, Optional
+
+import numpy as np
+
+# 加入 app 目錄到 path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config import settings
+from app.services.battle_service import (
+    BattleService, TYPE_IDS, TYPE_MATRIX, DAMAGE_ROLL_MIN, DAMAGE_ROLL_MAX, IMMUNE_MULTIPLIER
+)
+from app.services.boss_service import BossService, Boss
+from app.services.damage_table import DEFAULT_MEMBER_DEFENSE
+from app.services.skills_service import Skill, SkillsService
+from app.services.boss_strategy import BOSS_STRATEGY_CHANCE
+
+
+TYPES: List[str] = list(settings.POKEMON_TYPES)
+TYPE_INDEX: Dict[str, int] = TYPE_IDS
+
+SKILL_CSV_CANDIDATES = [
+    os.path.join("data", "pokemon_moves.csv"),
+    os.path.join("data", "Pokemon-skillsets.csv"),
+]
+
+PLAYER_HP = 100  # 寶可夢預設 HP（stats.hp）
+PLAYER_DEFENSE = DEFAULT_MEMBER_DEFENSE  # 寶可夢預設防禦（stats.defense）
+BOSS_SKILL_SLOTS = 4  # Boss 技能數（前 5 強中 2 個 + 第 6-15 強中 2 個）
+
+# 戰鬥結果代碼
+WIN, LOSE, TIMEOUT = 0, 1, 2
+
+
+# ===== 資料準備 =====
+
+def load_skill_powers(csv_path: Optional[str]) -> Dict[str, List[int]]:
+    """
+    讀取各屬性攻擊技能的威力
+
+    Args:
+        csv_path: 技能 CSV 路徑（不指定則依序嘗試 data/ 下的預設檔案）
+
+    Returns:
+        {屬性: [威力, ...]}
+    """
+    paths = [csv_path] if csv_path else SKILL_CSV_CANDIDATES
+    skills: List[Skill] = []
+
+    for path in paths:
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                skills = [Skill(row) for row in csv.DictReader(f)]
+            skills = [skill for skill in skills if skill.power > 0]
+            print(f"📖 讀取技能: {path} ({len(skills)} 個攻擊技能)", file=sys.stderr)
+            break
+    else:
+        service = SkillsService()
+        service._load_default_skills()
+        skills = service.skills
+        print(f"⚠️  找不到技能 CSV，使用預設技能 ({len(skills)} 個)", file=sys.stderr)
+
+    powers: Dict[str, List[int]] = {t: [] for t in TYPES}
+    for skill in skills:
+        if skill.type in powers:
+            powers[skill.type].append(skill.power)
+    return powers
+
+
+def build_power_table(powers: Dict[str, List[int]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    建立補齊後的威力表（每列依威力由高到低排序）
+
+    Returns:
+        (威力表 [屬性, 最大技能數], 各屬性技能數)
+    """
+    fallback = powers.get("normal") or [40]
+    columns = [sorted(powers.get(t) or fallback, reverse=True) for t in TYPES]
+    width = max(len(c) for c in columns)
+
+    table = np.zeros((len(TYPES), width), dtype=np.float64)
+    counts = np.zeros(len(TYPES), dtype=np.int64)
+    for i, column in enumerate(columns):
+        table[i, :len(column)] = column
+        counts[i] = len(column)
+    return table, counts
+
+
+def parse_weights(spec: Optional[str], keys: List[str]) -> np.ndarray:
+    """
+    解析 "fire:2,water:1" 或 "fire,water" 格式的權重（不指定則均勻分布）
+
+    Returns:
+        與 keys 對應的機率陣列
+    """
+    weights = np.zeros(len(keys), dtype=np.float64)
+    if not spec:
+        weights[:] = 1.0
+    else:
+        for part in spec.split(","):
+            name, _, weight = part.strip().partition(":")
+            if name not in keys:
+                raise SystemExit(f"❌ 未知屬性: {name}")
+            weights[keys.index(name)] = float(weight) if weight else 1.0
+    return weights / weights.sum()
+
+
+def parse_prompt_scores(spec: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    解析 Prompt 倍率分布 "0:0.2,0.1:0.3,0.5:0.5"（倍率:機率）
+
+    Returns:
+        (倍率陣列, 機率陣列)
+    """
+    values, weights = [], []
+    for part in spec.split(","):
+        value, _, weight = part.strip().partition(":")
+        values.append(float(value))
+        weights.append(float(weight) if weight else 1.0)
+    weights_array = np.array(weights, dtype=np.float64)
+    return np.array(values, dtype=np.float64), weights_array / weights_array.sum()
+
+
+# ===== 模擬 =====
+
+def sample_columns(rng: np.random.Generator, low: np.ndarray, high: np.ndarray, k: int, width: int) -> np.ndarray:
+    """
+    每列從 [low, high) 中不重複抽 k 個索引
+
+    Returns:
+        索引陣列 [列數, k]（範圍不足 k 個時，有效索引排在前面，其餘為 -1）
+    """
+    columns = np.arange(width)
+    valid = (columns >= low[:, None]) & (columns < high[:, None])
+    keys = np.where(valid, rng.random((low.shape[0], width)), np.inf)
+    order = np.argsort(keys, axis=1)[:, :k]
+    return np.where(np.take_along_axis(valid, order, axis=1), order, -1)
+
+
+def pack_valid(indices: np.ndarray) -> np.ndarray:
+    """將每列的有效索引（>= 0）移到前面"""
+    order = np.argsort(indices < 0, axis=1, kind="stable")
+    return np.take_along_axis(indices, order, axis=1)
+
+
+def simulate_chunk(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    模擬一批戰鬥（於子行程執行）
+
+    Args:
+        job: 參數（玩家數、戰鬥數、種子、威力表、分布等）
+
+    Returns:
+        {"wins", "losses", "timeouts": [各 Boss 屬性的次數], "turns": [Boss 屬性, 回合數] 的勝利次數}
+    """
+    rng = np.random.default_rng(job["seed"])
+    n = job["fights"]
+    players = job["players"]
+    max_turns = job["max_turns"]
+    effectiveness = job["effectiveness"]
+    power_table = job["power_table"]
+    power_counts = job["power_counts"]
+    type_count = len(power_counts)
+
+    # 隊伍與 Boss
+    boss_types = rng.choice(type_count, size=n, p=job["boss_type_weights"])
+    player_types = rng.choice(type_count, size=(n, players), p=job["player_type_weights"])
+    boss_hp = np.full(n, float(job["boss_hp"]))
+    player_hp = np.full((n, players), float(PLAYER_HP))
+
+    # Boss 技能：前 5 強中 2 個，第 6-15 強中 2 個（同屬性、不重複）
+    boss_counts = power_counts[boss_types]
+    width = power_table.shape[1]
+    boss_skill_idx = pack_valid(np.concatenate([
+        sample_columns(rng, np.zeros(n, dtype=np.int64), np.minimum(boss_counts, 5), 2, width),
+        sample_columns(rng, np.full(n, 5), np.minimum(boss_counts, 15), 2, width),
+    ], axis=1))
+    boss_skill_valid = boss_skill_idx >= 0
+    boss_skill_count = boss_skill_valid.sum(axis=1)
+    boss_powers = power_table[boss_types[:, None], np.maximum(boss_skill_idx, 0)]
+
+    # Boss 傷害表：每個 Boss 技能對每種玩家屬性的期望傷害（與 BossDamageTable 相同的計算），
+    # 再依各場戰鬥的玩家屬性取出 [戰鬥, 技能, 玩家]
+    expected, skill_eff = BattleService.stat_damage_matrix(
+        skill_powers=boss_powers.ravel(),
+        skill_types=np.repeat(boss_types, BOSS_SKILL_SLOTS),
+        attacker_level=job["boss_level"],
+        attacker_attack=job["boss_attack"],
+        defender_types=np.arange(type_count),
+        defender_defenses=np.full(type_count, float(PLAYER_DEFENSE))
+    )
+    fight_index = np.arange(n)[:, None, None]
+    skill_index = np.arange(BOSS_SKILL_SLOTS)[None, :, None]
+    member_types = player_types[:, None, :]
+    boss_expected = expected.reshape(n, BOSS_SKILL_SLOTS, type_count)[fight_index, skill_index, member_types]
+    boss_eff = skill_eff.reshape(n, BOSS_SKILL_SLOTS, type_count)[fight_index, skill_index, member_types]
+
+    # BossStrategy：每名玩家的最佳技能（期望傷害最高）與其期望傷害
+    ranked = np.where(boss_skill_valid[:, :, None], boss_expected, -np.inf)
+    best_skill = ranked.argmax(axis=1)
+    best_damage = ranked.max(axis=1)
+
+    # 玩家技能配置：同屬性技能中不重複抽 loadout_size 個（整場戰鬥固定）
+    loadout = np.stack([
+        sample_columns(rng, np.zeros(n, dtype=np.int64), power_counts[player_types[:, p]], job["loadout_size"], width)
+        for p in range(players)
+    ], axis=1)
+    loadout_count = (loadout >= 0).sum(axis=2)
+
+    outcome = np.full(n, TIMEOUT, dtype=np.int8)
+    turns = np.zeros(n, dtype=np.int32)
+    active = np.arange(n)
+
+    for turn in range(1, max_turns + 1):
+        if active.size == 0:
+            break
+
+        m = active.size
+        b_type = boss_types[active]
+        p_type = player_types[active]
+
+        # 玩家攻擊：從自己的技能配置中使用一個
+        slot = (rng.random((m, players)) * loadout_count[active]).astype(np.int64)
+        skill_idx = np.take_along_axis(loadout[active], slot[:, :, None], axis=2)[:, :, 0]
+        power = power_table[p_type, skill_idx]
+        eff = effectiveness[p_type, b_type[:, None]]
+        prompt = rng.choice(job["prompt_values"], size=(m, players), p=job["prompt_weights"])
+        damage = BattleService.damage_formula(power, eff, prompt)
+        hp = boss_hp[active] - damage.sum(axis=1)
+        boss_hp[active] = hp
+
+        won = hp <= 0
+        outcome[active[won]] = WIN
+        turns[active[won]] = turn
+        active = active[~won]
+        if active.size == 0:
+            break
+
+        # Boss 反擊（BossStrategy.choose）：策略 = HP - 最佳技能期望傷害 最低的存活玩家 + 對其最佳技能；
+        # 否則隨機技能攻擊隨機存活玩家
+        m = active.size
+        strategic = rng.random(m) < job["boss_strategy_chance"]
+        hp_now = player_hp[active]
+        alive = hp_now > 0
+
+        strategic_target = np.where(alive, hp_now - best_damage[active], np.inf).argmin(axis=1)
+        strategic_skill = best_skill[active, strategic_target]
+        random_skill = (rng.random(m) * boss_skill_count[active]).astype(np.int64)
+        random_target = np.where(alive, rng.random((m, players)), -1.0).argmax(axis=1)
+        target = np.where(strategic, strategic_target, random_target)
+        b_skill = np.where(strategic, strategic_skill, random_skill)
+
+        # BossDamageTable.roll：期望傷害 × 亂數，最少 1，免疫為 0
+        b_expected = boss_expected[active, b_skill, target]
+        b_roll = rng.uniform(DAMAGE_ROLL_MIN, DAMAGE_ROLL_MAX, size=m)
+        b_damage = np.where(
+            boss_eff[active, b_skill, target] == IMMUNE_MULTIPLIER,
+            0.0,
+            np.maximum(1.0, np.trunc(b_expected * b_roll))
+        )
+        player_hp[active, target] = np.maximum(0.0, player_hp[active, target] - b_damage)
+
+        lost = (player_hp[active] <= 0).all(axis=1)
+        outcome[active[lost]] = LOSE
+        turns[active[lost]] = turn
+        active = active[~lost]
+
+    wins = outcome == WIN
+    turn_hist = np.zeros((type_count, max_turns + 1), dtype=np.int64)
+    np.add.at(turn_hist, (boss_types[wins], turns[wins]), 1)
+
+    return {
+        "players": players,
+        "wins": np.bincount(boss_types[wins], minlength=type_count),
+        "losses": np.bincount(boss_types[outcome == LOSE], minlength=type_count),
+        "timeouts": np.bincount(boss_types[outcome == TIMEOUT], minlength=type_count),
+        "turns": turn_hist,
+    }
+
+
+def summarize(
+    players: int,
+    boss_type: str,
+    wins: int,
+    losses: int,
+    timeouts: int,
+    turn_hist: np.ndarray
+) -> Dict[str, Any]:
+    """整理單一組合的統計（勝率與擊敗 Boss 所需回合數分布）"""
+    fights = wins + losses + timeouts
+    row: Dict[str, Any] = {
+        "players": players,
+        "boss_type": boss_type,
+        "fights": fights,
+        "win_rate": round(wins / fights, 6) if fights else 0.0,
+        "lose_rate": round(losses / fights, 6) if fights else 0.0,
+        "timeout_rate": round(timeouts / fights, 6) if fights else 0.0,
+    }
+
+    if wins:
+        turn_values = np.arange(turn_hist.size)
+        cumulative = np.cumsum(turn_hist)
+        percentile = lambda q: int(np.searchsorted(cumulative, q * wins))
+        row.update({
+            "turns_mean": round(float((turn_hist * turn_values).sum() / wins), 3),
+            "turns_p50": percentile(0.5),
+            "turns_p90": percentile(0.9),
+            "turns_p99": percentile(0.99),
+            "turns_max": int(turn_values[turn_hist > 0].max()),
+        })
+    else:
+        row.update({"turns_mean": None, "turns_p50": None, "turns_p90": None, "turns_p99": None, "turns_max": None})
+
+    row["turns_histogram"] = {int(t): int(c) for t, c in enumerate(turn_hist) if c}
+    return row
+
+
+def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """依參數切分批次、分散到行程池執行並彙總結果"""
+    power_table, power_counts = build_power_table(load_skill_powers(args.skills_csv))
+    prompt_values, prompt_weights = parse_prompt_scores(args.prompt_scores)
+    player_counts = [int(p) for p in args.players.split(",")]
+
+    base = {
+        "max_turns": args.max_turns,
+        "effectiveness": TYPE_MATRIX,
+        "power_table": power_table,
+        "power_counts": power_counts,
+        "player_type_weights": parse_weights(args.player_types, TYPES),
+        "boss_type_weights": parse_weights(args.boss_types, TYPES),
+        "prompt_values": prompt_values,
+        "prompt_weights": prompt_weights,
+        "boss_strategy_chance": args.boss_strategy_chance,
+        "loadout_size": args.loadout_size,
+    }
+
+    seeds = np.random.SeedSequence(args.seed)
+    jobs = []
+    for players in player_counts:
+        boss_hp = args.boss_hp + (players - 1) * args.hp_per_player
+        # Boss 等級與攻擊力依人數調整（與 BossService.scale_boss 相同）
+        boss = BossService.scale_boss(Boss("", "normal", 0, 0, 0, 0, 0, []), players, args.boss_hp)
+        remaining = args.fights
+        while remaining > 0:
+            fights = min(args.chunk_size, remaining)
+            remaining -= fights
+            jobs.append({
+                **base,
+                "players": players,
+                "fights": fights,
+                "boss_hp": boss_hp,
+                "boss_level": boss.level,
+                "boss_attack": boss.attack,
+                "seed": seeds.spawn(1)[0],
+            })
+
+    totals: Dict[int, Dict[str, np.ndarray]] = {}
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for result in pool.map(simulate_chunk, jobs):
+            total = totals.setdefault(result["players"], {
+                key: np.zeros_like(result[key]) for key in ("wins", "losses", "timeouts", "turns")
+            })
+            for key in ("wins", "losses", "timeouts", "turns"):
+                total[key] += result[key]
+
+    elapsed = time.perf_counter() - start
+    total_fights = args.fights * len(player_counts)
+    print(f"✅ 模擬 {total_fights} 場戰鬥，耗時 {elapsed:.2f}s ({total_fights / elapsed:,.0f} 場/秒)", file=sys.stderr)
+
+    rows = []
+    for players in player_counts:
+        total = totals[players]
+        groups = [("all", slice(None))]
+        if args.by_boss_type:
+            groups += [
+                (t, i) for i, t in enumerate(TYPES)
+                if total["wins"][i] + total["losses"][i] + total["timeouts"][i] > 0
+            ]
+
+        for boss_type, index in groups:
+            turn_hist = total["turns"][index]
+            if turn_hist.ndim == 2:
+                turn_hist = turn_hist.sum(axis=0)
+            rows.append(summarize(
+                players,
+                boss_type,
+                int(np.sum(total["wins"][index])),
+                int(np.sum(total["losses"][index])),
+                int(np.sum(total["timeouts"][index])),
+                turn_hist,
+            ))
+
+    return rows
+
+
+def write_output(rows: List[Dict[str, Any]], fmt: str, output: Optional[str]):
+    """輸出 CSV（不含直方圖）或 JSON"""
+    if fmt == "json":
+        content = json.dumps(rows, ensure_ascii=False, indent=2)
+    else:
+        buffer = io.StringIO()
+        fields = [key for key in rows[0] if key != "turns_histogram"]
+        writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+        content = buffer.getvalue()
+
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(content)
+        print(f"💾 已寫入 {output}", file=sys.stderr)
+    else:
+        print(content)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Boss 戰鬥蒙地卡羅模擬器")
+    parser.add_argument("--players", default="1,2,4,8", help="玩家數列表，例如 1,2,4,8")
+    parser.add_argument("--fights", type=int, default=100000, help="每種玩家數的模擬場數")
+    parser.add_argument("--boss-hp", type=int, default=settings.boss_base_hp, help="Boss 基礎血量")
+    parser.add_argument("--hp-per-player", type=int, default=settings.boss_hp_per_player, help="每增加一名玩家的 Boss 血量")
+    parser.add_argument("--player-types", default=None, help="玩家屬性分布，例如 fire:2,water:1（預設均勻）")
+    parser.add_argument("--boss-types", default=None, help="Boss 屬性分布（預設均勻）")
+    parser.add_argument("--prompt-scores", default="0:1,0.1:1,0.2:1,0.3:1,0.4:1,0.5:1", help="Prompt 倍率分布（倍率:權重）")
+    parser.add_argument("--boss-strategy-chance", type=float, default=BOSS_STRATEGY_CHANCE, help="Boss 依策略行動（攻擊最容易擊倒的玩家）的機率")
+    parser.add_argument("--loadout-size", type=int, default=8, help="每名玩家的技能配置數（同屬性技能）")
+    parser.add_argument("--max-turns", type=int, default=100, help="回合上限（超過視為逾時）")
+    parser.add_argument("--by-boss-type", action="store_true", help="另外輸出各 Boss 屬性的統計")
+    parser.add_argument("--skills-csv", default=None, help="技能 CSV 路徑")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="每個批次的戰鬥數")
+    parser.add_argument("--workers", type=int, default=None, help="行程數（預設為 CPU 數）")
+    parser.add_argument("--seed", type=int, default=None, help="隨機種子（指定後結果可重現）")
+    parser.add_argument("--format", choices=["csv", "json"], default="csv", help="輸出格式")
+    parser.add_argument("-o", "--output", default=None, help="輸出檔案（預設為標準輸出）")
+    args = parser.parse_args()
+
+    write_output(run(args), args.format, args.output)
+
+
+if __name__ == "__main__":
+    main()
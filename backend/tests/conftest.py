@@ -0,0 +1,12 @@
+"""
+測試共用設定
+設定檔的必填環境變數在測試中使用假值（測試不連線 Supabase / Gemini）
+"""
+
+import os
+import sys
+
+for name in ("SUPABASE_URL", "SUPABASE_KEY", "SUPABASE_SERVICE_KEY", "GEMINI_API_KEY", "SECRET_KEY"):
+    os.environ.setdefault(name, "test")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
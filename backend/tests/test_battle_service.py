@@ -0,0 +1,70 @@
+"""
+戰鬥傷害計算測試
+"""
+
+import itertools
+
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.services.battle_service import BattleService, TYPE_IDS
+
+
+POWERS = [0, 1, 40, 55, 90, 150]
+MULTIPLIERS = [0.0, 0.1, 0.3, 0.5]
+
+
+def test_batch_matches_scalar_for_every_type_pair():
+    pairs = list(itertools.product(settings.POKEMON_TYPES, repeat=2))
+    cases = [
+        (power, multiplier, attacker, defender)
+        for attacker, defender in pairs for power in POWERS for multiplier in MULTIPLIERS
+    ]
+
+    by_name = BattleService.calculate_damage_batch(
+        powers=[case[0] for case in cases],
+        attacker_types=[case[2] for case in cases],
+        defender_types=[case[3] for case in cases],
+        multipliers=[case[1] for case in cases]
+    )
+    by_id = BattleService.calculate_damage_batch(
+        powers=[case[0] for case in cases],
+        attacker_types=np.array([TYPE_IDS[case[2]] for case in cases]),
+        defender_types=[TYPE_IDS[case[3]] for case in cases],
+        multipliers=[case[1] for case in cases]
+    )
+
+    for (damages, effectiveness) in (by_name, by_id):
+        for (power, multiplier, attacker, defender), damage, value in zip(
+            cases, damages.tolist(), effectiveness.tolist()
+        ):
+            expected_damage, expected_effectiveness, _ = BattleService.calculate_damage(
+                power, attacker, defender, multiplier
+            )
+            assert (damage, value) == (expected_damage, expected_effectiveness), (attacker, defender, power)
+
+
+def test_single_defender_broadcasts():
+    damages, _ = BattleService.calculate_damage_batch([40, 90], ["fire", "water"], ["grass"])
+    assert damages.tolist() == [
+        BattleService.calculate_damage(40, "fire", "grass")[0],
+        BattleService.calculate_damage(90, "water", "grass")[0],
+    ]
+
+
+@pytest.mark.parametrize("invalid", [-1, len(TYPE_IDS), 1000])
+def test_out_of_range_type_ids_are_rejected(invalid):
+    with pytest.raises(ValueError):
+        BattleService.get_type_ids([0, invalid])
+    with pytest.raises(ValueError):
+        BattleService.get_type_ids(np.array([invalid]))
+    with pytest.raises(ValueError):
+        BattleService.calculate_damage_batch([40], [invalid], ["fire"])
+    with pytest.raises(ValueError):
+        BattleService.calculate_damage_batch([40], ["fire"], [invalid])
+
+
+def test_unknown_type_names_fall_back_to_normal():
+    ids = BattleService.get_type_ids(["fire", "unknown"])
+    assert ids.tolist() == [TYPE_IDS["fire"], TYPE_IDS["normal"]]
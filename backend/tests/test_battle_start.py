@@ -0,0 +1,51 @@
+"""
+開始戰鬥測試
+"""
+
+import asyncio
+
+import app.routers.rooms as rooms
+from app.services.boss_service import Boss
+from app.websocket.room import Room, RoomMember
+from app.websocket.scheduler import turn_scheduler
+
+
+def test_boss_generation_does_not_block_room_actor(monkeypatch):
+    sent = []
+
+    async def broadcast(room_code, message):
+        sent.append(message["type"])
+
+    monkeypatch.setattr(rooms.ws_manager, "broadcast_to_room", broadcast)
+
+    async def main():
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def generate_boss(player_count, base_hp):
+            started.set()
+            await release.wait()
+            return Boss("b", "grass", 10, 1000, 80, 60, 70, [])
+
+        monkeypatch.setattr(rooms.BossService, "generate_boss", generate_boss)
+
+        room = Room("TEST", max_players=2)
+        for i in range(2):
+            member = RoomMember(f"c{i}", "pk", {"type": "fire"}, f"p{i}")
+            member.is_ready = True
+            room.members[member.connection_id] = member
+
+        first = asyncio.create_task(rooms.start_battle_if_ready("TEST", room))
+        await started.wait()
+
+        # Boss 生成期間房間仍可處理其他命令，重複的開始請求不會再生成 Boss
+        assert await asyncio.wait_for(room.actor.call(lambda: room.status), timeout=1) == "ready"
+        await rooms.start_battle_if_ready("TEST", room)
+
+        release.set()
+        await first
+        turn_scheduler.cancel_room("TEST")
+        return room.status
+
+    assert asyncio.run(main()) == "battle"
+    assert sent == ["battle_start"]
@@ -0,0 +1,112 @@
+"""
+Boss 策略測試
+"""
+
+import random
+
+from app.services.boss_strategy import BossStrategy
+from app.services.damage_table import BossDamageTable
+
+
+BOSS = {
+    "type": "fire",
+    "level": 30,
+    "attack": 100,
+    "skills": [
+        {"id": 1, "name": "火花", "type": "fire", "power": 40},
+        {"id": 2, "name": "大字爆炎", "type": "fire", "power": 110},
+        {"id": 3, "name": "十萬伏特", "type": "electric", "power": 90},
+        {"id": 4, "name": "撞擊", "type": "normal", "power": 40},
+    ],
+}
+TYPES = ["grass", "water", "fire", "ice", "steel", "ground", "flying", "normal"]
+
+
+def make_strategy(count: int, seed: int = 0) -> BossStrategy:
+    rng = random.Random(seed)
+    members = {
+        f"m{i}": {
+            "type": rng.choice(TYPES),
+            "stats": {"defense": rng.randint(30, 120)},
+            "hp": rng.randint(1, 100),
+        }
+        for i in range(count)
+    }
+    return BossStrategy(BossDamageTable(BOSS, members), members)
+
+
+def expected_target(strategy: BossStrategy):
+    """暴力計算：存活成員中 HP - 最佳技能期望傷害 最低者"""
+    alive = [member_id for member_id, hp in strategy.hp.items() if hp > 0]
+    if not alive:
+        return None
+    return min(alive, key=lambda member_id: strategy.hp[member_id] - strategy.best_damage[member_id])
+
+
+def test_best_skill_maximizes_expected_damage():
+    strategy = make_strategy(8)
+    table = strategy.damage_table
+    for member_id, best in strategy.best_skill.items():
+        expected = [table.lookup(i, member_id)[0] for i in range(len(table.skills))]
+        assert expected[best] == max(expected)
+        assert strategy.best_damage[member_id] == max(expected)
+
+
+def test_heap_stays_consistent_after_hp_changes():
+    strategy = make_strategy(30)
+    rng = random.Random(1)
+
+    for _ in range(500):
+        member_id = rng.choice(list(strategy.hp))
+        strategy.update_hp(member_id, rng.choice([0, rng.randint(1, 100)]))
+
+        target = strategy.pick_target()
+        expected = expected_target(strategy)
+        if expected is None:
+            assert target is None
+        else:
+            priority = lambda m: strategy.hp[m] - strategy.best_damage[m]
+            assert priority(target) == priority(expected)
+        assert sorted(strategy.alive) == sorted(m for m, hp in strategy.hp.items() if hp > 0)
+
+    # 過期項目會被清理，佇列不會無限成長
+    assert len(strategy.heap) <= 2 * len(strategy.entry) + 16
+
+
+def test_knocked_out_member_is_never_targeted():
+    strategy = make_strategy(5)
+    weakest = strategy.pick_target()
+    strategy.update_hp(weakest, 0)
+
+    assert strategy.pick_target() != weakest
+    rng = random.Random(3)
+    for _ in range(1000):
+        _, target_id = strategy.choose(rng)
+        assert target_id != weakest
+
+    for member_id in list(strategy.hp):
+        strategy.update_hp(member_id, 0)
+    assert strategy.pick_target() is None
+    assert strategy.choose(random.Random(0))[1] is None
+
+
+def test_fixed_seed_reproduces_choices():
+    def run(seed: int):
+        strategy = make_strategy(10)
+        rng = random.Random(seed)
+        picks = []
+        for _ in range(200):
+            skill_index, target_id = strategy.choose(rng)
+            if target_id is None:
+                break
+            picks.append((skill_index, target_id))
+            strategy.update_hp(target_id, max(0, strategy.hp[target_id] - 7))
+        return picks
+
+    first = run(42)
+    assert first == run(42)
+    assert first != run(43)
+
+    # 隨機分支也有被選到（技能不是目標的最佳技能）
+    best_skill = make_strategy(10).best_skill
+    assert any(skill_index != best_skill[target_id] for skill_index, target_id in first)
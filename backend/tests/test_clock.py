@@ -0,0 +1,58 @@
+"""
+時鐘測試
+"""
+
+import asyncio
+
+import pytest
+
+from app.websocket.batcher import RoomBatcher
+from app.websocket.clock import Clock, VirtualClock
+from app.websocket.room import Room
+
+
+def test_clock_is_abstract():
+    with pytest.raises(TypeError):
+        Clock()
+
+
+def test_collect_action_results_uses_room_clock():
+    async def main():
+        clock = VirtualClock()
+
+        async def job(seconds: float):
+            await clock.sleep(seconds)
+            return {"prompt_multiplier": 0.5}
+
+        jobs = {"fast": asyncio.create_task(job(1)), "slow": asyncio.create_task(job(60))}
+        collect = asyncio.create_task(Room.collect_action_results(jobs, timeout=5, clock=clock))
+        for _ in range(3):
+            await asyncio.sleep(0)  # 讓工作與收集開始等待
+
+        await clock.advance(5)
+        results = await asyncio.wait_for(collect, timeout=1)
+        return results, jobs["slow"].cancelled()
+
+    results, slow_cancelled = asyncio.run(main())
+    assert set(results) == {"fast"}
+    assert slow_cancelled
+
+
+def test_batcher_window_uses_manager_clock():
+    class Manager:
+        def __init__(self, clock):
+            self.clock = clock
+            self.active_connections = {}
+
+    async def main():
+        clock = VirtualClock()
+        batcher = RoomBatcher(Manager(clock), "TEST", window_ms=40)
+        batcher.enqueue(["c0"], {"type": "chat"})
+        await asyncio.sleep(0)
+        before = dict(batcher.pending)
+
+        await clock.advance(0.04)
+        return before, batcher.pending
+
+    before, after = asyncio.run(main())
+    assert before and not after
@@ -0,0 +1,73 @@
+"""
+GLOBAL 分片分配測試
+"""
+
+import asyncio
+
+import app.routers.rooms as rooms
+from app.config import settings
+from app.websocket.raid import GlobalRaid
+from app.websocket.room import room_manager, RoomMember
+
+
+def test_concurrent_joins_spread_across_shards(monkeypatch):
+    monkeypatch.setattr(settings, "global_shard_capacity", 2)
+    monkeypatch.setattr(settings, "global_max_shards", 3)
+    monkeypatch.setattr(room_manager, "rooms", {})
+
+    raid = GlobalRaid()
+
+    async def join(i: int) -> bool:
+        shard = await raid.assign()
+        assert shard is not None
+        try:
+            await asyncio.sleep(0.01)  # 讀取寶可夢資料期間其他玩家也在分配
+            member = RoomMember(f"c{i}", f"pk{i}", {"type": "fire"}, f"p{i}")
+            return await shard.actor.call(lambda: shard.add_member(member))
+        finally:
+            raid.release(shard.room_code)
+
+    async def main():
+        return await asyncio.gather(*(join(i) for i in range(6)))
+
+    assert asyncio.run(main()) == [True] * 6
+    assert [len(room.members) for room in raid.get_shards()] == [2, 2, 2]
+    assert raid.pending_joins == {}
+
+
+def test_assign_returns_none_when_all_shards_reserved(monkeypatch):
+    monkeypatch.setattr(settings, "global_shard_capacity", 2)
+    monkeypatch.setattr(settings, "global_max_shards", 1)
+    monkeypatch.setattr(room_manager, "rooms", {})
+
+    raid = GlobalRaid()
+
+    async def main():
+        return await asyncio.gather(*(raid.assign() for _ in range(3)))
+
+    first, second, third = asyncio.run(main())
+    assert first is second
+    assert third is None
+
+
+def test_global_room_info_includes_all_shards(monkeypatch):
+    monkeypatch.setattr(settings, "global_shard_capacity", 2)
+    monkeypatch.setattr(settings, "global_max_shards", 3)
+    monkeypatch.setattr(room_manager, "rooms", {})
+    monkeypatch.setattr(rooms, "global_raid", GlobalRaid())
+
+    async def main():
+        for i in range(3):
+            shard = await rooms.global_raid.assign()
+            member = RoomMember(f"c{i}", f"pk{i}", {"type": "fire"}, f"p{i}")
+            await shard.actor.call(lambda: shard.add_member(member))
+            rooms.global_raid.release(shard.room_code)
+        return await rooms.get_room_info("GLOBAL")
+
+    info = asyncio.run(main()).data
+    assert info["room_code"] == "GLOBAL"
+    assert info["raid"]["shards"] == 2
+    assert info["raid"]["players"] == 3
+    assert [(shard["room_code"], shard["players"]) for shard in info["raid"]["shard_rooms"]] == [
+        ("GLOBAL", 2), ("GLOBAL-2", 1)
+    ]
@@ -0,0 +1,43 @@
+"""
+WebSocket 訊息解碼測試
+"""
+
+import json
+
+import pytest
+
+from app.config import settings
+from app.websocket.messages import ChatMessage, MessageDecodeError, MessageRouter
+
+
+def make_router() -> MessageRouter:
+    router = MessageRouter()
+
+    @router.handler(ChatMessage)
+    async def handle_chat(ctx, message):
+        pass
+
+    return router
+
+
+def test_size_limit_counts_utf8_bytes(monkeypatch):
+    monkeypatch.setattr(settings, "ws_max_message_size", 200)
+    router = make_router()
+
+    text = json.dumps({"type": "chat", "message": "寶" * 100}, ensure_ascii=False)
+    assert len(text) < 200 < len(text.encode("utf-8"))
+
+    for data in (text, text.encode("utf-8")):
+        with pytest.raises(MessageDecodeError) as error:
+            router.decode(data)
+        assert str(error.value) == "訊息過大"
+    assert router.rejected == 2
+
+
+def test_message_within_byte_limit_is_decoded(monkeypatch):
+    monkeypatch.setattr(settings, "ws_max_message_size", 200)
+    router = make_router()
+
+    message = router.decode(json.dumps({"type": "chat", "message": "寶" * 50}, ensure_ascii=False))
+    assert message.message == "寶" * 50
+    assert router.rejected == 0
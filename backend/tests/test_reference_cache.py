@@ -0,0 +1,62 @@
+"""
+參考資料回應快取測試
+"""
+
+import json
+
+from starlette.requests import Request
+
+import app.routers.skills as skills_router
+import app.services.skills_service as skills_service_module
+from app.services.reference_cache import ReferenceCache
+from app.services.skills_service import Skill, SkillsService
+
+
+def make_request(if_none_match=None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def test_matching_if_none_match_returns_304():
+    cache = ReferenceCache()
+    cache.register("types", lambda: {"types": ["fire", "water"]})
+
+    first = cache.respond(make_request(), "types")
+    etag = first.headers["etag"]
+    assert first.status_code == 200
+    assert json.loads(first.body) == {"types": ["fire", "water"]}
+
+    for header in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        response = cache.respond(make_request(header), "types")
+        assert response.status_code == 304
+        assert response.body == b""
+        assert response.headers["etag"] == etag
+
+    assert cache.respond(make_request('"other"'), "types").status_code == 200
+    assert cache.builds == 1
+    assert cache.not_modified == 4
+
+
+def test_skills_version_change_rebuilds_etag_and_body(monkeypatch):
+    service = SkillsService()
+    service._load_default_skills()
+    monkeypatch.setattr(skills_service_module, "_skills_service", service)
+
+    cache = ReferenceCache()
+    cache.register("skill_types", skills_router.build_skill_types, version=lambda: service.version)
+
+    first = cache.respond(make_request(), "skill_types")
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "public, no-cache"
+    assert cache.respond(make_request(etag), "skill_types").status_code == 304
+
+    # 技能目錄重新載入（版本遞增）後重新編碼
+    service.skills.append(Skill({"編號": "999", "中文名": "測試", "屬性": "妖精", "威力": "40"}))
+    service._organize_by_type()
+
+    second = cache.respond(make_request(etag), "skill_types")
+    assert second.status_code == 200
+    assert second.headers["etag"] != etag
+    assert second.body != first.body
+    assert json.loads(second.body)["data"]["total_skills"] == len(service.skills)
+    assert cache.builds == 2
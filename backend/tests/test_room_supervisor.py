@@ -0,0 +1,25 @@
+"""
+房間回收測試
+"""
+
+import asyncio
+
+from app.websocket.manager import manager as ws_manager
+from app.websocket.room import room_manager, Room
+from app.websocket.supervisor import room_supervisor
+
+
+def test_reaped_room_releases_batch_window(monkeypatch):
+    monkeypatch.setattr(room_manager, "rooms", {})
+    monkeypatch.setattr(ws_manager, "batch_windows", {})
+
+    async def main():
+        room = Room("TEST")
+        room_manager.rooms["TEST"] = room
+        ws_manager.set_batch_window("TEST", 40)
+        await room_supervisor.close_room("TEST", "測試")
+
+    asyncio.run(main())
+    assert "TEST" not in room_manager.rooms
+    assert ws_manager.batch_windows == {}
+    assert "TEST" not in ws_manager.room_batchers
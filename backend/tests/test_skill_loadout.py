@@ -0,0 +1,153 @@
+"""
+寶可夢技能配置測試
+"""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+import app.routers.pokemon as pokemon_router
+import app.websocket.room as room_module
+from app.services.skills_service import get_skills_service
+from app.websocket.room import RoomManager
+
+
+class FakeQuery:
+    """模擬 Supabase 查詢（只支援測試用到的方法）"""
+
+    def __init__(self, table: "FakeTable", columns=None, row=None):
+        self.table = table
+        self.columns = columns
+        self.row = row
+        self.filters = {}
+
+    def eq(self, column, value):
+        self.filters[column] = value
+        return self
+
+    def execute(self):
+        columns = self.columns or ", ".join(self.row or {})
+        if not self.table.has_skill_ids and "skill_ids" in columns:
+            raise Exception("column pokemon.skill_ids does not exist")
+        if self.row is not None:
+            self.table.inserted.append(self.row)
+            return type("Result", (), {"data": [{"id": "new", **self.row}]})()
+        rows = [
+            row for row in self.table.rows
+            if all(row.get(column, value) == value for column, value in self.filters.items())
+        ]
+        return type("Result", (), {"data": rows})()
+
+
+class FakeTable:
+    def __init__(self, rows, has_skill_ids: bool):
+        self.rows = rows
+        self.has_skill_ids = has_skill_ids
+        self.inserted = []
+
+    def select(self, columns):
+        return FakeQuery(self, columns=columns)
+
+    def insert(self, row):
+        return FakeQuery(self, row=dict(row))
+
+
+class FakeDB:
+    def __init__(self, rows=(), has_skill_ids: bool = True, uploads=()):
+        self.tables = {}
+        self.rows = {"pokemon": list(rows), "upload_queue": list(uploads)}
+        self.has_skill_ids = has_skill_ids
+
+    def table(self, name):
+        if name not in self.tables:
+            self.tables[name] = FakeTable(self.rows.get(name, []), self.has_skill_ids)
+        return self.tables[name]
+
+
+def test_join_falls_back_to_type_skills_before_loadout_migration(monkeypatch):
+    db = FakeDB([{"id": "pk", "name": "火寶", "type": "fire", "stats": {"hp": 100}}], has_skill_ids=False)
+    monkeypatch.setattr(room_module, "get_service_db", lambda: db)
+
+    async def main():
+        manager = RoomManager()
+        await manager.create_room(room_code="TEST")
+        room = await manager.join_room("TEST", "c0", "pk", "p0")
+        return manager, room
+
+    manager, room = asyncio.run(main())
+    assert room is not None
+    assert room.members["c0"].skills
+    assert manager.has_skill_loadout is False
+
+
+def make_upload(pokemon_type: str = "fire", status: str = "completed"):
+    skills = get_skills_service().get_skills_by_type(pokemon_type, count=12)
+    return {
+        "upload_id": "up1",
+        "status": status,
+        "processed_data": {"type": pokemon_type, "skills": skills, "skill_ids": [skill["id"] for skill in skills]},
+    }
+
+
+def create(**kwargs):
+    kwargs.setdefault("upload_id", None)
+    kwargs.setdefault("skill_ids", None)  # 直接呼叫時不經過 FastAPI，Query 預設值需手動填入
+    return asyncio.run(pokemon_router.create_pokemon(front_image="front", back_image="back", **kwargs))
+
+
+def test_create_without_loadout_assigns_default_skills(monkeypatch):
+    db = FakeDB()
+    monkeypatch.setattr(pokemon_router, "get_service_db", lambda: db)
+
+    result = create(type="fire")
+    skill_ids = result["data"]["skill_ids"]
+    assert skill_ids
+    skills = get_skills_service().get_skills(skill_ids)
+    assert any(skill["type"] == "fire" for skill in skills)
+
+
+def test_create_uses_upload_loadout(monkeypatch):
+    upload = make_upload()
+    db = FakeDB(uploads=[upload])
+    monkeypatch.setattr(pokemon_router, "get_service_db", lambda: db)
+
+    assigned = upload["processed_data"]["skill_ids"]
+    assert create(type="fire", upload_id="up1")["data"]["skill_ids"] == assigned
+    assert create(type="fire", upload_id="up1", skill_ids=assigned[:4])["data"]["skill_ids"] == assigned[:4]
+
+
+@pytest.mark.parametrize("kwargs, status_code", [
+    ({"type": "fire", "skill_ids": ["skill_1"]}, 400),  # 沒有 upload_id 不能指定技能
+    ({"type": "fire", "upload_id": "missing"}, 404),
+    ({"type": "water", "upload_id": "up1"}, 400),  # 屬性與處理結果不符
+    ({"type": "fire", "upload_id": "up1", "skill_ids": ["skill_unknown"]}, 400),
+])
+def test_create_rejects_mismatched_loadout(monkeypatch, kwargs, status_code):
+    db = FakeDB(uploads=[make_upload()])
+    monkeypatch.setattr(pokemon_router, "get_service_db", lambda: db)
+
+    with pytest.raises(HTTPException) as error:
+        create(**kwargs)
+    assert error.value.status_code == status_code
+
+
+def test_create_rejects_skills_outside_upload_loadout(monkeypatch):
+    upload = make_upload()
+    db = FakeDB(uploads=[upload])
+    monkeypatch.setattr(pokemon_router, "get_service_db", lambda: db)
+
+    assigned = set(upload["processed_data"]["skill_ids"])
+    other = next(skill["id"] for skill in get_skills_service().skills_by_id.values() if skill["id"] not in assigned)
+    with pytest.raises(HTTPException) as error:
+        create(type="fire", upload_id="up1", skill_ids=[other])
+    assert error.value.status_code == 400
+
+
+def test_create_rejects_unfinished_upload(monkeypatch):
+    db = FakeDB(uploads=[make_upload(status="processing")])
+    monkeypatch.setattr(pokemon_router, "get_service_db", lambda: db)
+
+    with pytest.raises(HTTPException) as error:
+        create(type="fire", upload_id="up1")
+    assert error.value.status_code == 400
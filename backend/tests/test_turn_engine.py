@@ -0,0 +1,136 @@
+"""
+回合結算引擎測試
+"""
+
+import copy
+import random
+
+from app.services.turn_engine import resolve_boss_attack, resolve_player_actions, resolve_turn
+
+
+TYPES = ["normal", "fire", "water", "electric", "grass", "ice", "ground", "ghost", "dragon", "steel"]
+
+
+def make_skill(rng: random.Random, pokemon_type: str):
+    return {"name": f"{pokemon_type}-skill", "type": pokemon_type, "power": rng.choice([0, 20, 40, 90, 150])}
+
+
+def make_battle(seed: int, count: int = 4, boss_hp: int = 500):
+    """隨機產生房間、Boss 與行動"""
+    rng = random.Random(seed)
+    members = {}
+    for i in range(count):
+        hp = rng.randint(0, 100)
+        members[f"m{i}"] = {
+            "name": f"p{i}",
+            "type": rng.choice(TYPES),
+            "stats": {"defense": rng.randint(10, 150)},
+            "hp": hp,
+            "max_hp": 100,
+        }
+    if all(member["hp"] == 0 for member in members.values()):
+        members["m0"]["hp"] = 1
+
+    boss_type = rng.choice(TYPES)
+    boss = {
+        "name": "boss",
+        "type": boss_type,
+        "level": rng.randint(5, 60),
+        "attack": rng.randint(10, 300),
+        "hp": boss_hp,
+        "max_hp": boss_hp,
+        "skills": [make_skill(rng, rng.choice(TYPES)) for _ in range(rng.randint(0, 4))],
+    }
+    room = {"turn": rng.randint(0, 5), "members": members}
+    actions = {
+        member_id: {"skill": make_skill(rng, member["type"]), "prompt": "衝啊"}
+        for member_id, member in members.items() if rng.random() < 0.8
+    }
+    scores = {member_id: rng.choice([0.0, 0.1, 0.3, 0.5]) for member_id in actions}
+    return room, boss, actions, scores
+
+
+def snapshot(outcome):
+    return outcome.room_state, outcome.boss_state, outcome.events, outcome.result
+
+
+def test_same_inputs_and_seed_give_same_outcome():
+    room, boss, actions, scores = make_battle(1)
+    assert snapshot(resolve_turn(room, boss, actions, scores, seed=7)) == \
+        snapshot(resolve_turn(room, boss, actions, scores, seed=7))
+    assert snapshot(resolve_player_actions(room, boss, actions, scores)) == \
+        snapshot(resolve_player_actions(room, boss, actions, scores))
+    assert snapshot(resolve_boss_attack(room, boss, seed=7)) == \
+        snapshot(resolve_boss_attack(room, boss, seed=7))
+
+
+def test_inputs_are_not_modified():
+    room, boss, actions, scores = make_battle(2)
+    before = copy.deepcopy((room, boss, actions, scores))
+
+    resolve_turn(room, boss, actions, scores, seed=3)
+    resolve_player_actions(room, boss, actions, scores)
+    resolve_boss_attack(room, boss, seed=3)
+
+    assert (room, boss, actions, scores) == before
+
+
+def test_win_ends_battle_without_counterattack():
+    room, boss, actions, scores = make_battle(3, boss_hp=1)
+    actions = {"m0": {"skill": {"name": "撞擊", "type": "normal", "power": 40}, "prompt": ""}}
+
+    outcome = resolve_turn(room, boss, actions, {}, seed=0)
+
+    assert outcome.result == "win"
+    assert outcome.boss_state["hp"] == 0
+    assert outcome.boss_event is None
+    assert outcome.events[-1] == {"type": "battle_end", "result": "win"}
+    assert outcome.room_state["turn"] == room["turn"]
+
+    batch = resolve_player_actions(room, boss, actions, {})
+    assert batch.result == "win"
+    assert batch.room_state["turn"] == room["turn"]
+
+
+def test_lose_ends_battle_and_keeps_turn():
+    room = {"turn": 4, "members": {"m0": {"name": "p0", "type": "grass", "stats": {"defense": 1}, "hp": 1, "max_hp": 100}}}
+    boss = {"name": "boss", "type": "fire", "level": 60, "attack": 300, "hp": 500, "max_hp": 500,
+            "skills": [{"name": "大字爆炎", "type": "fire", "power": 110}]}
+
+    for outcome in (resolve_turn(room, boss, {}, {}, seed=0), resolve_boss_attack(room, boss, seed=0)):
+        assert outcome.result == "lose"
+        assert outcome.room_state["members"]["m0"]["hp"] == 0
+        assert outcome.events[-1] == {"type": "battle_end", "result": "lose"}
+        assert outcome.room_state["turn"] == 4
+
+
+def test_turn_advances_only_while_battle_continues():
+    room, boss, actions, scores = make_battle(4, count=6, boss_hp=100000)
+    for member in room["members"].values():
+        member["hp"] = 100
+
+    outcome = resolve_turn(room, boss, actions, scores, seed=1)
+    assert outcome.result is None
+    assert outcome.room_state["turn"] == room["turn"] + 1
+    assert outcome.boss_event is not None
+
+    assert resolve_boss_attack(room, boss, seed=1).room_state["turn"] == room["turn"] + 1
+    assert resolve_player_actions(room, boss, actions, scores).room_state["turn"] == room["turn"]
+
+
+def test_fuzz_hp_never_below_zero():
+    for seed in range(300):
+        room, boss, actions, scores = make_battle(seed, count=random.Random(seed).randint(1, 10),
+                                                  boss_hp=random.Random(seed).randint(1, 800))
+        for outcome in (
+            resolve_turn(room, boss, actions, scores, seed=seed),
+            resolve_player_actions(room, boss, actions, scores),
+            resolve_boss_attack(room, boss, seed=seed),
+        ):
+            assert outcome.boss_state["hp"] >= 0
+            assert all(member["hp"] >= 0 for member in outcome.room_state["members"].values())
+            for event in outcome.events:
+                assert event.get("damage", 0) >= 0
+                assert event.get("boss_hp", 0) >= 0
+                assert event.get("target_hp", 0) >= 0
+            assert (outcome.result == "win") == (outcome.boss_state["hp"] == 0)
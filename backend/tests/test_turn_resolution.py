@@ -0,0 +1,146 @@
+"""
+回合結算與 Prompt 微批次測試
+"""
+
+import asyncio
+
+import app.routers.rooms as rooms
+import app.services.prompt_evaluator_service as prompt_evaluator_service
+from app.config import settings
+from app.services.boss_service import Boss
+from app.services.prompt_evaluator_service import PromptBatcher
+from app.websocket.clock import VirtualClock
+from app.websocket.room import Room, RoomMember
+
+
+SKILL = {"id": "skill_1", "name": "火花", "type": "fire", "power": 40}
+
+
+class FakeEvaluator:
+    """記錄 evaluate_turn 呼叫的假評分服務"""
+
+    FALLBACK_MULTIPLIER = 0.1
+
+    def __init__(self, score: float = 0.5):
+        self.score = score
+        self.calls = []
+
+    async def evaluate_turn(self, requests, timeout):
+        self.calls.append((dict(requests), timeout))
+        return {player_id: self.score for player_id in requests}
+
+    def local_score(self, player_prompt):
+        return self.FALLBACK_MULTIPLIER
+
+
+def make_room(count: int) -> Room:
+    room = Room("TEST", max_players=count)
+    for i in range(count):
+        member = RoomMember(f"c{i}", "pk", {"type": "fire", "stats": {"hp": 100}}, f"p{i}", [SKILL])
+        member.is_ready = True
+        room.members[member.connection_id] = member
+    return room
+
+
+def test_batcher_merges_prompts_in_window(monkeypatch):
+    evaluator = FakeEvaluator()
+    monkeypatch.setattr(prompt_evaluator_service, "get_prompt_evaluator", lambda: evaluator)
+
+    async def main():
+        batcher = PromptBatcher(window_ms=10)
+        kwargs = {"skill_name": "火花", "skill_type": "fire", "boss_name": "b", "boss_type": "grass"}
+        return await asyncio.gather(*(
+            batcher.score(f"c{i}", player_prompt=f"prompt {i}", **kwargs) for i in range(3)
+        ))
+
+    assert asyncio.run(main()) == [0.5, 0.5, 0.5]
+    assert len(evaluator.calls) == 1
+    assert set(evaluator.calls[0][0]) == {"c0", "c1", "c2"}
+
+
+def test_batcher_drops_cancelled_prompt(monkeypatch):
+    evaluator = FakeEvaluator()
+    monkeypatch.setattr(prompt_evaluator_service, "get_prompt_evaluator", lambda: evaluator)
+
+    async def main():
+        batcher = PromptBatcher(window_ms=10)
+        kwargs = {"skill_name": "火花", "skill_type": "fire", "boss_name": "b", "boss_type": "grass"}
+        cancelled = asyncio.create_task(batcher.score("c0", player_prompt="first", **kwargs))
+        kept = asyncio.create_task(batcher.score("c1", player_prompt="second", **kwargs))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        return await kept
+
+    assert asyncio.run(main()) == 0.5
+    assert set(evaluator.calls[0][0]) == {"c1"}
+
+
+def test_late_precompute_job_gets_local_score_and_failed_job_is_batched(monkeypatch):
+    evaluator = FakeEvaluator(score=0.3)
+    monkeypatch.setattr(prompt_evaluator_service, "get_prompt_evaluator", lambda: evaluator)
+    monkeypatch.setattr(settings, "turn_resolution_deadline", 0.3)
+    monkeypatch.setattr(settings, "turn_fallback_budget", 0.2)
+
+    sent = []
+
+    async def broadcast(room_code, message):
+        sent.append(message)
+
+    monkeypatch.setattr(rooms.ws_manager, "broadcast_to_room", broadcast)
+
+    async def main():
+        room = make_room(3)
+        boss = Boss("b", "grass", 10, 100000, 80, 60, 70, [])
+        room.start_battle()
+        room.boss = boss
+        room.start_turn()
+
+        async def action_evaluator(connection_id, skill, prompt):
+            if connection_id == "c1":
+                await asyncio.sleep(60)  # 超過期限的評分（AI 請求已送出）
+            if connection_id == "c2":
+                raise RuntimeError("評分失敗")
+            return rooms.calculate_action_damage(boss, skill, 0.5)
+
+        room.action_evaluator = action_evaluator
+        room.submit_action("c0", "skill_1", "fast prompt")
+        room.submit_action("c1", "skill_1", "slow prompt")
+        room.submit_action("c2", "skill_1", "failed prompt")
+        await asyncio.sleep(0)
+
+        await rooms.process_turn_actions("TEST", room, boss)
+
+    asyncio.run(main())
+
+    # 逾期的評分不重送 AI（使用本地倍率），只有失敗的進入補評分批次，且批次保有保留的期限
+    assert len(evaluator.calls) == 1
+    requests, timeout = evaluator.calls[0]
+    assert set(requests) == {"c2"}
+    assert timeout >= settings.turn_fallback_budget
+
+    resolved = next(message for message in sent if message["type"] == "turn_resolved")
+    scores = {action["actor_id"]: action["prompt_score"] for action in resolved["data"]["actions"]}
+    assert scores == {"c0": 50, "c1": 10, "c2": 30}
+
+
+def test_rolling_mode_limits_actions_per_member(monkeypatch):
+    monkeypatch.setattr(settings, "rolling_action_cooldown_ms", 3000)
+    clock = VirtualClock()
+    room = make_room(2)
+    room.clock = clock
+    room.resolution_mode = "rolling"
+
+    assert room.submit_action("c0", "skill_1")
+    assert not room.submit_action("c0", "skill_1")
+    assert room.get_action_cooldown("c0") == 3.0
+    assert room.submit_action("c1", "skill_1")  # 冷卻以玩家為單位
+
+    asyncio.run(clock.advance(3))
+    assert room.get_action_cooldown("c0") == 0
+    assert room.submit_action("c0", "skill_1")
+
+
+def test_turn_mode_has_no_action_cooldown():
+    room = make_room(1)
+    assert room.submit_action("c0", "skill_1")
+    assert room.submit_action("c0", "skill_1")
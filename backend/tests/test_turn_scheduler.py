@@ -0,0 +1,86 @@
+"""
+回合期限排程器測試
+"""
+
+import asyncio
+
+from app.websocket.clock import VirtualClock
+from app.websocket.scheduler import TurnScheduler
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)  # 讓排程器與回呼任務執行
+
+
+def recorder(fired, key):
+    async def callback():
+        fired.append(key)
+    return callback
+
+
+def test_deadlines_fire_in_order_across_rooms():
+    async def main():
+        clock = VirtualClock()
+        scheduler = TurnScheduler(clock)
+        fired = []
+        for key, delay in [("AAAA", 30), ("BBBB", 10), ("CCCC", 20), ("BBBB:boss", 15)]:
+            scheduler.schedule(key, delay, recorder(fired, key))
+        await settle()
+
+        await clock.advance(12)
+        await settle()
+        assert fired == ["BBBB"]
+
+        await clock.advance(30)
+        await settle()
+        scheduler.task.cancel()
+        return fired
+
+    assert asyncio.run(main()) == ["BBBB", "BBBB:boss", "CCCC", "AAAA"]
+
+
+def test_fire_now_only_fires_target_room():
+    async def main():
+        clock = VirtualClock()
+        scheduler = TurnScheduler(clock)
+        fired = []
+        scheduler.schedule("AAAA", 30, recorder(fired, "AAAA"))
+        scheduler.schedule("BBBB", 30, recorder(fired, "BBBB"))
+        await settle()
+
+        scheduler.fire_now("BBBB")
+        scheduler.fire_now("ZZZZ")  # 不存在的排程被忽略
+        await settle()
+        remaining = scheduler.get_remaining("AAAA")
+        scheduler.task.cancel()
+        return fired, remaining, clock.now()
+
+    fired, remaining, now = asyncio.run(main())
+    assert fired == ["BBBB"]
+    assert remaining == 30
+    assert now == 0
+
+
+def test_cancel_room_drops_pending_entries():
+    async def main():
+        clock = VirtualClock()
+        scheduler = TurnScheduler(clock)
+        fired = []
+        for key in ("AAAA", "AAAA:batch", "AAAA:boss", "AAAAB", "BBBB"):
+            scheduler.schedule(key, 10, recorder(fired, key))
+        await settle()
+
+        scheduler.cancel_room("AAAA")
+        keys = sorted(item[2] for item in scheduler.heap)
+        entries = sorted(scheduler.entries)
+
+        await clock.advance(10)
+        await settle()
+        scheduler.task.cancel()
+        return keys, entries, sorted(fired)
+
+    keys, entries, fired = asyncio.run(main())
+    assert keys == ["AAAAB", "BBBB"]
+    assert entries == ["AAAAB", "BBBB"]
+    assert fired == ["AAAAB", "BBBB"]
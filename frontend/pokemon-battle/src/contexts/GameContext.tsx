@@ -27,6 +27,7 @@ type GameAction =
   | { type: 'SET_POKEMON_TYPE'; pokemonType: PokemonType }
   | { type: 'SET_POKEMON_IMAGES'; frontImage: string; backImage: string }
   | { type: 'SET_AI_TYPE'; pokemonType: string }
+  | { type: 'SET_SKILL_LOADOUT'; uploadId: string; skillIds: string[] }
   // 技能預加載相關
   | { type: 'START_LOADING_SKILLS' }
   | { type: 'SKILLS_LOADED' }
@@ -257,6 +258,14 @@ const gameReducer = (state: GameState, action: GameAction): GameState => {
         playerPokemon: updatedPokemonWithType,
       };
 
+    case 'SET_SKILL_LOADOUT':
+      // 儲存上傳時分配的技能配置（創建 Pokemon 時使用）
+      return {
+        ...state,
+        uploadId: action.uploadId,
+        uploadedSkillIds: action.skillIds,
+      };
+
     // 對話相關
     case 'NEXT_DIALOGUE':
       return { ...state, dialogueIndex: state.dialogueIndex + 1 };
@@ -167,7 +167,11 @@ const DialogueScreen: React.FC = () => {
   const createPokemonInBackground = async (nickname: string) => {
     try {
       // 確保有圖片和屬性資料
-      if (!state.uploadedFrontImage || !state.uploadedBackImage || !state.aiDeterminedType) {
+      if (
+        !state.uploadedFrontImage ||
+        !state.uploadedBackImage ||
+        !state.aiDeterminedType
+      ) {
         console.warn('[DialogueScreen] 圖片或屬性資料不完整，跳過創建 Pokemon');
         return;
       }
@@ -182,6 +186,7 @@ const DialogueScreen: React.FC = () => {
         state.aiDeterminedType,
         state.uploadedFrontImage,
         state.uploadedBackImage,
+        state.uploadId,
         nickname  // 使用玩家輸入的名稱
       );
 
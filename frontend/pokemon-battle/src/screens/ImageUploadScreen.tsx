@@ -114,7 +114,7 @@ const ImageUploadScreen: React.FC<ImageUploadScreenProps> = ({ onComplete }) =>
 
       // 步驟 3: 儲存結果
       if (result.status === 'completed' && result.data) {
-        const { front_image, back_image, type, type_chinese } = result.data;
+        const { front_image, back_image, type, type_chinese, skill_ids } = result.data;
 
         console.log('[ImageUpload] AI 判定屬性:', type_chinese, `(${type})`);
 
@@ -130,6 +130,12 @@ const ImageUploadScreen: React.FC<ImageUploadScreenProps> = ({ onComplete }) =>
           pokemonType: type,
         });
 
+        dispatch({
+          type: 'SET_SKILL_LOADOUT',
+          uploadId,
+          skillIds: skill_ids,
+        });
+
         console.log('[ImageUpload] 背景處理完成，已儲存到 GameContext');
         console.log('[ImageUpload] 儲存的屬性:', type, '中文:', type_chinese);
       } else {
@@ -176,6 +176,7 @@ function delay(ms: number): Promise<void> {
  * @param type Pokemon 屬性
  * @param frontImage 正面圖 (base64)
  * @param backImage 背面圖 (base64)
+ * @param uploadId 上傳 ID（可選，後端沿用上傳處理時分配的技能配置；不提供則依屬性分配）
  * @param name Pokemon 名稱（可選，若不提供則後端自動生成）
  * @param userId 用戶 ID（可選）
  * @returns 創建的 Pokemon 記錄
@@ -184,6 +185,7 @@ export async function createPokemonRecord(
   type: string,
   frontImage: string,
   backImage: string,
+  uploadId?: string,
   name?: string,
   userId?: string
 ): Promise<any> {
@@ -196,6 +198,11 @@ export async function createPokemonRecord(
       back_image: backImage,
     });
 
+    // 技能配置：後端依上傳 ID 沿用處理結果顯示的技能
+    if (uploadId) {
+      params.append('upload_id', uploadId);
+    }
+
     // 如果有提供名稱，添加到參數中
     if (name) {
       params.append('name', name);
@@ -25,6 +25,7 @@ export interface PokemonProcessResponse {
     back_image: string;    // Base64 圖片資料
     type: string;          // AI 判定的屬性（英文）
     type_chinese: string;  // AI 判定的屬性（中文）
+    skill_ids: string[];   // 上傳時分配的技能配置（創建 Pokemon 時傳入）
   };
   error?: string;
 }
@@ -69,6 +69,8 @@ export interface GameState {
   uploadedFrontImage?: string;  // AI 生成的前視圖（Base64）
   uploadedBackImage?: string;  // AI 生成的後視圖（Base64）
   aiDeterminedType?: string;  // AI 判定的屬性（英文）
+  uploadId?: string;  // 上傳 ID（創建 Pokemon 時用來沿用上傳分配的技能配置）
+  uploadedSkillIds?: string[];  // 上傳時分配的技能配置（技能 ID）
   // 技能選擇相關狀態
   fetchedMoves?: Skill[];  // 當前戰鬥使用的 12 個招式
   selectedSkills?: Skill[];  // 玩家選擇的 4 個技能